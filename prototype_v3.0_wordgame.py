@@ -10,6 +10,7 @@ import random
 from typing import Optional # To pick random words
 
 # Import necessary components from src
+from src.logging_config import configure as configure_logging
 from src.adapters.groq_adapter import GroqAdapter
 from src.agents.planner_agent import PlannerAgent
 from src.agents.executor_agent import ExecutorAgent
@@ -19,11 +20,7 @@ from src.models.check_plan import CheckPlan # Added for Phase 2
 from src.models.check_result import CheckResult # Added for Phase 2
 
 # --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+configure_logging()
 # Adjust log levels for agents/adapter if needed
 logging.getLogger("src.adapters.groq_adapter").setLevel(logging.INFO)
 logging.getLogger("src.agents.planner_agent").setLevel(logging.INFO)
@@ -63,20 +60,20 @@ async def main():
     sample_words = ["apple", "sky", "Elephant", "rhythm", "Ocean", "banana", "Ice", "apple", "sky"]
     logging.info(f"Processing words: {sample_words}")
 
+    # Check plans depend only on the word, so plan them all concurrently up front
+    logging.info("Requesting check plans from Planner...")
+    check_plans = await planner.plan_check_tasks(sample_words)
+
     # --- Phase 2 Workflow: Check-Then-Add Loop ---
-    for word_to_test in sample_words:
+    for word_to_test, check_plan in zip(sample_words, check_plans):
         logging.info(f"\n--- Processing Word: '{word_to_test}' ---")
-        check_plan: Optional[CheckPlan] = None
         check_result: Optional[CheckResult] = None
         final_add_plan: Optional[WordActionPlan] = None
         execution_result: Optional[ExecutionResult] = None
         word_status = "Failed - Unknown Error" # Default status
 
         try:
-            # 1. Plan Check
-            logging.info("Requesting check plan from Planner...")
-            check_plan = await planner.plan_check_task(word_to_test)
-
+            # 1. Check plan (planned above)
             if not check_plan or not isinstance(check_plan, CheckPlan):
                 logging.error("Planner failed to create a valid check plan.")
                 word_status = "Failed - Check Plan Generation"
@@ -84,7 +81,7 @@ async def main():
 
             # 2. Execute Check
             logging.info("Check plan received. Requesting check execution from Executor...")
-            check_result = await executor.execute_check(check_plan)
+            check_result = executor.execute_check_sync(check_plan) # Local file check, nothing to await
 
             if not check_result or not isinstance(check_result, CheckResult):
                 logging.error("Executor failed to return a valid check result.")
@@ -117,7 +114,7 @@ async def main():
             # 4. Execute Add (only if a valid plan exists)
             if final_add_plan and isinstance(final_add_plan, WordActionPlan):
                 logging.info("Requesting add execution from Executor...")
-                execution_result = await executor.execute_add(final_add_plan)
+                execution_result = executor.execute_add_sync(final_add_plan) # Local file append, nothing to await
                 if execution_result and execution_result.status == "Success":
                     logging.info("Executor successfully added the word.")
                     word_status = "Added Successfully"
@@ -142,9 +139,16 @@ async def main():
     # --- Final Summary ---
     logging.info("\n--- Word Game Phase 3 Finished ---")
     if executor and hasattr(executor, 'data_dir') and hasattr(executor, 'bin_files'):
+        executor.close() # Writes buffered bin appends before the files are inspected
         logging.info(f"Check the output files in the '{executor.data_dir}' directory:")
+        # Single scandir pass; DirEntry caches stat info so no extra syscall per bin file
+        data_entries = {entry.name: entry for entry in os.scandir(executor.data_dir)}
         for bin_name, file_path in executor.bin_files.items():
-            logging.info(f"- {bin_name}: {file_path}")
+            bin_entry = data_entries.get(os.path.basename(file_path))
+            if bin_entry is None:
+                logging.warning(f"- {bin_name}: {file_path} (missing)")
+            else:
+                logging.info(f"- {bin_name}: {file_path} ({bin_entry.stat().st_size} bytes)")
     else:
         logging.warning("Executor object not available or file paths not initialized for final summary.")
 
@@ -1,9 +1,9 @@
 # prototype_v4.0_readfile.py
 import asyncio
 import logging
-import os
 from typing import Optional # Added Optional for type hinting
 
+from src.logging_config import configure as configure_logging
 from src.adapters.groq_adapter import GroqAdapter
 from src.agents.planner_agent import PlannerAgent
 from src.agents.executor_agent import ExecutorAgent
@@ -11,11 +11,7 @@ from src.models.read_file_plan import ReadFilePlan
 from src.models.file_content_result import FileContentResult
 
 # --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING) # Quieten httpx logs
+configure_logging()
 # Optional: Adjust agent/adapter log levels if needed
 # logging.getLogger("src.agents.planner_agent").setLevel(logging.DEBUG)
 # logging.getLogger("src.agents.executor_agent").setLevel(logging.DEBUG)
@@ -23,6 +19,7 @@ logging.getLogger("httpx").setLevel(logging.WARNING) # Quieten httpx logs
 # Use models appropriate for the task (Planner needs strong reasoning, Executor is tool-based)
 PLANNER_MODEL = "deepseek-r1-distill-llama-70b" # Example strong model
 EXECUTOR_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct" # Not used for execution logic here
+PREVIEW_MAX_BYTES = 4096 # Only a preview is logged, so don't read the whole file
 
 async def main():
     logging.info("--- Starting Prototype V4.0: Read File Task ---")
@@ -43,10 +40,7 @@ async def main():
     # target_file = "prototype_v3.0_wordgame.py" # Another example
     # target_file = "requirements.txt" # Simple text file
 
-    if not os.path.exists(target_file):
-         logging.error(f"Target file does not exist: {target_file}. Aborting.")
-         return
-
+    # No os.path.exists preflight: a missing file is reported by the executor's read result.
     logging.info(f"Target file for reading: {target_file}")
 
     # --- Workflow ---
@@ -56,7 +50,7 @@ async def main():
     try:
         # 1. Plan file read
         logging.info("Requesting file read plan from Planner...")
-        read_plan = await planner.plan_read_file_task(target_file)
+        read_plan = await planner.plan_read_file_task(target_file, max_bytes=PREVIEW_MAX_BYTES)
 
         if not read_plan:
             logging.error("Planner failed to create a read file plan.")
@@ -78,7 +72,7 @@ async def main():
             logging.info(f"Message: {read_result.message}")
             # Log beginning of content (avoid logging huge files)
             content_preview = read_result.content[:200].replace('\n', '\\n') # Show first 200 chars, escape newlines
-            logging.info(f"Content Preview ({len(read_result.content)} chars total): '{content_preview}...'")
+            logging.info(f"Content Preview ({len(read_result.content)} chars read): '{content_preview}...'")
         else:
             # Log failure details
             logging.error(f"Status: {read_result.status}")
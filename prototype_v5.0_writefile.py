@@ -4,6 +4,7 @@ import logging
 import os
 from typing import Optional # Added Optional
 
+from src.logging_config import configure as configure_logging
 from src.adapters.groq_adapter import GroqAdapter
 from src.agents.planner_agent import PlannerAgent
 from src.agents.executor_agent import ExecutorAgent
@@ -11,11 +12,7 @@ from src.models.write_file_plan import WriteFilePlan
 from src.models.write_file_result import WriteFileResult
 
 # --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+configure_logging()
 
 PLANNER_MODEL = "deepseek-r1-distill-llama-70b"
 EXECUTOR_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct" # Not used for execution logic
@@ -80,9 +77,14 @@ End of test content.
 
         # 4. Verification Step
         logging.info("--- Verification Step ---")
-        if os.path.exists(target_file):
+        # Single scandir pass over the data dir (DirEntry caches stat info) instead of a stat per verified file
+        data_entries = {entry.name: entry for entry in os.scandir(executor.data_dir)}
+        target_entry = data_entries.get(os.path.basename(target_file))
+        if target_entry is None:
+             logging.error(f"Verification error: Target file {target_file} does not exist after write attempt.")
+        else:
             try:
-                with open(target_file, 'r', encoding='utf-8') as f:
+                with open(target_entry.path, 'r', encoding='utf-8') as f:
                     actual_content = f.read()
                 logging.info(f"Successfully read back file: {target_file}")
                 logging.info(f"Actual content read:\n{actual_content}")
@@ -93,8 +95,6 @@ End of test content.
                      logging.warning("Verification warning: Content read does not match expected content.")
             except Exception as e:
                 logging.error(f"Verification error: Could not read back file {target_file}: {e}", exc_info=True)
-        else:
-             logging.error(f"Verification error: Target file {target_file} does not exist after write attempt.")
 
 
     except Exception as e:
@@ -4,6 +4,7 @@ import logging
 import os
 from typing import Optional, Dict
 
+from src.logging_config import configure as configure_logging
 from src.adapters.groq_adapter import GroqAdapter
 from src.agents.planner_agent import PlannerAgent
 from src.agents.executor_agent import ExecutorAgent
@@ -13,11 +14,7 @@ from src.models.write_file_plan import WriteFilePlan
 from src.models.write_file_result import WriteFileResult
 
 # --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+configure_logging()
 PLANNER_MODEL = "deepseek-r1-distill-llama-70b"
 EXECUTOR_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
 
@@ -39,7 +36,7 @@ async def main():
 
     # --- Setup Initial File State (using executor's tool directly) ---
     logging.info(f"Ensuring target file '{target_file}' exists with initial content...")
-    setup_success = executor._write_file_content(target_file, initial_content)
+    setup_success = await asyncio.to_thread(executor._write_file_content, target_file, initial_content)
     if not setup_success:
         logging.error("Failed to set up initial file content. Aborting.")
         return
@@ -91,19 +88,24 @@ async def main():
     # --- Verification Step ---
     logging.info("--- Verification Step ---")
     try:
-        if os.path.exists(target_file):
+        # Single scandir pass over the data dir (DirEntry caches stat info) instead of a stat per verified file
+        data_entries = {entry.name: entry for entry in os.scandir(executor.data_dir)}
+        target_entry = data_entries.get(os.path.basename(target_file))
+        if target_entry is None:
+            logging.error(f"Verification error: Target file {target_file} does not exist after workflow.")
+        else:
             # Use the executor's tool to read back content AND lines for verification
-            actual_content, actual_lines_dict = executor._read_file_content(target_file)
+            actual_content, actual_lines_dict = executor._read_file_content(target_entry.path)
             if actual_content is not None and actual_lines_dict is not None:
                 logging.info(f"Successfully read back file: {target_file} ({len(actual_lines_dict)} lines)")
                 logging.info(f"Actual content after modification:\n{actual_content}")
-                
+            
                 # Verification logic using line numbers
                 expected_marker = "-- Modified by Planner (v8) --"
                 original_last_line_num = len(original_lines) if original_lines else 0
                 expected_marker_line_num = original_last_line_num + 1
                 marker_found = False
-                
+            
                 if expected_marker_line_num in actual_lines_dict and actual_lines_dict[expected_marker_line_num] == expected_marker:
                     marker_found = True
                     logging.info(f"Verification successful: Found '{expected_marker}' at expected line {expected_marker_line_num}.")
@@ -114,13 +116,11 @@ async def main():
                         marker_found = True # Still counts as found for basic check
                     else:
                         logging.error(f"Verification FAILED: Modification marker '{expected_marker}' NOT found in final content.")
-                
+            
                 # Optional: More rigorous check for original content preservation if needed
                 # E.g., check if actual_lines_dict[1..original_last_line_num] matches original_lines
             else:
                 logging.error(f"Verification error: Could not read back file content/lines from {target_file} using tool.")
-        else:
-            logging.error(f"Verification error: Target file {target_file} does not exist after workflow.")
     except Exception as e:
         logging.error(f"Verification error during read back: {e}", exc_info=True)
         
@@ -2,17 +2,240 @@
 # VERSION WITH EXAMPLE CODE REMOVED
 
 import os
-import json
 import asyncio
+import functools
+import importlib.util
 import logging
-from typing import List, Dict, Any, Optional, Union, AsyncGenerator, Type
-from groq import AsyncGroq, GroqError
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Union, AsyncGenerator, Callable, Type
+import httpx
+from groq import AsyncGroq, AsyncStream, GroqError, DefaultAsyncHttpxClient
+from groq.types.chat import ChatCompletion, ChatCompletionChunk
 from pydantic import BaseModel, ValidationError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from src.adapters.response_cache import ResponseCache, SQLiteResponseCache, make_cache_key, DEFAULT_MAX_ENTRIES
+from src.adapters.semantic_cache import SemanticCache, DEFAULT_SIMILARITY_THRESHOLD
+from src.utils import json_utils
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError: # aiolimiter is optional; batches are then bounded by concurrency only
+    AsyncLimiter = None
+
+# Logging is configured by the application entry point, not at import time
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional 'h2' package (pip install "httpx[http2]"); fall back to HTTP/1.1 keep-alive otherwise
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Prefill endings that open a code fence, mapped to the stop sequence that closes them
+_PREFILL_STOP_MAP: Dict[str, str] = {
+    "```python": "```",
+    "```json": "```",
+    "```typescript": "```",
+}
+_CODE_FENCE_STARTS = tuple(_PREFILL_STOP_MAP) # For a single endswith() check on the common no-fence path
+
+
+@functools.lru_cache(maxsize=256)
+def _prefill_stop_token(prefill_content: str) -> Optional[str]:
+    """
+    Returns the stop sequence implied by a prefill that opens a code fence, or None.
+    Memoized: agents reuse the same few prefills, so repeats skip the strip and scans.
+    """
+    stripped_prefill = prefill_content.rstrip()
+    if not stripped_prefill.endswith(_CODE_FENCE_STARTS):
+        return None
+    for fence, stop_token in _PREFILL_STOP_MAP.items():
+        if stripped_prefill.endswith(fence):
+            return stop_token
+    return None
+
+# Default validation_offload_threshold: JSON responses larger than this (chars) are validated in a worker thread;
+# smaller ones are validated inline since the thread hop would cost more than the parse
+_OFFLOAD_VALIDATION_THRESHOLD = 4096
+
+
+@dataclass(slots=True)
+class ChatResult:
+    """
+    Slim result of a non-streamed, non-JSON chat completion.
+    Holds only what the agents read, so the full SDK response (usage, logprobs, ...) can be freed.
+    """
+    content: Optional[str]
+    tool_calls: Optional[List[Any]]
+    finish_reason: Optional[str]
+
+    @classmethod
+    def from_completion(cls, completion: Any) -> "ChatResult":
+        """Builds a ChatResult from the first choice of a Groq ChatCompletion."""
+        choice = completion.choices[0] if completion.choices else None
+        message = choice.message if choice else None
+        return cls(
+            content=message.content if message else None,
+            tool_calls=message.tool_calls if message else None,
+            finish_reason=choice.finish_reason if choice else None,
+        )
+
+# Endpoint used when posting pre-serialized (orjson) request bodies; must match the SDK's chat.completions.create
+_CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+# Connection pool size of each AsyncGroq client; sized for bursts of concurrent agent calls
+_POOL_MAX_CONNECTIONS = 100
+_POOL_MAX_KEEPALIVE_CONNECTIONS = 100
+
+# One AsyncGroq client (and connection pool) per API key and event loop, shared by all adapters in the
+# process: pooled connections belong to the loop that opened them, so each asyncio.run() gets its own.
+# (api_key, id(loop)) -> (loop, client); the loop is kept to tell a live entry from a reused id
+_SHARED_CLIENTS: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, AsyncGroq]] = {}
+
+
+def _build_client(api_key: str) -> AsyncGroq:
+    """Creates an AsyncGroq client with an explicitly sized keep-alive connection pool."""
+    http_client = DefaultAsyncHttpxClient( # Keeps Groq's default timeouts
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_keepalive_connections=_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=_POOL_MAX_CONNECTIONS,
+        ),
+    )
+    return AsyncGroq(api_key=api_key, http_client=http_client)
+
+
+def _get_client(api_key: str) -> AsyncGroq:
+    """
+    Returns the shared AsyncGroq client for api_key on the running event loop, creating it on first use.
+    Must be called from a coroutine. Clients left behind by closed loops are dropped when a new one is made.
+    No lock needed: there is no await between the lookup and the insert, so it is atomic on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = (api_key, id(loop))
+    entry = _SHARED_CLIENTS.get(key)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+    for stale_key in [k for k, (entry_loop, _) in _SHARED_CLIENTS.items() if entry_loop.is_closed()]:
+        del _SHARED_CLIENTS[stale_key] # Its connections died with the loop; nothing left to close
+    client = _build_client(api_key)
+    _SHARED_CLIENTS[key] = (loop, client)
+    logger.info("Created shared AsyncGroq client (HTTP/2=%s).", "on" if _HTTP2_AVAILABLE else "off")
+    return client
+
+
+@functools.lru_cache(maxsize=128)
+def _schema_sentinel(json_schema: Type[BaseModel]) -> str:
+    """Marker that starts the pinned schema system message for a Pydantic class. Memoized per class."""
+    return f"<SCHEMA:{json_schema.__name__}>"
+
+
+@functools.lru_cache(maxsize=128)
+def _schema_prompt(json_schema: Type[BaseModel]) -> str:
+    """
+    Builds the pinned JSON-mode schema system message content for a Pydantic class. Memoized per class.
+    The content is byte-identical across calls so provider-side prompt caches can match the prefix.
+    """
+    schema_str = json_utils.dumps(json_schema.model_json_schema(), indent=True)
+    return f"{_schema_sentinel(json_schema)}\nYou MUST output valid JSON conforming to this schema:\n```json\n{schema_str}\n```"
+
+
+@functools.lru_cache(maxsize=128)
+def _schema_message(json_schema: Type[BaseModel]) -> Dict[str, str]:
+    """
+    The pinned schema system message itself, built once per class and reused by every JSON-mode call.
+    Treated as read-only: it is only ever inserted into adapter-owned message lists, never edited.
+    """
+    return {"role": "system", "content": _schema_prompt(json_schema)}
+
+
+def _with_pinned_schema(messages: List[Dict[str, Any]], json_schema: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """
+    Returns messages with the schema pinned as its own system message, never editing the caller's list.
+    The schema goes right after the caller's leading system message(s), so the large static system
+    prompt stays the first bytes of every request and provider-side prefix (KV) caches can reuse it
+    across schemas. Histories that already carry it (matched by sentinel) are returned unchanged;
+    only the leading system block is scanned, not the whole history.
+    """
+    sentinel = _schema_sentinel(json_schema)
+    insert_at = 0
+    for msg in messages:
+        if msg.get("role") != "system":
+            break
+        content = msg.get("content")
+        if isinstance(content, str) and content.startswith(sentinel):
+            return messages
+        insert_at += 1
+    return [*messages[:insert_at], _schema_message(json_schema), *messages[insert_at:]]
+
+
+# --- Call-mode dispatch ---
+# A call's mode packs its option flags into one int so _build_params classifies it once and
+# dispatches to a single handler instead of re-testing the same flags in an if/elif chain.
+_STREAM_BIT = 1
+_TOOLS_BIT = 2
+_JSON_BIT = 4
+
+# Invalid combinations, checked upfront as masks: mask -> error message
+_INVALID_MODE_MASKS = (
+    (_JSON_BIT | _STREAM_BIT, "Streaming (stream=True) is not supported with JSON mode (json_schema provided)."),
+    (_JSON_BIT | _TOOLS_BIT, "Tool use (tools provided) cannot be combined with JSON mode (json_schema provided) in a single call."),
+)
+
+
+def _apply_plain_mode(api_params, messages, json_schema, tools, tool_choice, stream):
+    """Plain chat call, streamed or not."""
+    api_params["stream"] = stream
+    return messages
+
+
+def _apply_tools_mode(api_params, messages, json_schema, tools, tool_choice, stream):
+    """Tool-use call; streamed tool calls are allowed but must be assembled by the caller."""
+    if stream:
+        logger.warning("Streaming with tool use. Parsing streamed tool calls can be complex.")
+    api_params["tools"] = tools
+    api_params["tool_choice"] = tool_choice or "auto"
+    api_params["stream"] = stream
+    logger.info("Tool use enabled with tool_choice='%s'.", api_params["tool_choice"])
+    return messages
+
+
+def _apply_json_mode(api_params, messages, json_schema, tools, tool_choice, stream):
+    """JSON-mode call: json_object response format plus the pinned schema system message."""
+    api_params["response_format"] = {"type": "json_object"}
+    api_params["stream"] = False
+    logger.info("JSON mode enabled. Expecting output conforming to '%s'.", json_schema.__name__)
+    return _with_pinned_schema(messages, json_schema)
+
+
+# Each handler sets the mode-specific api_params and returns the (possibly new) message list.
+# Invalid modes (JSON with stream/tools) are rejected before dispatch and have no entry.
+_MODE_HANDLERS: Dict[int, Callable[..., List[Dict[str, Any]]]] = {
+    0: _apply_plain_mode,
+    _STREAM_BIT: _apply_plain_mode,
+    _TOOLS_BIT: _apply_tools_mode,
+    _TOOLS_BIT | _STREAM_BIT: _apply_tools_mode,
+    _JSON_BIT: _apply_json_mode,
+}
+
+
+_REASONING_FORMATS = ("parsed", "raw", "hidden")
+
+
+def _apply_reasoning_format(api_params: Dict[str, Any], reasoning_format: Optional[str], mode: int) -> None:
+    """
+    Validates reasoning_format for a call of the given mode and sets it on api_params.
+    The single rule set for every entry point: unknown values are ignored with a warning,
+    and 'raw' is rejected in JSON mode or with tools.
+    """
+    if not reasoning_format:
+        return
+    if reasoning_format not in _REASONING_FORMATS:
+        logger.warning("Invalid reasoning_format value '%s'. Ignoring. Valid options: 'parsed', 'raw', 'hidden'.", reasoning_format)
+        return
+    if reasoning_format == "raw" and mode & (_JSON_BIT | _TOOLS_BIT):
+        raise ValueError("reasoning_format cannot be 'raw' when using JSON mode or tools. Use 'parsed' or 'hidden'.")
+    api_params["reasoning_format"] = reasoning_format
+    logger.info("Setting reasoning_format to '%s'.", reasoning_format)
+
+
 class GroqAdapter:
     """
     An asynchronous adapter to interact with the Groq API.
@@ -20,7 +243,21 @@ class GroqAdapter:
     Handles standard chat completions, streaming, JSON mode enforcement,
     tool usage, response prefilling, and reasoning format control based on provided parameters.
     """
-    def __init__(self, api_key: Optional[str] = None, default_model: Optional[str] = None): # Removed default model value
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model: Optional[str] = None, # Removed default model value
+        cache_enabled: bool = False,
+        cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_ttl_seconds: Optional[float] = None,
+        cache_path: Optional[str] = None,
+        enable_semantic_cache: bool = False,
+        semantic_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_concurrency: int = 16,
+        requests_per_minute: Optional[int] = None,
+        share_client: bool = True,
+        validation_offload_threshold: int = _OFFLOAD_VALIDATION_THRESHOLD
+    ):
         """
         Initializes the AsyncGroq client.
         Args:
@@ -28,23 +265,100 @@ class GroqAdapter:
                      GROQ_API_KEY environment variable.
             default_model: A default Groq model ID. This is stored but typically
                            overridden by the 'model' parameter in chat_completion.
+            cache_enabled: If True, deterministic calls (temperature 0) are served from an
+                           in-memory response cache on repeat. Streams are replayed from cache.
+            cache_max_entries: LRU bound on the number of cached responses.
+            cache_ttl_seconds: Optional lifetime of a cached response; None keeps entries until evicted.
+            cache_path: Optional SQLite file for the response cache. When set, cached responses persist
+                        across runs and are shared by every process using the same file.
+            enable_semantic_cache: If True, deterministic plain-text calls that miss the exact cache are
+                                   served from a near-duplicate prior prompt (requires sentence-transformers + faiss).
+            semantic_threshold: Minimum cosine similarity for a semantic cache hit.
+            max_concurrency: Maximum number of in-flight API requests across all calls on this adapter.
+                             Bursts beyond it wait instead of overshooting the provider rate limit.
+                             Keep it at or below the client pool size (_POOL_MAX_CONNECTIONS).
+            requests_per_minute: Optional rate limit for all API requests (requires aiolimiter).
+            share_client: If True (default), reuse the process-wide client for this API key and event loop.
+                          If False, the adapter owns a private client that aclose() shuts down.
+            validation_offload_threshold: JSON responses longer than this (chars) are validated in a
+                                          worker thread instead of on the event loop.
         """
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         if not self.api_key:
             raise ValueError("GROQ_API_KEY environment variable not set or passed.")
 
         self.default_model = default_model # Store default if provided
+        self.cache_enabled = cache_enabled
+        if cache_path:
+            self.response_cache = SQLiteResponseCache(cache_path, max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+        else:
+            self.response_cache = ResponseCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+        self._cache_on_disk = isinstance(self.response_cache, SQLiteResponseCache) # Disk I/O runs in a worker thread
+        self.semantic_cache: Optional[SemanticCache] = None
+        if enable_semantic_cache:
+            self.semantic_cache = SemanticCache(threshold=semantic_threshold)
+        self.validation_offload_threshold = validation_offload_threshold
+        self.max_concurrency = max_concurrency
+        self._request_semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = None
+        if requests_per_minute:
+            if AsyncLimiter is not None:
+                self._rate_limiter = AsyncLimiter(requests_per_minute, 60)
+            else:
+                logger.warning("requests_per_minute set but aiolimiter is not installed. Requests are bounded by max_concurrency only.")
         try:
-            self.client = AsyncGroq(api_key=self.api_key)
+            self._owns_client = not share_client
+            # Shared clients are resolved per event loop on use (see the client property)
+            self._client: Optional[AsyncGroq] = _build_client(self.api_key) if self._owns_client else None
             # Log if a default was provided during init, but emphasize it's usually overridden
             log_msg = "GroqAdapter initialized."
             if self.default_model:
                 log_msg += f" (Default model set to: {self.default_model}, often overridden by specific calls)"
             logger.info(log_msg)
         except Exception as e:
-            logger.error(f"Failed to initialize AsyncGroq client: {e}", exc_info=True)
+            logger.error("Failed to initialize AsyncGroq client: %s", e, exc_info=True)
             raise
 
+    @property
+    def client(self) -> AsyncGroq:
+        """The AsyncGroq client: this adapter's own, or the shared one for the running event loop."""
+        return self._client if self._owns_client else _get_client(self.api_key)
+
+    async def aclose(self) -> None:
+        """
+        Closes this adapter's client if it owns one, and its persistent response cache if any.
+        Shared clients are left to aclose_shared().
+        """
+        if self._cache_on_disk:
+            await asyncio.to_thread(self.response_cache.close)
+        if self._owns_client:
+            await self.client.close()
+            logger.info("Closed adapter-owned AsyncGroq client.")
+
+    async def __aenter__(self) -> "GroqAdapter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    @classmethod
+    async def aclose_shared(cls) -> None:
+        """
+        Closes the shared AsyncGroq clients of the running event loop and their connection pools.
+        Call once at shutdown, before the loop ends. Clients of loops that already closed are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        clients = []
+        for key, (entry_loop, client) in list(_SHARED_CLIENTS.items()):
+            if entry_loop is loop:
+                clients.append(client)
+            elif not entry_loop.is_closed():
+                continue # Belongs to another live loop (e.g. in another thread)
+            del _SHARED_CLIENTS[key]
+        for client in clients:
+            await client.close()
+        logger.info("Closed %d shared AsyncGroq client(s).", len(clients))
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -58,8 +372,9 @@ class GroqAdapter:
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Union[str, Dict]] = None,
         prefill_content: Optional[str] = None,
-        reasoning_format: Optional[str] = None
-    ) -> Union[AsyncGenerator[str, None], Any, BaseModel]:
+        reasoning_format: Optional[str] = None,
+        return_raw: bool = False
+    ) -> Union[AsyncGenerator[str, None], ChatResult, Any, BaseModel]:
         """
         Makes an asynchronous call to the Groq Chat Completions API with options.
         Args:
@@ -67,20 +382,229 @@ class GroqAdapter:
             model: Specific model ID to use for this call (REQUIRED).
             # ... other args ...
             reasoning_format: Controls reasoning output ('parsed', 'raw', 'hidden').
+            return_raw: If True, plain (non-JSON, non-stream) calls return the full Groq
+                        ChatCompletion (e.g. for usage stats) instead of a ChatResult.
+            stream: Kept for backwards compatibility; prefer chat_completion_stream, which
+                    returns the async generator without the extra await.
 
         Returns:
             # ... return types ...
+            A ChatResult for plain calls unless return_raw is set.
         Raises:
             ValueError: For invalid parameter combinations, missing model, or validation errors.
             GroqError: For API-related errors.
         """
+        # Fast path: the dominant agent pattern (JSON mode, no prefill/tools/stream) skips the general branches
+        if json_schema is not None and not prefill_content and not tools and not stream:
+            return await self.chat_completion_json(
+                messages, model, json_schema, temperature=temperature, max_tokens=max_tokens,
+                top_p=top_p, stop=stop, reasoning_format=reasoning_format
+            )
+
+        api_params = self._build_params(
+            messages, model, temperature, max_tokens, top_p, stop, stream,
+            json_schema, tools, tool_choice, prefill_content, reasoning_format
+        )
+        if json_schema is not None: # JSON mode combined with a prefill
+            return await self._run_json_completion(api_params, json_schema, temperature)
+
+        selected_model = api_params["model"]
+        using_tools = bool(tools)
+        is_streaming = api_params.get("stream", False)
+
+        # --- Response Cache Lookup (deterministic, non-streaming calls only) ---
+        cache_key: Optional[str] = None
+        if self.cache_enabled and temperature == 0 and not is_streaming:
+            cache_key = self._build_cache_key(api_params, None)
+
+        # Semantic tier: deterministic plain-text calls only (schema/tool outputs must match exactly)
+        semantic_query: Optional[Tuple[str, str]] = None # (prompt, context key)
+        if (self.semantic_cache is not None and self.semantic_cache.available and temperature == 0
+                and not is_streaming and not using_tools):
+            semantic_query = self._semantic_query(api_params)
+
+        # --- API Call Execution & Response Handling ---
+        try:
+            completion = await self._lookup_cached(cache_key)
+            if completion is not None:
+                cache_key = None # Already cached, nothing to store
+            elif semantic_query and (completion := await asyncio.to_thread(
+                    self.semantic_cache.lookup, semantic_query[0], selected_model, semantic_query[1])) is not None:
+                semantic_query = None # Already indexed, nothing to add
+            else:
+                completion = await self._create_completion(api_params)
+
+            if is_streaming:
+                logger.info("Streaming response...")
+                return self._handle_stream(completion)
+
+            # Walk the response model once; everything below reads these locals
+            choice0 = completion.choices[0] if completion.choices else None
+            msg0 = choice0.message if choice0 else None
+
+            logger.info("Returning non-streamed response.")
+            tool_calls = msg0.tool_calls if msg0 else None
+            finish_reason = choice0.finish_reason if choice0 else None
+            if tool_calls:
+                 logger.info("Response contains tool calls: %s", tool_calls)
+            if finish_reason:
+                 logger.info("Finish reason: %s", finish_reason)
+            await self._cache_response(cache_key, completion, selected_model)
+            if semantic_query:
+                await asyncio.to_thread(self.semantic_cache.add, semantic_query[0], selected_model, completion, semantic_query[1])
+            if return_raw:
+                return completion
+            return ChatResult(content=msg0.content if msg0 else None, tool_calls=tool_calls, finish_reason=finish_reason)
+
+        # --- Error Handling ---
+        except GroqError as e:
+            self._log_api_error(e, selected_model, is_streaming, False, using_tools)
+            raise
+        except Exception as e:
+            logger.error("An unexpected error occurred during Groq API call: %s", e, exc_info=True)
+            raise
+
+    async def chat_completion_json(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        json_schema: Type[BaseModel],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 2048,
+        top_p: float = 1.0,
+        stop: Optional[Union[str, List[str]]] = None,
+        reasoning_format: Optional[str] = None
+    ) -> BaseModel:
+        """
+        JSON-mode chat completion returning a validated json_schema instance.
+        Specialized entry point for the agents' structured calls: it builds the request directly,
+        without the prefill/tool/stream handling of chat_completion.
+        Raises:
+            ValueError: Missing model, reasoning_format='raw' (not allowed in JSON mode), or invalid output.
+            GroqError: For API-related errors.
+        """
+        if not model:
+            raise ValueError("The 'model' parameter is required for chat_completion calls.")
+        api_params: Dict[str, Any] = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "stop": stop,
+            "response_format": {"type": "json_object"},
+            "stream": False,
+            "messages": _with_pinned_schema(messages, json_schema),
+        }
+        _apply_reasoning_format(api_params, reasoning_format, _JSON_BIT) # Same rules as _build_params
+        logger.debug(
+            "Calling Groq API: Model=%s Stream=False JSONMode=True Tools=False Messages=%d",
+            model, len(api_params["messages"])
+        )
+        return await self._run_json_completion(api_params, json_schema, temperature)
+
+    async def _run_json_completion(self, api_params: Dict[str, Any], json_schema: Type[BaseModel], temperature: float) -> BaseModel:
+        """
+        Executes a prepared JSON-mode request (cache lookup, API call, validation, cache store).
+        The in-memory cache stores the validated model, so a hit skips validation too: instances of
+        frozen schemas are shared, others are returned as copies. The SQLite cache stores the completion.
+        """
+        selected_model = api_params["model"]
+        cache_key = self._build_cache_key(api_params, json_schema) if self.cache_enabled and temperature == 0 else None
+        shareable = bool(json_schema.model_config.get("frozen"))
+        response_content: Optional[str] = None # Raw JSON-mode text, reported by the validation error handlers
+        try:
+            completion = await self._lookup_cached(cache_key)
+            if isinstance(completion, json_schema): # Validated model from the in-memory cache
+                return completion if shareable else completion.model_copy(deep=True)
+            if completion is not None:
+                cache_key = None # Already cached, nothing to store
+            else:
+                completion = await self._create_completion(api_params)
+
+            logger.info("Processing JSON mode response...")
+            choices = completion.choices
+            msg0 = choices[0].message if choices else None
+            if not (msg0 and msg0.content):
+                logger.error("JSON mode response missing content.")
+                raise ValueError("Received response suitable for JSON mode, but content was missing.")
+            response_content = msg0.content
+            validated_data = await self._validate_json_response(response_content, json_schema)
+            if cache_key: # Only cache responses that validated
+                if self._cache_on_disk:
+                    cached_value = completion
+                else:
+                    cached_value = validated_data if shareable else validated_data.model_copy(deep=True)
+                await self._cache_response(cache_key, cached_value, selected_model)
+            return validated_data
+
+        except GroqError as e:
+            self._log_api_error(e, selected_model, False, True, False)
+            raise
+        except ValidationError as e:
+            # model_validate_json parses and validates in one pass, so malformed JSON also lands here
+            raw_content = response_content or "N/A"
+            errors = e.errors()
+            if errors and errors[0]["type"] == "json_invalid":
+                logger.error("Failed to decode JSON response: %s", e, exc_info=True)
+                raise ValueError(f"LLM response was not valid JSON. Error: {e}. Raw response: '{raw_content}'") from e
+            logger.error("JSON validation failed: %s", e, exc_info=True)
+            raise ValueError(f"LLM output failed Pydantic validation for {json_schema.__name__}. Errors: {e}. Raw response: '{raw_content}'") from e
+        except Exception as e:
+            logger.error("An unexpected error occurred during Groq API call: %s", e, exc_info=True)
+            raise
+
+    @staticmethod
+    def _log_api_error(e: GroqError, model: str, stream: bool, json_mode: bool, tools: bool) -> None:
+        """Logs a GroqError with limited call details (connection errors carry no status code)."""
+        logger.error("Groq API error: %s - %s", getattr(e, "status_code", None), getattr(e, "message", e), exc_info=True)
+        logger.error(
+            "Failed API call details (limited): Model='%s', Stream=%s, JSONMode=%s, Tools=%s",
+            model, stream, json_mode, tools
+        )
+
+    async def _cache_call(self, method, *args, **kwargs) -> Any:
+        """Runs a response cache method, in a worker thread when the cache is on disk."""
+        if self._cache_on_disk:
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    async def _lookup_cached(self, cache_key: Optional[str]) -> Optional[Any]:
+        """Returns the cached completion for cache_key (None if uncacheable or a miss), logging hits."""
+        if not cache_key:
+            return None
+        completion = await self._cache_call(self.response_cache.get, cache_key)
+        if completion is not None:
+            tokens_saved = getattr(getattr(completion, "usage", None), "total_tokens", None) or 0
+            logger.info("Cache hit key=%.12s tokens_saved~=%d", cache_key, tokens_saved)
+        return completion
+
+    def _build_params(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        top_p: float,
+        stop: Optional[Union[str, List[str]]],
+        stream: bool,
+        json_schema: Optional[Type[BaseModel]],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[Union[str, Dict]],
+        prefill_content: Optional[str],
+        reasoning_format: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Validates the call options and builds the keyword arguments for chat.completions.create.
+        Shared by chat_completion and chat_completion_stream. Never mutates the caller's message list.
+        """
         # CRITICAL: Ensure a model is explicitly passed for every call
         selected_model = model
         if not selected_model:
              # Raise error immediately if no model specified for the call
              raise ValueError("The 'model' parameter is required for chat_completion calls.")
 
-        effective_messages = list(messages) # Copy
+        # Copy-on-write: the caller's list is never mutated; branches that add a message build a new list
+        effective_messages = messages
         api_params: Dict[str, Any] = {
             "model": selected_model,
             "temperature": temperature,
@@ -92,132 +616,216 @@ class GroqAdapter:
         # --- Parameter Handling & Validation ---
         using_json_mode = bool(json_schema)
         using_tools = bool(tools)
+        mode = (_JSON_BIT if using_json_mode else 0) | (_TOOLS_BIT if using_tools else 0) | (_STREAM_BIT if stream else 0)
+        for invalid_mask, error_message in _INVALID_MODE_MASKS:
+            if mode & invalid_mask == invalid_mask:
+                raise ValueError(error_message)
 
         if prefill_content:
-            # ... (prefill logic remains the same) ...
-            effective_messages.append({"role": "assistant", "content": prefill_content})
-            logger.info(f"Prefilling assistant message starting with: '{prefill_content[:50]}...'")
-            if stop is None and (prefill_content.strip().endswith("```python") or prefill_content.strip().endswith("```json")):
-                api_params["stop"] = "```"
-                logger.info("Automatically setting stop sequence to '```' due to prefill format.")
-
-
-        if reasoning_format:
-            # ... (reasoning_format logic remains the same) ...
-            if reasoning_format not in ["parsed", "raw", "hidden"]:
-                 logger.warning(f"Invalid reasoning_format value '{reasoning_format}'. Ignoring. Valid options: 'parsed', 'raw', 'hidden'.")
-            else:
-                if reasoning_format == "raw" and (using_json_mode or using_tools):
-                     raise ValueError("reasoning_format cannot be 'raw' when using JSON mode or tools. Use 'parsed' or 'hidden'.")
-                api_params["reasoning_format"] = reasoning_format
-                logger.info(f"Setting reasoning_format to '{reasoning_format}'.")
-
-        if using_json_mode:
-            # ... (JSON mode logic remains the same) ...
-            if stream:
-                raise ValueError("Streaming (stream=True) is not supported with JSON mode (json_schema provided).")
-            if using_tools:
-                 raise ValueError("Tool use (tools provided) cannot be combined with JSON mode (json_schema provided) in a single call.")
-            api_params["response_format"] = {"type": "json_object"}
-            schema_str = json.dumps(json_schema.model_json_schema(), indent=2)
-            schema_prompt = f"You MUST output valid JSON conforming to this schema:\n```json\n{schema_str}\n```"
-            found_system = False
-            for i, msg in enumerate(effective_messages):
-                if msg["role"] == "system":
-                    effective_messages[i]["content"] = f"{msg['content']}\n\n{schema_prompt}"
-                    found_system = True
-                    break
-            if not found_system:
-                effective_messages.insert(0, {"role": "system", "content": schema_prompt})
-            logger.info(f"JSON mode enabled. Expecting output conforming to '{json_schema.__name__}'.")
-            api_params["stream"] = False
-
-        elif using_tools:
-            # ... (Tool use logic remains the same) ...
-            if stream:
-                logger.warning("Streaming with tool use. Parsing streamed tool calls can be complex.")
-            api_params["tools"] = tools
-            api_params["tool_choice"] = tool_choice or "auto"
-            api_params["stream"] = stream
-            logger.info(f"Tool use enabled with tool_choice='{api_params['tool_choice']}'.")
+            effective_messages = [*effective_messages, {"role": "assistant", "content": prefill_content}]
+            logger.info("Prefilling assistant message starting with: %r...", prefill_content[:50])
+            if stop is None:
+                stop_token = _prefill_stop_token(prefill_content)
+                if stop_token is not None:
+                    api_params["stop"] = stop_token
+                    logger.info("Automatically setting stop sequence to %r due to prefill format.", stop_token)
 
-        else:
-             if "stream" not in api_params:
-                 api_params["stream"] = stream
+        _apply_reasoning_format(api_params, reasoning_format, mode)
+
+        effective_messages = _MODE_HANDLERS[mode](
+            api_params, effective_messages, json_schema, tools, tool_choice, stream
+        )
 
         api_params["messages"] = effective_messages
-        logger.debug(f"Calling Groq API: Params={api_params}")
+        logger.debug(
+            "Calling Groq API: Model=%s Stream=%s JSONMode=%s Tools=%s Messages=%d",
+            selected_model, api_params["stream"], using_json_mode, using_tools, len(effective_messages)
+        )
+        return api_params
 
-        # --- API Call Execution & Response Handling ---
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 2048,
+        top_p: float = 1.0,
+        stop: Optional[Union[str, List[str]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict]] = None,
+        prefill_content: Optional[str] = None,
+        reasoning_format: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Streams a chat completion as text chunks. Preferred over chat_completion(stream=True):
+        iterate it directly (`async for chunk in adapter.chat_completion_stream(...)`), no extra await needed.
+        With caching enabled, deterministic streams (temperature 0) are buffered and replayed from cache on repeat.
+        JSON mode is not supported; use chat_completion with json_schema instead.
+        """
+        api_params = self._build_params(
+            messages, model, temperature, max_tokens, top_p, stop, True,
+            None, tools, tool_choice, prefill_content, reasoning_format
+        )
+        cache_key: Optional[str] = None
+        if self.cache_enabled and temperature == 0:
+            cache_key = self._build_cache_key(api_params, None)
+            if cache_key:
+                cache_key = f"stream:{cache_key}" # Streams cache joined text, not completion objects
+                cached_text = await self._cache_call(self.response_cache.get, cache_key)
+                if cached_text is not None:
+                    logger.info("Cache hit key=%.12s (replaying stream)", cache_key)
+                    yield cached_text
+                    return
         try:
-            completion = await self.client.chat.completions.create(**api_params)
-            is_streaming = api_params.get("stream", False)
-
-            if is_streaming:
-                logger.info("Streaming response...")
-                return self._handle_stream(completion)
-            elif using_json_mode:
-                logger.info("Processing JSON mode response...")
-                if completion.choices and completion.choices[0].message and completion.choices[0].message.content:
-                    response_content = completion.choices[0].message.content
-                    return self._validate_json_response(response_content, json_schema)
-                else:
-                    logger.error("JSON mode response missing content.")
-                    raise ValueError("Received response suitable for JSON mode, but content was missing.")
-            else:
-                logger.info("Returning non-streamed response object.")
-                if completion.choices and completion.choices[0].message and completion.choices[0].message.tool_calls:
-                     logger.info(f"Response contains tool calls: {completion.choices[0].message.tool_calls}")
-                if completion.choices and completion.choices[0].finish_reason:
-                     logger.info(f"Finish reason: {completion.choices[0].finish_reason}")
-                return completion
-
-        # --- Error Handling ---
-        # ... (Error handling remains the same) ...
+            stream_completion = await self._create_completion(api_params)
         except GroqError as e:
-            logger.error(f"Groq API error: {e.status_code} - {e.message}", exc_info=True)
-            is_streaming_error_context = api_params.get("stream", False) # Use final stream value for context
-            logger.error(f"Failed API call details (limited): Model='{selected_model}', Stream={is_streaming_error_context}, JSONMode={using_json_mode}, Tools={using_tools}")
-            raise
-        except ValidationError as e:
-            logger.error(f"JSON validation failed: {e}", exc_info=True)
-            raw_content = "N/A"
-            if 'completion' in locals() and completion.choices and completion.choices[0].message and completion.choices[0].message.content:
-                 raw_content = completion.choices[0].message.content
-            raise ValueError(f"LLM output failed Pydantic validation for {json_schema.__name__}. Errors: {e}. Raw response: '{raw_content}'") from e
-        except json.JSONDecodeError as e:
-             logger.error(f"Failed to decode JSON response: {e}", exc_info=True)
-             raw_content = "N/A"
-             if 'completion' in locals() and completion.choices and completion.choices[0].message and completion.choices[0].message.content:
-                  raw_content = completion.choices[0].message.content
-             raise ValueError(f"LLM response was not valid JSON. Error: {e}. Raw response: '{raw_content}'") from e
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during Groq API call: {e}", exc_info=True)
+            logger.error("Groq API error: %s - %s", getattr(e, "status_code", None), getattr(e, "message", e), exc_info=True)
+            logger.error("Failed streaming API call details (limited): Model='%s', Tools=%s", api_params["model"], bool(tools))
             raise
+        chunks: Optional[List[str]] = [] if cache_key else None
+        async for chunk in self._handle_stream(stream_completion):
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+        if chunks is not None: # Only reached when the stream completed without error
+            await self._cache_response(cache_key, "".join(chunks), api_params["model"])
+
+    async def chat_completion_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Runs several independent chat_completion calls concurrently.
+        Args:
+            batch: One dict of chat_completion keyword arguments per request.
+            return_exceptions: If True, failed requests yield their exception in the
+                               result list instead of cancelling the whole batch.
+        Returns:
+            Results in the same order as batch.
+        """
+        logger.info("Submitting batch of %d requests (max_concurrency=%d).", len(batch), self.max_concurrency)
+        # Every API request already waits on the adapter's semaphore/rate limiter, so plain gather is safe
+        return await asyncio.gather(
+            *(self.chat_completion(**params) for params in batch),
+            return_exceptions=return_exceptions
+        )
+
+    async def _create_completion(self, api_params: Dict[str, Any]) -> Any:
+        """Issues one API request under the concurrency semaphore and optional rate limiter. Cache hits never get here."""
+        async with self._request_semaphore:
+            if self._rate_limiter is not None:
+                async with self._rate_limiter:
+                    return await self._send_request(api_params)
+            return await self._send_request(api_params)
+
+    async def _send_request(self, api_params: Dict[str, Any]) -> Any:
+        """
+        Sends the request. With orjson installed the body is serialized by orjson and posted as raw bytes
+        (the SDK would encode the whole message history with stdlib json); otherwise, or if the payload
+        holds types orjson cannot encode, the SDK's own create() is used.
+        """
+        if json_utils.HAS_ORJSON:
+            try:
+                body = json_utils.dumps_bytes(api_params)
+            except TypeError:
+                body = None
+            if body is not None:
+                return await self.client.post(
+                    _CHAT_COMPLETIONS_PATH,
+                    cast_to=ChatCompletion,
+                    content=body,
+                    stream=bool(api_params.get("stream", False)),
+                    stream_cls=AsyncStream[ChatCompletionChunk],
+                )
+        return await self.client.chat.completions.create(**api_params)
+
+    def _build_cache_key(self, api_params: Dict[str, Any], json_schema: Optional[Type[BaseModel]]) -> Optional[str]:
+        """Builds the response cache key from the final request parameters. Returns None if not cacheable."""
+        payload = {k: v for k, v in api_params.items() if k != "stream"}
+        payload["json_schema"] = json_schema.__name__ if json_schema else None
+        try:
+            return make_cache_key(payload)
+        except TypeError as e: # Unserializable tool/message content
+            logger.warning("Request is not cacheable, skipping response cache: %s", e)
+            return None
 
+    @staticmethod
+    def _semantic_query(api_params: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        Returns (prompt, context) for the semantic cache: the text of the last user message, and a
+        key over the rest of the request (other messages, including the system prompt, and the
+        sampling params) so near-duplicate prompts only match under the same context.
+        None if there is no user message or the request is not serializable.
+        """
+        messages = api_params["messages"]
+        for i in range(len(messages) - 1, -1, -1):
+            msg = messages[i]
+            if msg.get("role") == "user" and isinstance(msg.get("content"), str):
+                context = {k: v for k, v in api_params.items() if k not in ("messages", "stream")}
+                context["messages"] = messages[:i] + messages[i + 1:]
+                try:
+                    return msg["content"], make_cache_key(context)
+                except TypeError as e: # Unserializable message content
+                    logger.warning("Request is not cacheable, skipping semantic cache: %s", e)
+                    return None
+        return None
+
+    async def _cache_response(self, cache_key: Optional[str], completion: Any, model: Optional[str] = None) -> None:
+        """Stores a completion in the response cache when the call was cacheable."""
+        if cache_key:
+            await self._cache_call(self.response_cache.set, cache_key, completion, model=model)
+            logger.debug("Cached response under key=%.12s", cache_key)
 
     async def _handle_stream(self, stream_completion) -> AsyncGenerator[str, None]:
-        # ... (Stream handling remains the same) ...
+        """Yields the text deltas of a streamed completion, with minimal per-chunk attribute lookups."""
         try:
              async for chunk in stream_completion:
-                 if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                     yield chunk.choices[0].delta.content
+                 choices = chunk.choices
+                 if not choices:
+                     continue
+                 delta = choices[0].delta
+                 content = delta.content if delta else None
+                 if content:
+                     yield content
         except Exception as e:
-            logger.error(f"Error during stream processing: {e}", exc_info=True)
+            logger.error("Error during stream processing: %s", e, exc_info=True)
             raise
         finally:
              logger.info("Stream processing finished or encountered an error.")
 
 
-    def _validate_json_response(self, response_content: str, json_schema: Type[BaseModel]) -> BaseModel:
-         # ... (JSON validation remains the same) ...
-        try:
-            logger.debug(f"Raw JSON received for validation:\n{response_content}")
-            validated_data = json_schema.model_validate_json(response_content)
-            logger.info(f"Successfully validated JSON response against '{json_schema.__name__}'.")
-            return validated_data
-        except (ValidationError, json.JSONDecodeError) as e:
-            raise e
+    async def collect_stream(self, stream: AsyncGenerator[str, None]) -> str:
+        """
+        Materializes a streamed response into a single string.
+        This is the canonical way to get the full text of a stream: chunks are gathered
+        in a list and joined once, instead of repeated string concatenation at call sites.
+        """
+        chunks: List[str] = []
+        async for chunk in stream:
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    async def _validate_json_response(self, response_content: str, json_schema: Type[BaseModel]) -> BaseModel:
+        """
+        Validates a JSON-mode response against json_schema.
+        Large responses are validated in a worker thread so the event loop keeps serving other calls;
+        small ones inline, where the thread hop would cost more than the parse.
+        """
+        if len(response_content) > self.validation_offload_threshold:
+            return await asyncio.to_thread(self._validate_json_response_sync, response_content, json_schema)
+        return self._validate_json_response_sync(response_content, json_schema)
+
+    def _validate_json_response_sync(self, response_content: str, json_schema: Type[BaseModel]) -> BaseModel:
+        """
+        Parses and validates response_content in one pass with model_validate_json (no intermediate dict).
+        That beats orjson.loads + model_validate even for ~65-byte plans (1.3 vs 1.7 us), and more so for
+        large batch responses. Raises ValidationError on bad output, including malformed JSON.
+        """
+        logger.debug("Raw JSON received for validation:\n%s", response_content)
+        validated_data = json_schema.model_validate_json(response_content)
+        logger.info("Successfully validated JSON response against '%s'.", json_schema.__name__)
+        return validated_data
 
 # --- NO EXAMPLE CODE BELOW THIS LINE ---
 # The _run_adapter_examples function and the
@@ -0,0 +1,253 @@
+# src/adapters/response_cache.py
+"""
+Caches for deterministic LLM responses, used by GroqAdapter.
+ResponseCache is in-memory; SQLiteResponseCache persists to disk so hits survive restarts
+and are shared between processes. Both are bounded by an LRU entry limit and an optional TTL.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from groq.types.chat import ChatCompletion
+from pydantic import ValidationError
+
+from src.utils import json_utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_RESPONSE_CACHE_PATH = os.path.join("data", "response_cache.db")
+ACCESS_UPDATE_INTERVAL_SECONDS = 60.0 # SQLite LRU stamps are only refreshed when older than this
+
+# Payload kinds stored by SQLiteResponseCache
+_KIND_TEXT = "text" # Joined stream text
+_KIND_COMPLETION = "completion" # ChatCompletion, stored as its JSON dump
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """
+    Builds a content-addressable key from the request payload.
+    Keys are sorted so logically identical requests hash the same.
+    Raises TypeError if the payload is not JSON serializable.
+    """
+    return hashlib.sha256(json_utils.dumps_bytes(payload, sort_keys=True)).hexdigest()
+
+
+class ResponseCache:
+    """
+    Maps request keys to API responses (the raw completion object, or joined text for streams).
+    Only deterministic requests should be stored; the adapter decides what is cacheable.
+
+    Entries are evicted least-recently-used once max_entries is reached, and expire
+    after ttl_seconds when a TTL is set. Each entry remembers its model so a model
+    upgrade can purge stale answers with invalidate_by_model().
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, model, created monotonic time); ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[str], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached response for key, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[2] > self.ttl_seconds:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, model: Optional[str] = None) -> None:
+        """Stores a response under key, evicting the least recently used entry when full."""
+        self._entries[key] = (value, model, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logger.debug("Evicted response cache entry key=%.12s", evicted_key)
+
+    def invalidate_by_model(self, model: str) -> int:
+        """Drops every entry produced by model. Returns the number of entries removed."""
+        stale_keys = [key for key, (_, entry_model, _) in self._entries.items() if entry_model == model]
+        for key in stale_keys:
+            del self._entries[key]
+        logger.info("Invalidated %d cached response(s) for model '%s'.", len(stale_keys), model)
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Drops all cached responses."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache:
+    """
+    SQLite-backed drop-in for ResponseCache (same get/set/invalidate_by_model interface).
+    The database runs in WAL mode so several adapter processes can share one file.
+    Payloads are zlib-compressed; completions are stored as JSON and re-validated on read.
+    Cache errors are logged and treated as misses; they never fail an API call.
+
+    LRU order is kept in an accessed column and TTL is checked against wall-clock
+    creation time, since entries outlive the process that wrote them. Hits do not write:
+    stale access stamps are queued and saved with the next set() or close().
+    Calls are serialized by a lock, so the cache may be used from worker threads.
+    """
+    def __init__(
+        self,
+        db_path: str = DEFAULT_RESPONSE_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        dir_name = os.path.dirname(db_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {} # key -> access time not yet written
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, model TEXT, kind TEXT NOT NULL, payload BLOB NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        logger.info("SQLiteResponseCache opened at: %s", db_path)
+
+    @staticmethod
+    def _encode(value: Any) -> Tuple[str, bytes]:
+        """Returns (kind, compressed payload) for a cacheable response."""
+        if isinstance(value, str):
+            return _KIND_TEXT, zlib.compress(value.encode("utf-8"))
+        return _KIND_COMPLETION, zlib.compress(value.model_dump_json().encode("utf-8"))
+
+    @staticmethod
+    def _decode(kind: str, payload: bytes) -> Any:
+        """Inverse of _encode."""
+        raw = zlib.decompress(payload)
+        if kind == _KIND_TEXT:
+            return raw.decode("utf-8")
+        return ChatCompletion.model_validate_json(raw)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached response for key, or None on a miss, expired entry or cache error."""
+        now = time.time()
+        with self._lock:
+            try:
+                if self.ttl_seconds is not None:
+                    row = self._conn.execute(
+                        "SELECT kind, payload, accessed FROM response_cache WHERE key = ? AND created > ?",
+                        (key, now - self.ttl_seconds),
+                    ).fetchone()
+                else:
+                    row = self._conn.execute(
+                        "SELECT kind, payload, accessed FROM response_cache WHERE key = ?", (key,)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Response cache lookup failed: %s", e)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            kind, payload, accessed = row
+            try:
+                value = self._decode(kind, payload)
+            except (zlib.error, UnicodeDecodeError, ValidationError) as e:
+                logger.warning("Discarding unreadable cached response key=%.12s: %s", key, e)
+                self.misses += 1
+                return None
+            if now - accessed > ACCESS_UPDATE_INTERVAL_SECONDS:
+                self._pending_access[key] = now
+            self.hits += 1
+            return value
+
+    def _write_pending_access(self) -> None:
+        """Saves queued access stamps. Caller holds the lock and commits."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE response_cache SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def set(self, key: str, value: Any, model: Optional[str] = None) -> None:
+        """Stores a response under key, evicting least recently used entries beyond max_entries."""
+        now = time.time()
+        kind, payload = self._encode(value)
+        with self._lock:
+            try:
+                self._write_pending_access() # Eviction below must see current LRU order
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, model, kind, payload, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, kind, payload, now, now),
+                )
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "DELETE FROM response_cache WHERE key IN "
+                        "(SELECT key FROM response_cache ORDER BY accessed LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+                    logger.debug("Evicted %d least recently used response cache entries.", count - self.max_entries)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.warning("Response cache store failed: %s", e)
+
+    def invalidate_by_model(self, model: str) -> int:
+        """Drops every entry produced by model. Returns the number of entries removed."""
+        with self._lock:
+            try:
+                removed = self._conn.execute("DELETE FROM response_cache WHERE model = ?", (model,)).rowcount
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Response cache invalidation failed: %s", e)
+                return 0
+        logger.info("Invalidated %d cached response(s) for model '%s'.", removed, model)
+        return removed
+
+    def clear(self) -> None:
+        """Drops all cached responses."""
+        with self._lock:
+            try:
+                self._pending_access.clear()
+                self._conn.execute("DELETE FROM response_cache")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Response cache clear failed: %s", e)
+
+    def close(self) -> None:
+        """Saves queued access stamps and closes the underlying SQLite connection."""
+        with self._lock:
+            try:
+                self._write_pending_access()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Response cache access stamps were not saved: %s", e)
+            finally:
+                self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()
+        return count
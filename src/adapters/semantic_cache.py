@@ -0,0 +1,111 @@
+# src/adapters/semantic_cache.py
+"""
+Optional semantic (embedding-similarity) cache tier for GroqAdapter.
+Serves a previous response when a new prompt is a near-duplicate of one already answered.
+Requires sentence-transformers and faiss (pip install sentence-transformers faiss-cpu);
+without them the cache reports itself unavailable and the adapter skips it.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError: # Optional dependencies; the semantic tier is disabled without them
+    faiss = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_SIMILARITY_THRESHOLD = 0.90
+
+# Politeness/filler phrases that do not change what is being asked
+_FILLER_PATTERN = re.compile(r"\b(please|kindly|can you|could you|would you|i want you to)\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def canonicalize_prompt(prompt: str) -> str:
+    """Lowercases a prompt, drops filler phrases and collapses whitespace before embedding."""
+    text = _FILLER_PATTERN.sub(" ", prompt.lower())
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+class SemanticCache:
+    """
+    Cosine-similarity lookup over previously answered prompts (FAISS inner-product index
+    over normalized embeddings). Prompts are partitioned by model and context (a key for
+    everything in the request except the prompt: system prompt, sampling params, ...), with
+    one index per partition, so a hit requires the same model and context and similarity >= threshold.
+    Embedding is CPU-bound; callers on the event loop should run lookup/add in a worker thread.
+    lookup/add are thread-safe.
+    """
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL
+    ):
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self.available = faiss is not None and SentenceTransformer is not None
+        if not self.available:
+            logger.warning("Semantic cache requested but sentence-transformers/faiss are not installed. Semantic tier disabled.")
+        self._encoder = None # Loaded lazily on first use (model load is slow)
+        # (model, context) -> (index, responses); row i of the index -> responses[i]
+        self._partitions: Dict[Tuple[str, str], Tuple[Any, List[Any]]] = {}
+        # Guards the lazy encoder load and every index search/add: FAISS indexes are not safe to
+        # search and add to concurrently, and a row must be added together with its response
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, prompt: str):
+        """Returns the normalized embedding of the canonicalized prompt as a 1 x dim float32 array."""
+        with self._lock:
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(self.embedding_model)
+            encoder = self._encoder
+        return encoder.encode(
+            [canonicalize_prompt(prompt)], normalize_embeddings=True, convert_to_numpy=True
+        ).astype("float32")
+
+    def lookup(self, prompt: str, model: str, context: str = "") -> Optional[Any]:
+        """Returns the stored response of the most similar prior prompt for model and context, or None."""
+        if not self.available or (model, context) not in self._partitions:
+            self.misses += 1
+            return None
+        embedding = self._embed(prompt)
+        with self._lock:
+            index, responses = self._partitions[(model, context)]
+            # Every row in the partition is a candidate, so only the nearest neighbour matters
+            scores, ids = index.search(embedding, 1)
+            score, idx = scores[0][0], ids[0][0]
+            if idx < 0 or score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            response = responses[idx]
+        logger.info("Semantic cache hit (similarity=%.3f).", score)
+        return response
+
+    def add(self, prompt: str, model: str, response: Any, context: str = "") -> None:
+        """Indexes prompt and remembers the response produced for it by model under context."""
+        if not self.available:
+            return
+        embedding = self._embed(prompt) # Also loads the encoder on first use
+        with self._lock:
+            partition = self._partitions.get((model, context))
+            if partition is None:
+                partition = self._partitions[(model, context)] = (
+                    faiss.IndexFlatIP(self._encoder.get_sentence_embedding_dimension()), []
+                )
+            index, responses = partition
+            index.add(embedding)
+            responses.append(response)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(responses) for _, responses in self._partitions.values())
@@ -2,8 +2,22 @@
 
 import logging
 import asyncio
+import functools
+import hashlib
 import os
-from typing import Dict, Optional, List, Literal, Tuple
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, List, Literal, Set, Tuple, TypeVar, Union
+
+try:
+    from blake3 import blake3 as _content_hasher
+except ImportError: # blake3 is optional; hashlib's BLAKE2 is the fallback
+    _content_hasher = functools.partial(hashlib.blake2b, digest_size=32)
 
 from src.adapters.groq_adapter import GroqAdapter
 from src.models.word_action_plan import WordActionPlan
@@ -21,222 +35,792 @@ from src.models.apply_patch_result import ApplyPatchResult # <-- Added for Phase
 from src.tools.patch_tool import (
     text_to_patch,
     patch_to_commit,
-    apply_commit,
+    apply_commit_async,
     identify_files_needed,
     DiffError # Import the specific error type
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
+# Logging is configured by the application entry point, not at import time
 logger = logging.getLogger(__name__)
 
+DEFAULT_FLUSH_SIZE = 64
+DEFAULT_BIN_FLUSH_LINES = 32 # Buffered bin appends are written once this many words are pending
+FILE_CACHE_MAX_ENTRIES = 128 # LRU bounds for memoized full-file reads
+FILE_CACHE_MAX_CHARS = 64 * 1024 * 1024
+
+T = TypeVar("T")
+
+# Overall patch outcome by (any file errored, any file succeeded) -> (status, message, log level)
+_PATCH_OUTCOMES: Dict[Tuple[bool, bool], Tuple[Literal["Success", "Failure", "Partial Success"], str, int]] = {
+    (True, True): ("Partial Success", "Patch applied with some errors.", logging.WARNING),
+    (True, False): ("Failure", "Patch application failed for all targeted files.", logging.ERROR),
+    (False, True): ("Success", "Patch applied successfully to all targeted files.", logging.INFO),
+    # No errors, no successes (e.g., empty patch): no errors occurred, so this is a success
+    (False, False): ("Success", "Patch application completed without errors (no changes might have been needed).", logging.INFO),
+}
+
+
+def _content_digest(data: Union[bytes, bytearray]) -> bytes:
+    """Content hash used to detect no-op writes (BLAKE3 when installed, else BLAKE2b)."""
+    return _content_hasher(data).digest()
+
+
+class _LineMap(Mapping):
+    """
+    Read-only {1-based line number: line} view of a file's content.
+    Lines are only split on first access, so reads whose line map is never used
+    (e.g. patch loading) skip building it. Pydantic turns it into a plain dict
+    when it is placed in a FileContentResult.
+    """
+    __slots__ = ("_content", "_lines")
+
+    def __init__(self, content: str):
+        self._content = content
+        self._lines: Optional[List[str]] = None
+
+    def _line_list(self) -> List[str]:
+        if self._lines is None:
+            self._lines = self._content.splitlines() # Splits lines, removes trailing newlines from strings
+        return self._lines
+
+    def __getitem__(self, line_number: int) -> str:
+        lines = self._line_list()
+        if type(line_number) is int and 1 <= line_number <= len(lines):
+            return lines[line_number - 1]
+        raise KeyError(line_number)
+
+    def __len__(self) -> int:
+        return len(self._line_list())
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, len(self._line_list()) + 1))
+
+    def items(self):
+        return enumerate(self._line_list(), start=1)
+
+    def values(self):
+        return iter(self._line_list())
+
+
+class BufferedExecution:
+    """
+    Accumulates add plans and executes them in batches.
+    Obtained from ExecutorAgent.buffered_execution(); results are kept in submission order.
+    Plans are only applied on flush, so a later check in the same block will not see a buffered add.
+    """
+    def __init__(self, executor: "ExecutorAgent", flush_size: int = DEFAULT_FLUSH_SIZE):
+        self._executor = executor
+        self.flush_size = flush_size
+        self._buffer: List[WordActionPlan] = []
+        self.results: List[ExecutionResult] = []
+
+    async def try_execute(self, plan: WordActionPlan) -> None:
+        """Buffers plan, flushing the batch once flush_size plans are pending."""
+        self._buffer.append(plan)
+        if len(self._buffer) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> List[ExecutionResult]:
+        """Executes all pending plans in order. Returns the results of this batch."""
+        if not self._buffer:
+            return []
+        batch, self._buffer = self._buffer, []
+        logger.debug("Flushing %d buffered add plan(s).", len(batch))
+        # Adds are synchronous file operations; one tight loop beats scheduling a task per plan
+        batch_results = [self._executor.execute_add_sync(plan) for plan in batch]
+        await self._executor.flush_all() # Batch boundary: put the added words on disk
+        self.results.extend(batch_results)
+        return batch_results
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+
 class ExecutorAgent:
     """
     Agent responsible for executing specific actions based on a received plan.
     Manages bin files and performs file operations via internal tools.
     """
-    def __init__(self, adapter: GroqAdapter, model_id: str, data_dir: str = "data"):
+    def __init__(
+        self,
+        adapter: GroqAdapter,
+        model_id: str,
+        data_dir: str = "data",
+        io_workers: Optional[int] = None,
+        bin_flush_lines: int = DEFAULT_BIN_FLUSH_LINES,
+        resume_bins: bool = False
+    ):
+        """
+        Args:
+            adapter: Shared GroqAdapter (reserved for future LLM use in the executor).
+            model_id: Model ID reserved for future LLM use in the executor.
+            data_dir: Directory holding the bin files.
+            io_workers: If set, file I/O runs on a dedicated pool of this many long-lived threads
+                        instead of asyncio's default executor, so patch reads/writes never queue
+                        behind other work offloaded by the process (e.g. JSON validation).
+                        Call close() to shut the pool down.
+            bin_flush_lines: Added words are buffered in memory and appended to their bin file in
+                             one write once this many are pending. Checks see buffered words
+                             immediately; call flush_bins() (or close()) before reading the bin
+                             files directly. 1 writes every word as it is added.
+            resume_bins: If True, existing bin files are kept and replayed into the in-memory
+                         word sets at startup instead of being truncated for a fresh run.
+        """
         self.adapter = adapter
         self.model_id = model_id # Store for potential future LLM use in executor
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        if io_workers:
+            self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="executor-io")
 
+        # Keys are interned, as are validated plan bin names, so plan lookups hit the identity fast path
         self.bin_files = {
-            "Vowel Bin": os.path.join(self.data_dir, "vowel_bin.txt"),
-            "Consonant Bin": os.path.join(self.data_dir, "consonant_bin.txt")
+            sys.intern("Vowel Bin"): os.path.join(self.data_dir, "vowel_bin.txt"),
+            sys.intern("Consonant Bin"): os.path.join(self.data_dir, "consonant_bin.txt")
         }
-        logger.info(f"ExecutorAgent initialized. Using bin files: {self.bin_files}")
+        # Bin files stay open for appending for the agent's lifetime: path -> raw O_APPEND fd
+        self._bin_fds: Dict[str, int] = {}
+        # Authoritative word sets of the managed bins: path -> words. The bin files are their
+        # append-only on-disk log, written in batches; checks never touch the disk.
+        self._bin_sets: Dict[str, Set[str]] = {}
+        # The same sets keyed by bin name, so check plans resolve without a file-path hop
+        self._bin_index: Dict[str, Set[str]] = {}
+        # Parsed contents of other word files: path -> (st_mtime_ns, st_size, words); stale once the stat changes
+        self._bin_cache: Dict[str, Tuple[int, int, Set[str]]] = {}
+        # Last known file contents: path -> (st_mtime_ns, st_size, digest), from full reads and writes
+        self._content_hashes: Dict[str, Tuple[int, int, bytes]] = {}
+        # Memoized full reads and text writes: path -> (st_mtime_ns, st_size, content, lines_dict), least recently used first.
+        # Guarded by a lock because batched patch reads fill it from several worker threads.
+        self._file_cache: "OrderedDict[str, Tuple[int, int, str, Mapping[int, str]]]" = OrderedDict()
+        self._file_cache_chars = 0
+        self._file_cache_lock = threading.Lock()
+        # Added words not yet written: path -> words, in add order
+        self._pending_appends: Dict[str, List[str]] = {}
+        # At most one flush_all() write in flight, so batches for a bin reach its file in order
+        self._flush_lock = asyncio.Lock()
+        self.bin_flush_lines = bin_flush_lines
+        self.resume_bins = resume_bins
+        logger.info("ExecutorAgent initialized. Using bin files: %s", self.bin_files)
         self._initialize_bin_files() # Ensure files are ready
 
     def _initialize_bin_files(self):
-        """Ensures bin files exist and are empty for a fresh run."""
-        logger.debug("Initializing/clearing bin files...")
+        """
+        Opens the bin files for appending and sets up their in-memory word sets. Bins are
+        truncated for a fresh run, or replayed from disk when resume_bins is set.
+        """
+        logger.debug("Initializing bin files (resume=%s)...", self.resume_bins)
+        open_flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if not self.resume_bins:
+            open_flags |= os.O_TRUNC
         try:
-            for file_path in self.bin_files.values():
-                with open(file_path, 'w') as f: pass # Create/truncate
-            logger.debug("Bin files initialized/cleared.")
-        except OSError as e:
+            for bin_name, file_path in self.bin_files.items():
+                # Raw fd, no TextIOWrapper/BufferedWriter layers; O_APPEND writes land at the true end of file
+                fd = self._bin_fds[file_path] = os.open(file_path, open_flags, 0o644)
+                # Fresh run: the truncated file and its empty set agree
+                words = self._replay_bin_log(file_path, fd) if self.resume_bins else set()
+                self._bin_sets[file_path] = self._bin_index[bin_name] = words
+            logger.debug("Bin files initialized.")
+        except (OSError, UnicodeDecodeError) as e:
             logger.error(f"Error initializing bin files: {e}", exc_info=True)
 
+    def _replay_bin_log(self, file_path: str, fd: int) -> Set[str]:
+        """Rebuilds a bin's word set from its file, the append-only log of every word added to it."""
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if data and not data.endswith(b'\n'):
+            os.write(fd, b'\n') # Terminate a torn last line so the next append starts a line of its own
+        words = set(filter(None, map(str.strip, data.decode('utf-8').splitlines())))
+        logger.debug("Replayed %d words from %s", len(words), file_path)
+        return words
+
+    async def _run_io(self, func: Callable[..., T], *args: Any) -> T:
+        """Runs blocking file I/O off the event loop, on the dedicated I/O pool when configured."""
+        if self._io_pool is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, func, *args)
+
+    def close(self) -> None:
+        """
+        Writes any buffered bin appends, shuts down the dedicated I/O pool (if any) after
+        in-flight file operations finish, and closes the open bin file descriptors.
+        """
+        try:
+            self.flush_bins()
+        finally:
+            try:
+                if self._io_pool is not None:
+                    self._io_pool.shutdown(wait=True)
+                    self._io_pool = None
+            finally:
+                fds = list(self._bin_fds.values())
+                self._bin_fds.clear()
+                for fd in fds:
+                    os.close(fd)
+
+    async def aclose(self) -> None:
+        """
+        Async close(): buffered bin appends are written off the event loop first.
+        Holds the flush lock throughout, so a flush already in flight finishes before teardown.
+        """
+        async with self._flush_lock:
+            await self._flush_detached_batches()
+            self.close()
+
+    async def __aenter__(self) -> "ExecutorAgent":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
     # --- Internal Tool Methods ---
 
     def _read_bin_file(self, file_path: str) -> list[str]:
         """Reads all lines from a bin file, strips whitespace, and returns them."""
         lines = []
         try:
-            if not os.path.exists(file_path):
-                 logger.warning(f"File not found during read: {file_path}. Returning empty list.")
-                 return []
-            with open(file_path, 'r') as f:
-                lines = [line.strip() for line in f if line.strip()]
-            logger.debug(f"Read {len(lines)} lines from {file_path}")
-        except OSError as e:
-            logger.error(f"Error reading file {file_path}: {e}", exc_info=True)
+            # One raw read and one decode; splitting, stripping and dropping blank lines all run in C
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            lines = list(filter(None, map(str.strip, data.decode('utf-8').splitlines())))
+            logger.debug("Read %d lines from %s", len(lines), file_path)
+        except FileNotFoundError:
+            logger.warning(f"File not found during read: {file_path}. Returning empty list.")
+            return []
+        except (OSError, UnicodeDecodeError) as e:
+            # Routine I/O failures (here and in the other file tools) log without exc_info: the message
+            # already names the path and errno. Only the unexpected-error catch-alls capture tracebacks
+            logger.error(f"Error reading file {file_path}: {e}")
             return []
         return lines
 
+    def _bin_words(self, file_path: str) -> Set[str]:
+        """
+        Returns the set of words in a bin file. Managed bins are answered from memory; other files
+        are re-read only when their mtime or size changed. A missing or unreadable file yields an
+        empty set and is not cached.
+        """
+        bin_set = self._bin_sets.get(file_path)
+        if bin_set is not None:
+            return bin_set
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self._bin_cache.pop(file_path, None)
+            return set(self._read_bin_file(file_path)) # Logs the missing file
+        cached = self._bin_cache.get(file_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        words = set(self._read_bin_file(file_path))
+        words.update(self._pending_appends.get(file_path, ())) # Added but not yet flushed
+        self._bin_cache[file_path] = (st.st_mtime_ns, st.st_size, words)
+        return words
+
     def _find_word_in_file(self, word: str, file_path: str) -> bool:
         """Checks if a specific word exists in the given file."""
-        logger.debug(f"Checking for word '{word}' in file {file_path}")
-        lines = self._read_bin_file(file_path)
-        found = word in lines
-        logger.debug(f"Word '{word}' found in {file_path}: {found}")
+        logger.debug("Checking for word '%s' in file %s", word, file_path)
+        found = word in self._bin_words(file_path)
+        logger.debug("Word '%s' found in %s: %s", word, file_path, found)
         return found
 
-    def _append_word_to_file(self, word: str, file_path: str) -> bool:
-        """Appends a word as a new line to the specified file."""
-        logger.debug(f"Appending word '{word}' to file {file_path}")
-        try:
-            with open(file_path, 'a') as f:
-                f.write(word + '\n')
-            logger.debug(f"Successfully appended '{word}' to {file_path}")
+    def _append_word_to_file(self, word: str, file_path: str, flush_inline: bool = True) -> bool:
+        """
+        Adds a word to the specified bin. The word is visible to checks at once; the file
+        write is buffered and happens in one append once bin_flush_lines words are pending.
+        With flush_inline=False the caller flushes instead (see _flush_due()).
+        Returns False only if a triggered flush fails.
+        """
+        logger.debug("Buffering word '%s' for file %s", word, file_path)
+        pending = self._pending_appends.setdefault(file_path, [])
+        pending.append(word)
+        bin_set = self._bin_sets.get(file_path)
+        if bin_set is not None:
+            bin_set.add(word)
+        else:
+            cached = self._bin_cache.get(file_path)
+            if cached is not None:
+                cached[2].add(word) # Disk stat is unchanged until the flush, so the entry stays valid
+        if flush_inline and len(pending) >= self.bin_flush_lines:
+            return self._flush_bin(file_path)
+        return True
+
+    def _add_word_if_missing(self, word: str, file_path: str, flush_inline: bool = True) -> Tuple[bool, bool]:
+        """
+        Adds word to the bin unless it is already there, with a single cached-set lookup.
+        Returns (was_added, was_present); (False, False) means the append failed.
+        """
+        if word in self._bin_words(file_path):
+            return False, True
+        return self._append_word_to_file(word, file_path, flush_inline), False
+
+    def _flush_due(self) -> bool:
+        """True if any bin has reached bin_flush_lines buffered words."""
+        return any(len(pending) >= self.bin_flush_lines for pending in self._pending_appends.values())
+
+    def _flush_bin(self, file_path: str) -> bool:
+        """Appends all buffered words for one bin file in a single write. Returns True on success."""
+        pending = self._pending_appends.pop(file_path, None)
+        if not pending:
             return True
+        data = self._encode_bin_batch(pending)
+        return self._finish_bin_flush(file_path, pending, len(data), self._write_bin_data(file_path, data))
+
+    @staticmethod
+    def _encode_bin_batch(words: List[str]) -> bytes:
+        """One line per word, as the bin files store them."""
+        return ('\n'.join(words) + '\n').encode('utf-8')
+
+    def _write_bin_data(self, file_path: str, data: bytes) -> Tuple[bool, Optional[os.stat_result]]:
+        """
+        Appends encoded words to a bin file. Reads no buffered state, so flush_all() runs it in a
+        worker thread. Returns (success, the file's stat after the write); the stat is only taken
+        for files without an open fd (the ones _bin_cache tracks) and is None otherwise or on error.
+        """
+        try:
+            fd = self._bin_fds.get(file_path)
+            if fd is not None:
+                # Reuse the fd opened at init: no open/close or Python I/O stack per flush
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):] # os.write may write partially
+                return True, None
+            with open(file_path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                return True, os.fstat(f.fileno())
         except OSError as e:
-            logger.error(f"Error appending word '{word}' to file {file_path}: {e}", exc_info=True)
+            logger.error(f"Error appending {len(data)} bytes of buffered words to file {file_path}: {e}")
+            return False, None
+
+    def _finish_bin_flush(self, file_path: str, words: List[str], size: int, outcome: Tuple[bool, Optional[os.stat_result]]) -> bool:
+        """Records the outcome of writing a detached batch of words. Runs on the caller's (event loop) thread."""
+        ok, st = outcome
+        if not ok:
+            # Put the batch back ahead of newer adds so a later flush can retry it in order
+            self._pending_appends.setdefault(file_path, [])[:0] = words
             return False
-
-    def _read_file_content(self, file_path: str) -> Tuple[Optional[str], Optional[Dict[int, str]]]:
-        """Reads the entire content of a file, returning it as a string and a line-number dict."""
-        logger.debug(f"Attempting to read content and lines from: {file_path}")
+        logger.debug("Appended %d buffered word(s) to %s", len(words), file_path)
+        cached = self._bin_cache.get(file_path)
+        if cached is not None:
+            # Re-key the cached set to the new stat instead of re-reading, unless the size shows
+            # someone else also wrote to the file (then let the next check re-read it)
+            if st is not None and st.st_size == cached[1] + size:
+                self._bin_cache[file_path] = (st.st_mtime_ns, st.st_size, cached[2])
+            else:
+                del self._bin_cache[file_path]
+        return True
+
+    async def flush_all(self) -> bool:
+        """
+        Awaitable flush_bins() that writes the buffered appends off the event loop.
+        The batches are detached here, on the event loop, before the write starts: adds made while
+        it runs begin new batches, and only the encoded bytes are handed to the worker thread.
+        Concurrent calls queue on a lock and run one at a time.
+        """
+        async with self._flush_lock:
+            return await self._flush_detached_batches()
+
+    async def _flush_detached_batches(self) -> bool:
+        """Body of flush_all(). Caller holds _flush_lock."""
+        batches = [(file_path, words) for file_path, words in self._pending_appends.items() if words]
+        if not batches:
+            return True
+        self._pending_appends = {}
+        encoded = [(file_path, self._encode_bin_batch(words)) for file_path, words in batches]
+        outcomes = await self._run_io(self._write_bin_batches, encoded)
+        return all([
+            self._finish_bin_flush(file_path, words, len(data), outcome)
+            for (file_path, words), (_, data), outcome in zip(batches, encoded, outcomes)
+        ])
+
+    def _write_bin_batches(self, encoded: List[Tuple[str, bytes]]) -> List[Tuple[bool, Optional[os.stat_result]]]:
+        """Writes several detached batches in one worker-thread hop."""
+        return [self._write_bin_data(file_path, data) for file_path, data in encoded]
+
+    def flush_bins(self) -> bool:
+        """Writes all buffered bin appends to disk. Returns True if every bin flushed successfully."""
+        results = [self._flush_bin(file_path) for file_path in list(self._pending_appends)]
+        return all(results)
+
+    def _read_file_content(self, file_path: str, max_bytes: Optional[int] = None) -> Tuple[Optional[str], Optional[Mapping[int, str]]]:
+        """
+        Reads the content of a file, returning it as a string and a lazy line-number mapping.
+        If max_bytes is set, only the first max_bytes bytes are read (preview mode).
+        """
+        logger.debug("Attempting to read content and lines from: %s", file_path)
         content: Optional[str] = None
-        lines_dict: Optional[Dict[int, str]] = None
-        
-        if not os.path.exists(file_path):
-            logger.error(f"File not found for reading: {file_path}")
-            return None, None # Return tuple on failure
-            
+        lines_dict: Optional[Mapping[int, str]] = None
+
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Generate line-numbered dictionary
-            lines_list = content.splitlines() # Splits lines, removes trailing newlines from strings
-            lines_dict = {i + 1: line for i, line in enumerate(lines_list)}
-            
-            logger.debug(f"Successfully read {len(content)} characters and {len(lines_dict)} lines from {file_path}.")
+            if max_bytes is not None:
+                # Preview read: avoid materializing the whole file when only a prefix is needed.
+                # A multi-byte character cut at the boundary is decoded as U+FFFD.
+                with open(file_path, 'rb') as f:
+                    data = f.read(max_bytes)
+                content = data.decode('utf-8', errors='replace')
+            else:
+                cached = self._cached_file_content(file_path)
+                if cached is not None:
+                    logger.debug("Serving unchanged file from read cache: %s", file_path)
+                    return cached
+                # Unbuffered read straight into one buffer sized from fstat, then a single decode:
+                # no BufferedReader/TextIOWrapper copies or incremental decoder state
+                with open(file_path, 'rb', buffering=0) as f:
+                    st = os.fstat(f.fileno())
+                    data = bytearray(st.st_size)
+                    view = memoryview(data)
+                    offset = 0
+                    while offset < st.st_size:
+                        n = f.readinto(view[offset:])
+                        if not n:
+                            break # File shrank since fstat
+                        offset += n
+                    view.release()
+                del data[offset:]
+                content = data.decode('utf-8')
+                if '\r' in content:
+                    # Universal newlines, as text-mode reads did
+                    content = content.replace('\r\n', '\n').replace('\r', '\n')
+                elif offset == st.st_size: # Hash only reads that match the file byte for byte
+                    self._content_hashes[file_path] = (st.st_mtime_ns, st.st_size, _content_digest(data))
+
+            # Line-numbered view; split lazily on first use
+            lines_dict = _LineMap(content)
+            if max_bytes is None:
+                self._store_file_content(file_path, st, content, lines_dict)
+
+            logger.debug("Successfully read %d characters from %s.", len(content), file_path)
             return content, lines_dict # Return tuple on success
-            
+
+        except FileNotFoundError:
+            logger.error(f"File not found for reading: {file_path}")
+            return None, None # Return tuple on failure
         except (OSError, UnicodeDecodeError) as e:
-            logger.error(f"Error reading file content from {file_path}: {e}", exc_info=True)
+            logger.error(f"Error reading file content from {file_path}: {e}")
             return None, None # Return tuple on failure
         except Exception as e:
             logger.error(f"Unexpected error reading file {file_path}: {e}", exc_info=True)
             return None, None # Return tuple on failure
 
-    def _write_file_content(self, file_path: str, content: str) -> bool:
-        """Writes the given content to the file, overwriting existing content."""
-        logger.debug(f"Attempting to write {len(content)} characters to: {file_path}")
+    def _cached_file_content(self, file_path: str) -> Optional[Tuple[str, Mapping[int, str]]]:
+        """Returns the memoized (content, lines_dict) of a full read if the file's mtime and size are unchanged."""
+        st = os.stat(file_path)
+        with self._file_cache_lock:
+            entry = self._file_cache.get(file_path)
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                return None
+            self._file_cache.move_to_end(file_path)
+            return entry[2], entry[3]
+
+    def _store_file_content(self, file_path: str, st: os.stat_result, content: str, lines_dict: Mapping[int, str]) -> None:
+        """Memoizes a full read, evicting least recently used entries beyond the entry and size bounds."""
+        if len(content) > FILE_CACHE_MAX_CHARS:
+            return
+        with self._file_cache_lock:
+            self._discard_cached_file_locked(file_path)
+            self._file_cache[file_path] = (st.st_mtime_ns, st.st_size, content, lines_dict)
+            self._file_cache_chars += len(content)
+            while len(self._file_cache) > FILE_CACHE_MAX_ENTRIES or self._file_cache_chars > FILE_CACHE_MAX_CHARS:
+                _, evicted = self._file_cache.popitem(last=False)
+                self._file_cache_chars -= len(evicted[2])
+
+    def _invalidate_cached_file(self, file_path: str) -> None:
+        """Drops the memoized read of file_path, if any."""
+        with self._file_cache_lock:
+            self._discard_cached_file_locked(file_path)
+
+    def _discard_cached_file_locked(self, file_path: str) -> None:
+        entry = self._file_cache.pop(file_path, None)
+        if entry is not None:
+            self._file_cache_chars -= len(entry[2])
+
+    def _iter_file_lines(self, file_path: str, bufsize: int = 8192) -> Iterator[str]:
+        """
+        Yields the lines of a file (without line endings) through a small read buffer,
+        so callers can stop at the first match instead of loading the whole file.
+        Raises OSError/UnicodeDecodeError to the caller.
+        """
+        with open(file_path, 'r', encoding='utf-8', buffering=bufsize) as f:
+            for line in f:
+                yield line.rstrip('\r\n')
+
+    def _write_file_content(self, file_path: str, content: Union[str, bytes]) -> bool:
+        """Writes the given content to the file, overwriting existing content. Returns True on success."""
+        return self._write_file_data(file_path, content) is not None
+
+    def _write_file_data(self, file_path: str, content: Union[str, bytes]) -> Optional[int]:
+        """
+        Writes content (str is encoded as UTF-8 exactly once) to the file, overwriting existing content.
+        Returns the number of bytes the file now holds, or None on failure.
+        Content goes to a unique temp file next to the target and is then moved into place with
+        os.replace, so readers never observe a half-written file and a failed write leaves the
+        original intact. Symlinks are followed (the link's target is rewritten, the link is kept),
+        the target's permission bits are carried over, and a file with several hard links is
+        rewritten in place instead so every link sees the new content.
+        The write is skipped when the file is unchanged since it was last read or written here
+        and already holds exactly this content. Text content is also stored in the read cache.
+        """
+        logger.debug("Attempting to write %d characters to: %s", len(content), file_path)
+        tmp_path: Optional[str] = None
         try:
-            # Ensure the directory exists (it should from __init__, but defensive check)
-            # Handle cases where file_path might be just a filename in the current dir
-            dir_name = os.path.dirname(file_path)
-            if dir_name: # Only create if dirname is not empty (i.e., not current dir)
-                 os.makedirs(dir_name, exist_ok=True)
-
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.info(f"Successfully wrote content to {file_path}")
-            return True
-        except (OSError, TypeError) as e: # Catch file errors or if content isn't string
-            logger.error(f"Error writing content to file {file_path}: {e}", exc_info=True)
-            return False
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            digest = _content_digest(data)
+            known = self._content_hashes.get(file_path)
+            if known is not None and known[2] == digest:
+                try:
+                    st = os.stat(file_path)
+                    if (st.st_mtime_ns, st.st_size) == known[:2]:
+                        logger.info("Write to %s skipped (content unchanged).", file_path)
+                        return len(data)
+                except FileNotFoundError:
+                    pass # File is gone; write it
+
+            target_path = os.path.realpath(file_path) # Replace the symlink's target, not the link
+            try:
+                target_st: Optional[os.stat_result] = os.stat(target_path)
+            except FileNotFoundError:
+                target_st = None
+
+            if target_st is not None and target_st.st_nlink > 1:
+                # os.replace would detach this path from the file's other hard links
+                fd = os.open(target_path, os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+                try:
+                    self._write_fd(fd, data)
+                finally:
+                    os.close(fd)
+            else:
+                try:
+                    fd, tmp_path = self._open_temp_file(target_path)
+                except FileNotFoundError:
+                    # The parent directory is missing: create it and retry once. Writes into existing
+                    # directories never pay for a makedirs call
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                    fd, tmp_path = self._open_temp_file(target_path)
+                try:
+                    if target_st is not None:
+                        # Keep the target's permission bits; a new file keeps the umask-applied 0o666
+                        mode = stat.S_IMODE(target_st.st_mode)
+                        if hasattr(os, "fchmod"):
+                            os.fchmod(fd, mode)
+                        else:
+                            os.chmod(tmp_path, mode)
+                    self._write_fd(fd, data)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_path, target_path) # Atomic rename on POSIX and Windows
+                tmp_path = None
+            self._invalidate_cached_file(file_path)
+            if target_path != file_path: # Written through a symlink: the target's own read is stale too
+                self._invalidate_cached_file(target_path)
+            st = os.stat(file_path)
+            self._content_hashes[file_path] = (st.st_mtime_ns, st.st_size, digest)
+            if isinstance(content, str) and '\r' not in content: # Reads normalize \r, so only \r-free text round-trips
+                # Prime the read cache with what was just written; a read-after-write never touches the disk
+                self._store_file_content(file_path, st, content, _LineMap(content))
+            logger.info("Successfully wrote content to %s", file_path)
+            return len(data)
+        except (OSError, TypeError) as e: # Catch file errors or if content isn't str/bytes
+            logger.error(f"Error writing content to file {file_path}: {e}")
+            self._discard_temp_file(tmp_path)
+            return None
         except Exception as e: # Catch unexpected errors
             logger.error(f"Unexpected error writing file {file_path}: {e}", exc_info=True)
-            return False
+            self._discard_temp_file(tmp_path)
+            return None
+
+    @staticmethod
+    def _open_temp_file(target_path: str) -> Tuple[int, str]:
+        """
+        Creates a uniquely named temp file next to target_path and returns (fd, path).
+        The random name and O_EXCL keep concurrent writes to one path apart; the 0o666 mode is
+        reduced by the process umask, exactly as open() would create the file.
+        """
+        dir_name, base_name = os.path.split(target_path)
+        open_flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        while True:
+            tmp_path = os.path.join(dir_name, f".{base_name}.{os.urandom(6).hex()}.tmp")
+            try:
+                return os.open(tmp_path, open_flags, 0o666), tmp_path
+            except FileExistsError:
+                continue # Name collision; draw another
+
+    @staticmethod
+    def _write_fd(fd: int, data: bytes) -> None:
+        """Writes all of data to a raw fd (os.write may write partially)."""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def _discard_temp_file(self, tmp_path: Optional[str]) -> None:
+        """Best-effort removal of a leftover temp file from a failed write."""
+        if tmp_path is None:
+            return
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove temp file {tmp_path}: {e}")
 
     def _remove_file(self, file_path: str) -> bool:
         """Removes the specified file. Returns True if successful or file already gone, False on error."""
-        logger.debug(f"Attempting to remove file: {file_path}")
+        logger.debug("Attempting to remove file: %s", file_path)
+        self._content_hashes.pop(file_path, None)
+        self._invalidate_cached_file(file_path)
         try:
             os.remove(file_path)
-            logger.info(f"Successfully removed file: {file_path}")
+            logger.info("Successfully removed file: %s", file_path)
             return True
         except FileNotFoundError:
             logger.warning(f"File not found during removal (considered success): {file_path}")
             return True # File is already gone, which is the desired state
         except OSError as e:
-            logger.error(f"Error removing file {file_path}: {e}", exc_info=True)
+            logger.error(f"Error removing file {file_path}: {e}")
             return False
         except Exception as e: # Catch unexpected errors
             logger.error(f"Unexpected error removing file {file_path}: {e}", exc_info=True)
             return False
 
+    async def _read_files_batch(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Reads several files concurrently in worker threads. Returns path -> content in input order,
+        with None for any file that could not be read (the error is logged by _read_file_content).
+        """
+        logger.debug("Reading %d file(s) concurrently.", len(file_paths))
+        results = await asyncio.gather(
+            *(self._run_io(self._read_file_content, file_path) for file_path in file_paths)
+        )
+        return {file_path: content for file_path, (content, _) in zip(file_paths, results)}
+
     # --- Public Execution Methods ---
 
     async def execute_check(self, plan: CheckPlan) -> CheckResult:
-        """ Executes a check plan using the _find_word_in_file tool. """
-        logger.info(f"Executor Agent received check plan: Check '{plan.word}' in '{plan.bin_name}' file using tool.")
+        """ Awaitable wrapper around execute_check_sync for async call sites. """
+        return self.execute_check_sync(plan)
+
+    def execute_check_sync(self, plan: CheckPlan) -> CheckResult:
+        """
+        Executes a check plan against the bin's in-memory word index (the _find_word_in_file tool
+        for bins without one). Synchronous: there is nothing to await.
+        """
+        if __debug__ and not isinstance(plan, CheckPlan): # Plans are validated upstream; check stripped under -O
+            raise TypeError(f"execute_check expects a CheckPlan, got {type(plan).__name__}")
+        word, bin_name = plan.word, plan.bin_name # Read the model attributes once
+        logger.info("Executor Agent received check plan: Check '%s' in '%s' file using tool.", word, bin_name)
         status: Literal["Present", "Not Present"] = "Not Present" # Default
         try:
-            file_path = self.bin_files.get(plan.bin_name)
-            if not file_path:
-                logger.error(f"Invalid bin name '{plan.bin_name}' provided. Cannot find file path.")
-                # Consistent error return handled below
-                raise ValueError(f"Invalid bin name: {plan.bin_name}")
-
-            word_found = self._find_word_in_file(plan.word, file_path)
+            bin_words = self._bin_index.get(bin_name)
+            if bin_words is not None:
+                word_found = word in bin_words # O(1) against the authoritative in-memory index
+            else:
+                file_path = self.bin_files.get(bin_name)
+                if not file_path:
+                    logger.error(f"Invalid bin name '{bin_name}' provided. Cannot find file path.")
+                    # Consistent error return handled below
+                    raise ValueError(f"Invalid bin name: {bin_name}")
+                word_found = self._find_word_in_file(word, file_path)
             status = "Present" if word_found else "Not Present"
-            logger.info(f"Tool-based check result for '{plan.word}' in '{plan.bin_name}': {status}")
+            logger.info("Tool-based check result for '%s' in '%s': %s", word, bin_name, status)
 
         except Exception as e:
-            logger.error(f"Error during check execution (using tool) for word '{plan.word}': {e}", exc_info=True)
+            logger.error(f"Error during check execution (using tool) for word '{word}': {e}", exc_info=True)
             status = "Not Present" # Or introduce an "Error" status? Defaulting for safety.
 
         return CheckResult(
-            word=plan.word,
-            bin_checked=plan.bin_name,
+            word=word,
+            bin_checked=bin_name,
             status=status
         )
 
     async def execute_add(self, plan: WordActionPlan) -> ExecutionResult:
-        """ Executes an add plan using _find_word_in_file and _append_word_to_file tools. """
-        logger.info(f"Executor Agent received add plan: Add '{plan.word_to_process}' to '{plan.target_bin}' using tools.")
+        """
+        Awaitable execute_add_sync for async call sites. The add itself is in memory; a bin
+        flush it makes due is written in a worker thread instead of on the event loop.
+        If a flush is already in flight (e.g. adds run under gather), this add does not start
+        another: its word stays buffered for the next add or flush after that one finishes.
+        """
+        result = self._execute_add(plan, flush_inline=False)
+        if self._flush_due() and not self._flush_lock.locked():
+            await self.flush_all()
+        return result
+
+    def execute_add_sync(self, plan: WordActionPlan) -> ExecutionResult:
+        """ Executes an add plan using the _add_word_if_missing tool. Synchronous: a due bin flush is written inline. """
+        return self._execute_add(plan, flush_inline=True)
+
+    def _execute_add(self, plan: WordActionPlan, flush_inline: bool) -> ExecutionResult:
+        """ Shared body of execute_add and execute_add_sync. """
+        if __debug__ and not isinstance(plan, WordActionPlan): # Plans are validated upstream; check stripped under -O
+            raise TypeError(f"execute_add expects a WordActionPlan, got {type(plan).__name__}")
+        word, target_bin = plan.word_to_process, plan.target_bin # Read the model attributes once
+        logger.info("Executor Agent received add plan: Add '%s' to '%s' using tools.", word, target_bin)
         try:
-            file_path = self.bin_files.get(plan.target_bin)
+            file_path = self.bin_files.get(target_bin)
             if not file_path:
-                logger.error(f"Invalid target bin '{plan.target_bin}' specified. Cannot find file path.")
-                return ExecutionResult(status="Failure", message=f"Invalid target bin '{plan.target_bin}'")
+                logger.error(f"Invalid target bin '{target_bin}' specified. Cannot find file path.")
+                return ExecutionResult(status="Failure", message=f"Invalid target bin '{target_bin}'")
 
-            logger.debug(f"Performing pre-add check for '{plan.word_to_process}' in {file_path} using tool.")
-            already_exists = self._find_word_in_file(plan.word_to_process, file_path)
+            # Pre-add check and append in one step against the cached word set
+            append_success, already_exists = self._add_word_if_missing(word, file_path, flush_inline)
 
             if already_exists:
-                message = f"Word '{plan.word_to_process}' already exists. Add action skipped by Executor."
+                message = f"Word '{word}' already exists. Add action skipped by Executor."
                 logger.warning(message)
                 return ExecutionResult(status="Success", message=message)
 
-            logger.info(f"Executing add action using tool: Appending '{plan.word_to_process}' to file '{file_path}'...")
-            append_success = self._append_word_to_file(plan.word_to_process, file_path)
-            # await asyncio.sleep(0.01) # No longer needed as tool is synchronous
-
             if append_success:
-                message = f"Successfully appended '{plan.word_to_process}' to '{plan.target_bin}' file using tool."
+                message = f"Successfully appended '{word}' to '{target_bin}' file using tool."
                 logger.info(message)
                 return ExecutionResult(status="Success", message=message)
             else:
-                message = f"Failed to append '{plan.word_to_process}' to '{plan.target_bin}' file using tool."
+                message = f"Failed to append '{word}' to '{target_bin}' file using tool."
                 logger.error(message)
                 return ExecutionResult(status="Failure", message=message)
 
         except Exception as e:
-            error_message = f"Error during add execution (using tools) for word '{plan.word_to_process}': {e}"
+            error_message = f"Error during add execution (using tools) for word '{word}': {e}"
             logger.error(error_message, exc_info=True)
             return ExecutionResult(status="Failure", message=error_message)
 
+    @asynccontextmanager
+    async def buffered_execution(self, flush_size: int = DEFAULT_FLUSH_SIZE) -> AsyncIterator[BufferedExecution]:
+        """
+        Context manager for executing many add plans in batches:
+
+            async with executor.buffered_execution() as buffer:
+                for plan in plans:
+                    await buffer.try_execute(plan)
+            results = buffer.results
+
+        Remaining plans are flushed when the block exits normally; on error they are discarded.
+        """
+        buffer = BufferedExecution(self, flush_size)
+        try:
+            yield buffer
+        except BaseException:
+            if buffer.pending:
+                logger.warning("Discarding %d buffered add plan(s) due to an error.", buffer.pending)
+            raise
+        await buffer.flush()
+
     async def execute_read_file(self, plan: ReadFilePlan) -> FileContentResult:
         """ Executes a read file plan using the _read_file_content tool. """
-        logger.info(f"Executor Agent received plan: Read file '{plan.file_path}' using tool.")
+        logger.info("Executor Agent received plan: Read file '%s' using tool.", plan.file_path)
         content: Optional[str] = None
-        lines_dict: Optional[Dict[int, str]] = None
+        lines_dict: Optional[Mapping[int, str]] = None
         message: Optional[str] = None
         status: Literal["Success", "Failure"] = "Failure"
 
         try:
-            content, lines_dict = self._read_file_content(plan.file_path)
+            # Blocking disk I/O runs in a worker thread so in-flight LLM calls keep progressing
+            content, lines_dict = await self._run_io(self._read_file_content, plan.file_path, plan.max_bytes)
 
             if content is not None and lines_dict is not None:
                 status = "Success"
                 message = f"Successfully read {len(content)} characters ({len(lines_dict)} lines) from file: {plan.file_path}"
+                if plan.max_bytes is not None:
+                    message += f" (preview limited to {plan.max_bytes} bytes)"
                 logger.info(message)
             else:
                 status = "Failure"
@@ -261,32 +845,25 @@ class ExecutorAgent:
         )
 
     async def execute_write_file(self, plan: WriteFilePlan) -> WriteFileResult:
-        """ Executes a write file plan using the _write_file_content tool. """
-        logger.info(f"Executor Agent received plan: Write file '{plan.file_path}' using tool.")
-        success: bool = False
+        """ Executes a write file plan using the _write_file_data tool, reporting the bytes it wrote. """
+        logger.info("Executor Agent received plan: Write file '%s' using tool.", plan.file_path)
         message: Optional[str] = None
         status: Literal["Success", "Failure"] = "Failure"
         bytes_written: Optional[int] = None
 
         try:
-            # --- Use Internal Tool ---
-            success = self._write_file_content(plan.file_path, plan.content)
+            # --- Use Internal Tool (off the event loop) ---
+            # The tool encodes once and reports the byte count, so there is no second encode here
+            bytes_written = await self._run_io(self._write_file_data, plan.file_path, plan.content)
 
-            if success:
+            if bytes_written is not None:
                 status = "Success"
-                try:
-                    # Calculate bytes after successful write
-                    bytes_written = len(plan.content.encode('utf-8'))
-                    message = f"Successfully wrote {bytes_written} bytes to file: {plan.file_path}"
-                    logger.info(message)
-                except Exception as enc_e: # Handle potential encoding errors during calculation
-                    logger.error(f"Error encoding content to calculate bytes for {plan.file_path}: {enc_e}", exc_info=True)
-                    message = f"Successfully wrote content to file: {plan.file_path} (byte count unavailable)."
-                    # Status remains Success, but message reflects the issue
+                message = f"Successfully wrote {bytes_written} bytes to file: {plan.file_path}"
+                logger.info(message)
             else:
                 # Error should have been logged by the tool method
                 status = "Failure"
-                message = f"Failed to write content to: {plan.file_path}. Tool returned False."
+                message = f"Failed to write content to: {plan.file_path}. Tool returned no byte count."
                 logger.warning(message)
 
         except Exception as e:
@@ -305,7 +882,7 @@ class ExecutorAgent:
 
     async def execute_apply_patch(self, plan: ApplyPatchPlan) -> ApplyPatchResult:
         """ Executes an apply patch plan using the patch_tool logic. """
-        logger.info(f"Executor Agent received plan: Apply patch described as: {plan.reasoning or 'No reasoning provided'}")
+        logger.info("Executor Agent received plan: Apply patch described as: %s", plan.reasoning or 'No reasoning provided')
         original_files: Dict[str, str] = {}
         file_results: Optional[Dict[str, str]] = None
 
@@ -313,12 +890,11 @@ class ExecutorAgent:
             # 1. Identify files needed for the patch
             logger.debug("Identifying files needed for the patch...")
             needed_files = identify_files_needed(plan.patch_content)
-            logger.info(f"Patch requires access to files: {needed_files}")
+            logger.info("Patch requires access to files: %s", needed_files)
 
-            # 2. Load original content of needed files
-            for file_path in needed_files:
-                logger.debug(f"Reading original content of: {file_path}")
-                content, _ = self._read_file_content(file_path) # Ignore lines dict for now
+            # 2. Load original content of needed files (all reads in flight at once)
+            loaded_files = await self._read_files_batch(needed_files)
+            for file_path, content in loaded_files.items():
                 if content is None:
                     # If a required file cannot be read, the patch cannot be applied safely.
                     error_msg = f"Failed to read required file for patching: {file_path}"
@@ -329,64 +905,40 @@ class ExecutorAgent:
                         error_details=f"Could not read file content for {file_path}."
                     )
                 original_files[file_path] = content
-            logger.info(f"Successfully loaded content for {len(original_files)} required files.")
+            logger.info("Successfully loaded content for %d required files.", len(original_files))
 
-            # 3. Define local I/O wrappers for the synchronous patch tool functions
-            def write_wrapper(path: str, content: str) -> bool:
-                # Note: Calling sync tool from within async method context
-                logger.debug(f"[Wrapper] Writing file: {path}")
-                return self._write_file_content(path, content)
+            # 3. Define local async I/O wrappers; each file operation runs off the event loop
+            async def write_wrapper(path: str, content: str) -> bool:
+                logger.debug("[Wrapper] Writing file: %s", path)
+                return await self._run_io(self._write_file_content, path, content)
 
-            def remove_wrapper(path: str) -> bool:
-                # Note: Calling sync tool from within async method context
-                logger.debug(f"[Wrapper] Removing file: {path}")
-                return self._remove_file(path)
+            async def remove_wrapper(path: str) -> bool:
+                logger.debug("[Wrapper] Removing file: %s", path)
+                return await self._run_io(self._remove_file, path)
 
             # 4. Parse the patch text
             logger.debug("Parsing patch content...")
-            parsed_patch, fuzz = text_to_patch(plan.patch_content, original_files)
-            logger.info(f"Patch parsed successfully. Fuzz factor: {fuzz}")
+            # Parsing and diffing are CPU-bound on large patches; keep them off the event loop
+            parsed_patch, fuzz = await asyncio.to_thread(text_to_patch, plan.patch_content, original_files)
+            logger.info("Patch parsed successfully. Fuzz factor: %s", fuzz)
 
             # 5. Convert patch actions to commit actions
             logger.debug("Converting parsed patch to commit actions...")
-            commit_actions = patch_to_commit(parsed_patch, original_files)
-            logger.info(f"Commit created with {len(commit_actions.changes)} changes.")
+            commit_actions = await asyncio.to_thread(patch_to_commit, parsed_patch, original_files)
+            logger.info("Commit created with %d changes.", len(commit_actions.changes))
 
             # 6. Apply the commit using the wrappers
             logger.info("Applying commit actions to the filesystem...")
-            file_results = apply_commit(commit_actions, write_wrapper, remove_wrapper)
-            logger.info(f"Commit application finished. Results per file: {file_results}")
-
-            # 7. Determine overall status based on file results
-            has_errors = False
-            has_success = False
-            for status in file_results.values():
-                if "Error" in status:
-                    has_errors = True
-                else:
-                    # Consider "Deleted", "Added", "Updated", "Moved" as success indicators
-                    has_success = True
-
-            final_status: Literal["Success", "Failure", "Partial Success"]
-            final_message: str
-
-            if has_errors and has_success:
-                final_status = "Partial Success"
-                final_message = "Patch applied with some errors."
-                logger.warning(final_message)
-            elif has_errors and not has_success:
-                final_status = "Failure"
-                final_message = "Patch application failed for all targeted files."
-                logger.error(final_message)
-            elif not has_errors and has_success:
-                 final_status = "Success"
-                 final_message = "Patch applied successfully to all targeted files."
-                 logger.info(final_message)
-            else: # No errors, no successes (e.g., empty patch or only targeting non-existent files for delete)
-                 final_status = "Success" # Consider this success as no errors occurred
-                 final_message = "Patch application completed without errors (no changes might have been needed)."
-                 logger.info(final_message)
-
+            # Writes (and removes) within each commit phase run concurrently
+            file_results = await apply_commit_async(commit_actions, write_wrapper, remove_wrapper)
+            logger.info("Commit application finished. Results per file: %s", file_results)
+
+            # 7. Determine overall status based on file results: one counting pass, then a table lookup
+            error_count = sum(1 for status in file_results.values() if "Error" in status)
+            # Any non-error ("Deleted", "Added", "Updated", "Moved ...") counts as a success
+            success_count = len(file_results) - error_count
+            final_status, final_message, log_level = _PATCH_OUTCOMES[(error_count > 0, success_count > 0)]
+            logger.log(log_level, final_message)
 
             return ApplyPatchResult(
                 status=final_status,
@@ -1,14 +1,15 @@
 # src/agents/junior_engineer.py
 
-import json
+import asyncio
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 from groq import GroqError
 from pydantic import BaseModel
 from pydantic_core import ValidationError # Ensure BaseModel is imported if needed for type hints
 
 # Assuming adapter and models are imported correctly relative to this file's location
 from src.adapters.groq_adapter import GroqAdapter
+from src.utils import json_utils
 from src.models.execution_plan import ExecutionPlan # Import the Pydantic Class
 
 # Import constants for model ID, temp, tokens
@@ -19,7 +20,6 @@ from src.models.execution_plan import ExecutionPlan # Import the Pydantic Class
 # Or better, accept them in __init__
 # from config import JUNIOR_MODEL, JUNIOR_TEMP, JUNIOR_MAX_TOKENS # Example import
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Define constants directly here for clarity in this example
@@ -28,6 +28,38 @@ JUNIOR_MODEL_DEFAULT = "meta-llama/llama-4-maverick-17b-128e-instruct"
 JUNIOR_TEMP_DEFAULT = 0.1
 JUNIOR_MAX_TOKENS_DEFAULT = 2500
 
+# Static system prompt (the ExecutionPlan schema is inlined), built once at import time
+JUNIOR_SYSTEM_PROMPT = """
+You are a Junior Developer Agent. Your task is to generate a plan to accomplish the given task.
+You MUST output your plan as a valid JSON object conforming EXACTLY to the following Pydantic schema:
+
+```json
+{
+  "title": "ExecutionPlan",
+  "type": "object",
+  "properties": {
+    "command": {
+      "title": "Command",
+      "description": "The single, precise, macOS/BSD compatible bash command.",
+      "type": "string"
+    },
+    "description": {
+      "title": "Description",
+      "description": "A brief explanation of what the command does.",
+      "type": "string"
+    }
+  },
+  "required": [
+    "command",
+    "description"
+  ]
+}
+````
+
+
+Generate ONLY the JSON object. Do not add any introductory text, comments, or markdown formatting around the JSON. Ensure the command is macOS/BSD compatible (e.g., `sed -i ''`).
+"""
+
 
 class JuniorEngineer:
     """
@@ -54,7 +86,9 @@ class JuniorEngineer:
         self.model_id = model_id
         self.temperature = temperature
         self.max_tokens = max_tokens
-        logger.info(f"JuniorEngineer initialized with model: {self.model_id}")
+        # Shared by every propose_plan call; the adapter never mutates message dicts
+        self._system_msg = {"role": "system", "content": JUNIOR_SYSTEM_PROMPT}
+        logger.info("JuniorEngineer initialized with model: %s", self.model_id)
 
     async def propose_plan(self, task_description: str, context: str) -> Optional[ExecutionPlan]:
         """
@@ -67,41 +101,8 @@ class JuniorEngineer:
         Returns:
             An ExecutionPlan object if successful, None otherwise.
         """
-        logger.info(f"Junior Agent ({self.model_id}) starting task: {task_description}")
-
-        # Prompt instructing the model to output JSON conforming to ExecutionPlan
-        # Note: TEST_DIR might need to be passed or accessed globally if needed here
-        # For simplicity, assuming it's part of the general context if relevant
-        system_prompt = """
-You are a Junior Developer Agent. Your task is to generate a plan to accomplish the given task.
-You MUST output your plan as a valid JSON object conforming EXACTLY to the following Pydantic schema:
+        logger.info("Junior Agent (%s) starting task: %s", self.model_id, task_description)
 
-```json
-{
-  "title": "ExecutionPlan",
-  "type": "object",
-  "properties": {
-    "command": {
-      "title": "Command",
-      "description": "The single, precise, macOS/BSD compatible bash command.",
-      "type": "string"
-    },
-    "description": {
-      "title": "Description",
-      "description": "A brief explanation of what the command does.",
-      "type": "string"
-    }
-  },
-  "required": [
-    "command",
-    "description"
-  ]
-}
-````
-
-
-Generate ONLY the JSON object. Do not add any introductory text, comments, or markdown formatting around the JSON. Ensure the command is macOS/BSD compatible (e.g., `sed -i ''`).
-"""
         user_prompt = f"""
 Task: {task_description}
 
@@ -111,22 +112,21 @@ Context:
 Generate the ExecutionPlan JSON object:
 """
         messages = [
-            {"role": "system", "content": system_prompt},
+            self._system_msg,
             {"role": "user", "content": user_prompt},
         ]
 
         try:
-            logger.debug(f"Junior calling Groq API for JSON. Params: model={self.model_id}, temp={self.temperature}, max_tokens={self.max_tokens}")
+            logger.debug("Junior calling Groq API for JSON. Params: model=%s, temp=%s, max_tokens=%s", self.model_id, self.temperature, self.max_tokens)
 
             # --- CRITICAL FIX: Pass the CLASS itself ---
-            response_plan: ExecutionPlan = await self.adapter.chat_completion(
+            response_plan: ExecutionPlan = await self.adapter.chat_completion_json(
                 model=self.model_id,
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens, # Ensure sufficient tokens for JSON + command
                 top_p=1,
                 stop=None,
-                stream=False,
                 json_schema=ExecutionPlan # Pass the ExecutionPlan class
             )
 
@@ -136,14 +136,14 @@ Generate the ExecutionPlan JSON object:
                  if not response_plan.command:
                       logger.error("Junior proposed plan with empty command field.")
                       return None
-                 logger.info(f"Junior proposed plan: Command='{response_plan.command}', Desc='{response_plan.description}'")
+                 logger.info("Junior proposed plan: Command='%s', Desc='%s'", response_plan.command, response_plan.description)
                  return response_plan
             else:
                  # This case should ideally be less frequent as adapter handles validation
                  logger.error("Junior Agent chat_completion did not return a valid ExecutionPlan object.")
                  return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             # Catch errors from adapter/validation
             logger.error(f"Junior agent failed during plan proposal: {e}", exc_info=True) # Log traceback for debug
             return None
@@ -151,7 +151,12 @@ Generate the ExecutionPlan JSON object:
             logger.error(f"Junior unexpected error during propose_plan: {e}", exc_info=True)
             return None
 
+    async def propose_plans(self, tasks: List[Tuple[str, str]]) -> List[Optional[ExecutionPlan]]:
+        """
+        Proposes plans for independent (task_description, context) pairs concurrently,
+        with LLM calls bounded by the adapter's max_concurrency.
 
-
-
-
+        Returns:
+            One ExecutionPlan (or None on failure) per task, in order.
+        """
+        return list(await asyncio.gather(*(self.propose_plan(task, context) for task, context in tasks)))
@@ -0,0 +1,98 @@
+# src/agents/plan_cache.py
+"""
+Plan-template cache for the Planner Agent.
+Successful plans are stored under a fingerprint of the task's shape, so a
+structurally identical request can adapt a stored plan with a short prompt
+instead of running full planning again.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+PlanT = TypeVar("PlanT", bound=BaseModel)
+
+DEFAULT_PLAN_CACHE_PATH = os.path.join("data", "plan_cache.db")
+
+_LINE_REFERENCE_PATTERN = re.compile(r"\blines?\s+\d+(?:\.\d+)?")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_request(request: str) -> str:
+    """Lowercases the request, replaces line-number references with a placeholder and collapses whitespace."""
+    normalized = _LINE_REFERENCE_PATTERN.sub("line #", request.lower())
+    return _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+
+
+def plan_fingerprint(task_type: str, file_path: str, request: str) -> str:
+    """
+    Fingerprints a planning task by (task type, target file type, normalized request).
+    Only the file extension is used, so the same change to a different file of the same type matches.
+    """
+    file_pattern = os.path.splitext(os.path.basename(file_path))[1].lower()
+    raw = "\x1f".join((task_type, file_pattern, normalize_request(request)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    SQLite-backed store of plan templates keyed by fingerprint.
+    Cache errors are logged and treated as misses; they never fail planning.
+    """
+    def __init__(self, db_path: str = DEFAULT_PLAN_CACHE_PATH):
+        self.db_path = db_path
+        dir_name = os.path.dirname(db_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_cache ("
+            "fingerprint TEXT PRIMARY KEY, plan_type TEXT NOT NULL, plan_json TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info("PlanCache opened at: %s", db_path)
+
+    def get(self, fingerprint: str, plan_cls: Type[PlanT]) -> Optional[PlanT]:
+        """Returns the cached plan for fingerprint as a plan_cls instance, or None on a miss."""
+        try:
+            row = self._conn.execute(
+                "SELECT plan_json FROM plan_cache WHERE fingerprint = ? AND plan_type = ?",
+                (fingerprint, plan_cls.__name__),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Plan cache lookup failed: %s", e)
+            return None
+        if row is None:
+            logger.debug("Plan cache miss for fingerprint=%.12s", fingerprint)
+            return None
+        try:
+            plan = plan_cls.model_validate_json(row[0])
+        except ValidationError as e:
+            logger.warning("Discarding cached %s that no longer validates: %s", plan_cls.__name__, e)
+            return None
+        logger.info("Plan cache hit for fingerprint=%.12s (%s)", fingerprint, plan_cls.__name__)
+        return plan
+
+    def put(self, fingerprint: str, plan: BaseModel) -> None:
+        """Stores (or replaces) the plan template for fingerprint."""
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plan_cache (fingerprint, plan_type, plan_json, created) VALUES (?, ?, ?, ?)",
+                (fingerprint, type(plan).__name__, plan.model_dump_json(), time.time()),
+            )
+            self._conn.commit()
+            logger.debug("Stored %s template for fingerprint=%.12s", type(plan).__name__, fingerprint)
+        except sqlite3.Error as e:
+            logger.warning("Plan cache store failed: %s", e)
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        self._conn.close()
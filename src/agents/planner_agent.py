@@ -1,32 +1,223 @@
 # src/agents/planner_agent.py
 
+import asyncio
+import functools
 import logging
-import json
-from typing import Optional
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
 from groq import GroqError
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
-from src.adapters.groq_adapter import GroqAdapter
+from src.adapters.groq_adapter import GroqAdapter, ChatResult
+from src.agents.plan_cache import PlanCache, plan_fingerprint, DEFAULT_PLAN_CACHE_PATH
+from src.utils import json_utils
 from src.models.word_action_plan import WordActionPlan
+from src.models.word_action_plan_batch import WordActionPlanBatch
 from src.models.check_plan import CheckPlan
 from src.models.check_result import CheckResult
 from src.models.read_file_plan import ReadFilePlan # <-- Added for Phase 5
 from src.models.write_file_plan import WriteFilePlan # <-- Added for Phase 6
 from src.models.apply_patch_plan import ApplyPatchPlan # <-- Added for Phase 9
-from groq.types.chat.chat_completion import ChatCompletion
 
 
-# Configure logging
-# Consider moving basicConfig to the main script entry point if not already done
-# logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
+# Logging is configured by the entry point (see src/logging_config.py)
 logger = logging.getLogger(__name__) # Get logger instance
 
+# --- Precomputed Prompts ---
+# Schemas and static system prompts are identical on every call, so build them once at import time.
+CHECK_PLAN_SCHEMA_STR = json_utils.dumps(CheckPlan.model_json_schema(), indent=True)
+WORD_ACTION_PLAN_SCHEMA_STR = json_utils.dumps(WordActionPlan.model_json_schema(), indent=True)
+WORD_ACTION_PLAN_BATCH_SCHEMA_STR = json_utils.dumps(WordActionPlanBatch.model_json_schema(), indent=True)
+
+# Batched word planning: a batch is sent once it holds this many words or its oldest word has waited this long
+DEFAULT_WORD_BATCH_SIZE = 16
+DEFAULT_WORD_BATCH_WAIT_SECONDS = 0.01
+WORD_BATCH_TOKENS_PER_WORD = 64 # Output budget per plan in a batch response
+
+CHECK_SYSTEM_PROMPT = f"""
+You are a meticulous Planner Agent. Your task is to analyze the given input word and create a plan to CHECK which bin it belongs to based on its first letter.
+
+**Rule:**
+- If the word starts with a vowel (A, E, I, O, U, case-insensitive), the `bin_name` to check is "Vowel Bin".
+- If the word starts with a consonant, the `bin_name` to check is "Consonant Bin".
+
+Your plan MUST instruct the Executor to perform a "check_bin" action.
+
+You MUST output your plan as a valid JSON object conforming EXACTLY to the following `CheckPlan` schema. Include the original word and the determined `bin_name`.
+
+**`CheckPlan` Schema:**
+```json
+{CHECK_PLAN_SCHEMA_STR}
+```
+
+Generate ONLY the JSON object. Do not add introductory text, comments, or markdown formatting around the JSON.
+"""
+
+FINAL_ADD_SYSTEM_PROMPT = f"""
+You are a meticulous Planner Agent. You received the result of a check for a word in its target bin. Your task is to create a final plan to ADD the word to the bin **only if** the check result indicates the word was "Not Present".
+
+**Rule:**
+- **If** the check result status is "Not Present", create a plan to add the checked word to the bin that was checked. The plan MUST be a JSON object conforming to the `WordActionPlan` schema.
+- **If** the check result status is "Present", DO NOT generate a plan. Output nothing.
+
+**`WordActionPlan` Schema (Only generate if status is "Not Present"):**
+```json
+{WORD_ACTION_PLAN_SCHEMA_STR}
+```
+
+Generate ONLY the `WordActionPlan` JSON object IF the word was "Not Present". Otherwise, provide no output.
+"""
+
+WORD_BATCH_SYSTEM_PROMPT = f"""
+You are a meticulous Planner Agent. You receive a JSON list of words. For EACH word, decide which bin it belongs to based on its first letter.
+
+**Rule:**
+- If the word starts with a vowel (A, E, I, O, U, case-insensitive), the `target_bin` is "Vowel Bin".
+- Otherwise the `target_bin` is "Consonant Bin".
+
+Output ONE JSON object conforming EXACTLY to the following `WordActionPlanBatch` schema, with exactly one plan per input word, in input order.
+Copy each word unchanged into `word_to_process`.
+
+**`WordActionPlanBatch` Schema:**
+```json
+{WORD_ACTION_PLAN_BATCH_SCHEMA_STR}
+```
+
+Generate ONLY the JSON object. Do not add introductory text, comments, or markdown formatting around the JSON.
+"""
+
+READ_FILE_SYSTEM_PROMPT = """
+You are a Planner Agent. Your task is to create a JSON plan for the Executor Agent to read the content of a specified file.
+The plan MUST use the action "read_file".
+The JSON object you output MUST contain the fields 'action' (with value 'read_file') and 'file_path' (with the specified file path).
+Generate ONLY the JSON object instance.
+"""
+
+WRITE_FILE_SYSTEM_PROMPT = """
+You are a Planner Agent. Create a JSON plan for the Executor Agent to write provided content to a specified file, overwriting existing content.
+The plan MUST use the action "write_file".
+The JSON object you output MUST contain the fields 'action', 'file_path', and 'content'.
+Generate ONLY the JSON object instance.
+"""
+
+APPLY_PATCH_SYSTEM_PROMPT = """
+You are an expert, meticulous software developer AI assistant. Your task is to generate a precise V4A diff patch to modify a given file based on a user request.
+
+**Workflow:**
+1.  Deeply understand the modification request.
+2.  Carefully analyze the provided original code content.
+3.  Identify the exact lines and context needing change.
+4.  Generate a V4A format patch containing ONLY the necessary changes.
+
+**V4A Diff Format Rules:**
+- Start the entire patch with `*** Begin Patch`.
+- End the entire patch with `*** End Patch`.
+- Specify the file operation: `*** Update File: [path/to/file]`. Use the provided file path.
+- For each change block:
+    - Use `@@ ClassOrFunction` markers ONLY if needed to disambiguate context within the file. Often, no `@@` marker is needed if the context lines are unique.
+    - Provide exactly 3 lines of unchanged context before the change (unless at file start or near previous change).
+    - Mark lines to be removed with `- ` (minus sign followed by a space).
+    - Mark lines to be added with `+ ` (plus sign followed by a space).
+    - Provide exactly 3 lines of unchanged context after the change (unless at file end or near next change).
+    - Do NOT duplicate context lines between adjacent change blocks.
+- Ensure correct indentation for all lines (+, -, context).
+
+**CRITICAL Constraint:**
+- **DO NOT** use standard unified diff hunk headers like `@@ -x,y +a,b @@`. Only use `@@ ClassOrFunction` if *absolutely necessary* for context, otherwise rely on the 3 context lines.
+
+**Example:**
+If the original content is:
+```
+Line 1: A
+Line 2: B
+Line 3: C
+Line 4: D
+```
+And the request is "Insert 'Line 2.5: New' between Line 2 and Line 3", the correct V4A patch is:
+```
+*** Begin Patch
+*** Update File: [path/to/file]
+ Line 1: A
+ Line 2: B
++Line 2.5: New
+ Line 3: C
+ Line 4: D
+*** End Patch
+```
+(Note: No `@@` marker was needed here as the context was sufficient)
+
+**Your Task:**
+Generate ONLY the V4A patch string based on the user request and original content, starting with `*** Begin Patch` and ending with `*** End Patch`.
+**Do NOT include any reasoning, <think> tags, or any other text outside the patch markers.**
+"""
+
+ADAPT_PATCH_SYSTEM_PROMPT = """
+You are a Planner Agent. You are given a previously successful V4A patch plan for a structurally similar request.
+Adapt its `patch_content` to the new target file path, the new original content and the new modification request.
+Keep the V4A format exactly: start with `*** Begin Patch`, end with `*** End Patch`, use `*** Update File: [path]` with the new path,
+3 lines of context around each change, `-` for removed lines and `+` for added lines.
+Output ONLY a JSON object with the fields 'action' (value 'apply_patch'), 'patch_content' and 'reasoning'.
+"""
+
+_VOWELS = frozenset("aeiou")
+# Interned like validated plan bin names, so locally built plans keep the executor's identity fast path
+_VOWEL_BIN = sys.intern("Vowel Bin")
+_CONSONANT_BIN = sys.intern("Consonant Bin")
+LOCAL_FAST_PATH_REASONING = "local-fast-path"
+LOCAL_PLAN_CACHE_SIZE = 4096 # Distinct words/paths whose locally built plans are memoized
+
+
+def classify_word_bin(word: str) -> Optional[str]:
+    """
+    Applies the word game rule locally: "Vowel Bin" or "Consonant Bin" by first letter.
+    Returns None when the rule cannot decide (empty word, or a first character that is not an
+    ASCII letter: accented and non-Latin letters are left to the LLM).
+    """
+    first = word.strip()[:1].lower()
+    if not (first.isascii() and first.isalpha()):
+        return None
+    return _VOWEL_BIN if first in _VOWELS else _CONSONANT_BIN
+
+
+# Memoized local plans: repeated words/paths get the same (frozen) instance instead of a new model.
+# Each returns None when the word game rule cannot decide.
+
+@functools.lru_cache(maxsize=LOCAL_PLAN_CACHE_SIZE)
+def _local_check_plan(word: str) -> Optional[CheckPlan]:
+    bin_name = classify_word_bin(word)
+    return None if bin_name is None else CheckPlan(action="check_bin", word=word, bin_name=bin_name)
+
+
+@functools.lru_cache(maxsize=LOCAL_PLAN_CACHE_SIZE)
+def _local_add_plan(word: str) -> Optional[WordActionPlan]:
+    bin_name = classify_word_bin(word)
+    if bin_name is None:
+        return None
+    return WordActionPlan(word_to_process=word, target_bin=bin_name, reasoning=LOCAL_FAST_PATH_REASONING)
+
+
+@functools.lru_cache(maxsize=LOCAL_PLAN_CACHE_SIZE)
+def _local_read_file_plan(file_path: str, max_bytes: Optional[int]) -> ReadFilePlan:
+    return ReadFilePlan(action="read_file", file_path=file_path, max_bytes=max_bytes)
+
+
 class PlannerAgent:
     """
     Agent responsible for analyzing input and creating structured plans.
     Handles word game logic (check, conditional add) and file reading planning.
     """
-    def __init__(self, adapter: GroqAdapter, model_id: str, temperature: float = 0.2, max_tokens: int = 500):
+    def __init__(
+        self,
+        adapter: GroqAdapter,
+        model_id: str,
+        temperature: float = 0.2,
+        max_tokens: int = 500,
+        plan_cache_enabled: bool = False,
+        plan_cache_path: str = DEFAULT_PLAN_CACHE_PATH,
+        local_fast_path: bool = True,
+        word_batch_size: int = DEFAULT_WORD_BATCH_SIZE,
+        word_batch_wait: float = DEFAULT_WORD_BATCH_WAIT_SECONDS
+    ):
         """
         Initializes the Planner Agent.
 
@@ -35,12 +226,61 @@ class PlannerAgent:
             model_id: The LLM model ID to use for planning (e.g., deepseek-r1-distill-llama-70b).
             temperature: Sampling temperature.
             max_tokens: Max tokens for the plan generation.
+            plan_cache_enabled: If True, successful patch plans are stored as templates and
+                                structurally identical requests adapt them instead of replanning.
+            plan_cache_path: SQLite file backing the plan-template cache.
+            local_fast_path: If True, plans whose content is fully determined by the request are built
+                             locally: word game plans for words starting with a letter (vowel/consonant
+                             rule) and read-file plans. The LLM only handles the rest.
+            word_batch_size: Max words per LLM call made on behalf of plan_word callers.
+            word_batch_wait: Seconds plan_word waits for more words before sending a partial batch.
         """
         self.adapter = adapter
         self.model_id = model_id
         self.temperature = temperature
         self.max_tokens = max_tokens
-        logger.info(f"PlannerAgent initialized with model: {self.model_id}")
+        self.plan_cache: Optional[PlanCache] = PlanCache(plan_cache_path) if plan_cache_enabled else None
+        self.local_fast_path = local_fast_path
+        # System messages for the static prompts, shared by every call (the adapter never mutates them)
+        self._check_system_msg = {"role": "system", "content": CHECK_SYSTEM_PROMPT}
+        self._final_add_system_msg = {"role": "system", "content": FINAL_ADD_SYSTEM_PROMPT}
+        self._read_file_system_msg = {"role": "system", "content": READ_FILE_SYSTEM_PROMPT}
+        self._write_file_system_msg = {"role": "system", "content": WRITE_FILE_SYSTEM_PROMPT}
+        self._apply_patch_system_msg = {"role": "system", "content": APPLY_PATCH_SYSTEM_PROMPT}
+        self._adapt_patch_system_msg = {"role": "system", "content": ADAPT_PATCH_SYSTEM_PROMPT}
+        self._word_batch_system_msg = {"role": "system", "content": WORD_BATCH_SYSTEM_PROMPT}
+        self.word_batch_size = word_batch_size
+        self.word_batch_wait = word_batch_wait
+        # Words queued by plan_word, each with the future its caller awaits
+        self._pending_words: List[Tuple[str, asyncio.Future]] = []
+        self._word_flush_timer: Optional[asyncio.Task] = None
+        self._word_batch_tasks: Set[asyncio.Task] = set() # Strong refs to in-flight batch calls
+        logger.info("PlannerAgent initialized with model: %s", self.model_id)
+
+    def close(self) -> None:
+        """Closes the plan-template cache's SQLite connection, if the cache is enabled."""
+        if self.plan_cache is not None:
+            self.plan_cache.close()
+            self.plan_cache = None
+
+    async def _chat_json(
+        self,
+        messages: List[Dict[str, Any]],
+        json_schema: Type[BaseModel],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[BaseModel]:
+        """
+        JSON-mode LLM call shared by the plan_* methods. Repeated deterministic requests are
+        served by the adapter's response cache when the adapter has caching enabled.
+        """
+        return await self.adapter.chat_completion_json(
+            model=self.model_id,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_schema=json_schema
+        )
 
     # --- Word Game Methods (Phase 2 logic) ---
 
@@ -54,45 +294,26 @@ class PlannerAgent:
         Returns:
             A CheckPlan object if successful, None otherwise.
         """
-        logger.info(f"Planner Agent ({self.model_id}) planning check for word: '{word}'")
+        logger.info("Planner Agent (%s) planning check for word: '%s'", self.model_id, word)
 
-        try:
-            check_plan_schema_str = json.dumps(CheckPlan.model_json_schema(), indent=2)
-        except Exception as e:
-            logger.error(f"Failed to generate CheckPlan JSON schema: {e}", exc_info=True)
-            return None
+        if self.local_fast_path:
+            local_plan = _local_check_plan(word)
+            if local_plan is not None:
+                logger.info("Planner built check plan locally: Word='%s', Bin='%s'", word, local_plan.bin_name)
+                return local_plan
 
-        system_prompt = f"""
-You are a meticulous Planner Agent. Your task is to analyze the given input word and create a plan to CHECK which bin it belongs to based on its first letter.
-
-**Rule:**
-- If the word starts with a vowel (A, E, I, O, U, case-insensitive), the `bin_name` to check is "Vowel Bin".
-- If the word starts with a consonant, the `bin_name` to check is "Consonant Bin".
-
-Your plan MUST instruct the Executor to perform a "check_bin" action.
-
-You MUST output your plan as a valid JSON object conforming EXACTLY to the following `CheckPlan` schema. Include the original word and the determined `bin_name`.
-
-**`CheckPlan` Schema:**
-```json
-{check_plan_schema_str}
-```
-
-Generate ONLY the JSON object. Do not add introductory text, comments, or markdown formatting around the JSON.
-"""
         user_prompt = f"""
 Input Word: "{word}"
 
 Generate the CheckPlan JSON object:
 """
         messages = [
-            {"role": "system", "content": system_prompt},
+            self._check_system_msg,
             {"role": "user", "content": user_prompt},
         ]
 
         try:
-            response_plan: Optional[CheckPlan] = await self.adapter.chat_completion(
-                model=self.model_id,
+            response_plan: Optional[CheckPlan] = await self._chat_json(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
@@ -100,20 +321,30 @@ Generate the CheckPlan JSON object:
             )
 
             if response_plan and isinstance(response_plan, CheckPlan):
-                logger.info(f"Planner proposed check plan: Word='{response_plan.word}', Action='{response_plan.action}', Bin='{response_plan.bin_name}'")
+                logger.info("Planner proposed check plan: Word='%s', Action='%s', Bin='%s'", response_plan.word, response_plan.action, response_plan.bin_name)
                 # Optional validation: Ensure word matches if needed
                 return response_plan
             else:
                 logger.error("Planner chat_completion did not return a valid CheckPlan object.")
                 return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             logger.error(f"Planner agent failed during check plan proposal: {e}", exc_info=True)
             return None
         except Exception as e:
             logger.error(f"Planner unexpected error during plan_check_task: {e}", exc_info=True)
             return None
 
+    async def plan_check_tasks(self, words: List[str]) -> List[Optional[CheckPlan]]:
+        """
+        Plans checks for many words concurrently. Locally decidable words return at once;
+        LLM calls overlap, bounded by the adapter's max_concurrency.
+
+        Returns:
+            One CheckPlan (or None on failure) per input word, in order.
+        """
+        return list(await asyncio.gather(*(self.plan_check_task(word) for word in words)))
+
     async def plan_final_add_task(self, word: str, check_result: CheckResult) -> Optional[WordActionPlan]:
         """
         Plans the final action (adding the word) based on the result of a prior check.
@@ -125,54 +356,33 @@ Generate the CheckPlan JSON object:
         Returns:
             A WordActionPlan to add the word if it wasn't present, otherwise None.
         """
-        logger.info(f"Planner Agent ({self.model_id}) planning final action for word: '{word}' based on check result: {check_result.status}")
+        logger.info("Planner Agent (%s) planning final action for word: '%s' based on check result: %s", self.model_id, word, check_result.status)
 
         if check_result.status == "Present":
-            logger.info(f"Word '{word}' already present in '{check_result.bin_checked}'. No add plan needed.")
+            logger.info("Word '%s' already present in '%s'. No add plan needed.", word, check_result.bin_checked)
             return None # Correctly skip planning if already present
 
-        # Only proceed to LLM if check_result status is "Not Present"
-        try:
-            word_action_plan_schema_str = json.dumps(WordActionPlan.model_json_schema(), indent=2)
-        except Exception as e:
-            logger.error(f"Failed to generate WordActionPlan JSON schema: {e}", exc_info=True)
-            return None
-
-        system_prompt = f"""
-You are a meticulous Planner Agent. You received the result of a check for a word in its target bin. Your task is to create a final plan to ADD the word to the bin **only if** the check result indicates the word was "Not Present".
-
-**Input Information:**
-- Original Word: "{word}"
-- Bin Checked: "{check_result.bin_checked}"
-- Check Result Status: "{check_result.status}"
+        local_plan = _local_add_plan(word) if self.local_fast_path else None
+        if local_plan is not None and local_plan.target_bin == check_result.bin_checked:
+            logger.info("Planner built final add plan locally: Word='%s', Target Bin='%s'", word, local_plan.target_bin)
+            return local_plan
 
-**Rule:**
-- **If** `Check Result Status` is "Not Present", create a plan to add the `Original Word` to the `Bin Checked`. The plan MUST be a JSON object conforming to the `WordActionPlan` schema.
-- **If** `Check Result Status` is "Present", DO NOT generate a plan. Output nothing.
-
-**`WordActionPlan` Schema (Only generate if status is "Not Present"):**
-```json
-{word_action_plan_schema_str}
-```
-
-Generate ONLY the `WordActionPlan` JSON object IF the word was "Not Present". Otherwise, provide no output.
-"""
+        # Only proceed to LLM if check_result status is "Not Present"
         user_prompt = f"""
 Check Result Details:
-Word: {check_result.word}
+Word: {word}
 Bin Checked: {check_result.bin_checked}
 Status: {check_result.status}
 
 Generate the WordActionPlan JSON object for adding the word if and only if the status was "Not Present":
 """
         messages = [
-            {"role": "system", "content": system_prompt},
+            self._final_add_system_msg,
             {"role": "user", "content": user_prompt},
         ]
 
         try:
-            response_plan: Optional[WordActionPlan] = await self.adapter.chat_completion(
-                model=self.model_id,
+            response_plan: Optional[WordActionPlan] = await self._chat_json(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
@@ -182,7 +392,7 @@ Generate the WordActionPlan JSON object for adding the word if and only if the s
             if response_plan and isinstance(response_plan, WordActionPlan):
                 # Optional validation
                 if response_plan.word_to_process == word and response_plan.target_bin == check_result.bin_checked:
-                     logger.info(f"Planner proposed final add plan: Word='{response_plan.word_to_process}', Target Bin='{response_plan.target_bin}'")
+                     logger.info("Planner proposed final add plan: Word='%s', Target Bin='%s'", response_plan.word_to_process, response_plan.target_bin)
                      return response_plan
                 else:
                      logger.warning(f"Planner generated add plan with mismatched details: Plan={response_plan}. Discarding.")
@@ -194,48 +404,144 @@ Generate the WordActionPlan JSON object for adding the word if and only if the s
                  logger.error(f"Planner chat_completion returned unexpected type: {type(response_plan)}")
                  return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             logger.error(f"Planner agent failed during final add plan proposal: {e}", exc_info=True)
             return None
         except Exception as e:
             logger.error(f"Planner unexpected error during plan_final_add_task: {e}", exc_info=True)
             return None
 
+    async def plan_words_batch(self, words: List[str]) -> List[Optional[WordActionPlan]]:
+        """
+        Plans the bin for many words with at most one LLM call.
+        Words the local rule can decide never reach the LLM; the rest are sent together
+        as a single WordActionPlanBatch request.
+
+        Args:
+            words: The words to plan.
+
+        Returns:
+            One entry per input word, in order: its WordActionPlan, or None if it could not be planned.
+        """
+        plans: List[Optional[WordActionPlan]] = [None] * len(words)
+        remote: Dict[str, List[int]] = {} # word -> positions still needing the LLM
+        for i, word in enumerate(words):
+            local_plan = _local_add_plan(word) if self.local_fast_path else None
+            if local_plan is not None:
+                plans[i] = local_plan
+            else:
+                remote.setdefault(word, []).append(i)
+        if not remote:
+            return plans
+
+        logger.info("Planner Agent (%s) batch planning %d word(s) in one call", self.model_id, len(remote))
+        user_prompt = f"""
+Words: {json_utils.dumps(list(remote))}
+
+Generate the WordActionPlanBatch JSON object:
+"""
+        messages = [self._word_batch_system_msg, {"role": "user", "content": user_prompt}]
+
+        try:
+            response_batch: Optional[WordActionPlanBatch] = await self._chat_json(
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max(self.max_tokens, WORD_BATCH_TOKENS_PER_WORD * len(remote)),
+                json_schema=WordActionPlanBatch
+            )
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
+            logger.error(f"Planner agent failed during batch word planning: {e}", exc_info=True)
+            return plans
+        except Exception as e:
+            logger.error(f"Planner unexpected error during plan_words_batch: {e}", exc_info=True)
+            return plans
+
+        if not isinstance(response_batch, WordActionPlanBatch):
+            logger.error(f"Planner batch call returned unexpected type: {type(response_batch)}")
+            return plans
+        # Match by word rather than position: the model may reorder or drop entries
+        for plan in response_batch.plans:
+            for i in remote.pop(plan.word_to_process, ()):
+                plans[i] = plan
+        if remote:
+            logger.warning(f"Planner batch response had no plan for: {list(remote)}")
+        return plans
+
+    async def plan_word(self, word: str) -> Optional[WordActionPlan]:
+        """
+        Plans a single word, sharing one LLM call with concurrent plan_word callers.
+        The word is queued; the queue is sent through plan_words_batch once it holds
+        word_batch_size words or word_batch_wait seconds have passed, and each caller's
+        future is resolved with its own plan.
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending_words.append((word, future))
+        if len(self._pending_words) >= self.word_batch_size:
+            if self._word_flush_timer is not None: # This batch is sent now; the next one starts its own wait
+                self._word_flush_timer.cancel()
+                self._word_flush_timer = None
+            self._send_word_batch()
+        elif self._word_flush_timer is None:
+            self._word_flush_timer = asyncio.create_task(self._send_word_batch_after_wait())
+        return await future
+
+    async def _send_word_batch_after_wait(self) -> None:
+        """Sends whatever plan_word has queued once the batch wait elapses."""
+        await asyncio.sleep(self.word_batch_wait)
+        self._word_flush_timer = None
+        self._send_word_batch()
+
+    def _send_word_batch(self) -> None:
+        """Detaches the queued words and plans them in a background task."""
+        batch, self._pending_words = self._pending_words, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._resolve_word_batch(batch))
+        self._word_batch_tasks.add(task)
+        task.add_done_callback(self._word_batch_tasks.discard)
+
+    async def _resolve_word_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Plans a detached batch and hands each plan to the future of the word it belongs to."""
+        try:
+            plans = await self.plan_words_batch([word for word, _ in batch])
+        except Exception as e: # plan_words_batch logs its own errors; never leave callers hanging
+            logger.error(f"Planner unexpected error resolving word batch: {e}", exc_info=True)
+            plans = [None] * len(batch)
+        for (_, future), plan in zip(batch, plans):
+            if not future.done(): # The caller may have been cancelled
+                future.set_result(plan)
+
     # --- File Reading Methods (Phase 5) ---
 
-    async def plan_read_file_task(self, file_path_to_read: str) -> Optional[ReadFilePlan]:
+    async def plan_read_file_task(self, file_path_to_read: str, max_bytes: Optional[int] = None) -> Optional[ReadFilePlan]:
         """
         Plans a task to read the content of a specified file.
 
         Args:
             file_path_to_read: The path to the file to be read.
+            max_bytes: Optional preview limit attached to the plan. None means a full read.
 
         Returns:
             A ReadFilePlan object if successful, None otherwise.
         """
-        logger.info(f"Planner Agent ({self.model_id}) planning file read for: '{file_path_to_read}'")
+        logger.info("Planner Agent (%s) planning file read for: '%s'", self.model_id, file_path_to_read)
 
-        # --- REMOVED schema generation block ---
+        if self.local_fast_path:
+            # The plan just echoes the path back; an LLM round trip cannot add anything
+            logger.info("Planner built read file plan locally: Path='%s'", file_path_to_read)
+            return _local_read_file_plan(file_path_to_read, max_bytes)
 
-        # --- Use simplified prompts ---
-        system_prompt = """
-You are a Planner Agent. Your task is to create a JSON plan for the Executor Agent to read the content of a specified file.
-The plan MUST use the action "read_file".
-The JSON object you output MUST contain the fields 'action' (with value 'read_file') and 'file_path' (with the specified file path).
-Generate ONLY the JSON object instance.
-"""
         user_prompt = f"""
 Create the JSON plan to read the file: "{file_path_to_read}"
 """
         messages = [
-            {"role": "system", "content": system_prompt},
+            self._read_file_system_msg,
             {"role": "user", "content": user_prompt},
         ]
 
         # The rest of the try/except block calling adapter.chat_completion remains the same
         try:
-            response_plan: Optional[ReadFilePlan] = await self.adapter.chat_completion(
-                model=self.model_id,
+            response_plan: Optional[ReadFilePlan] = await self._chat_json(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens, # Adjust if needed
@@ -247,33 +553,42 @@ Create the JSON plan to read the file: "{file_path_to_read}"
                  if response_plan.file_path != file_path_to_read:
                       logger.warning(f"Planner returned plan for different file path: '{response_plan.file_path}' instead of '{file_path_to_read}'. Using returned path.")
                       # Decide how to handle this - for now, proceed with the path the LLM returned
-                 logger.info(f"Planner proposed read file plan: Path='{response_plan.file_path}', Action='{response_plan.action}'")
+                 # The preview limit is a caller decision, not something the LLM should choose
+                 response_plan = response_plan.model_copy(update={"max_bytes": max_bytes})
+                 logger.info("Planner proposed read file plan: Path='%s', Action='%s'", response_plan.file_path, response_plan.action)
                  return response_plan
             else:
                 logger.error("Planner chat_completion did not return a valid ReadFilePlan object.")
                 return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             logger.error(f"Planner agent failed during read file plan proposal: {e}", exc_info=True)
             return None
         except Exception as e:
             logger.error(f"Planner unexpected error during plan_read_file_task: {e}", exc_info=True)
             return None
 
+    async def plan_read_file_tasks(self, file_paths: List[str], max_bytes: Optional[int] = None) -> List[Optional[ReadFilePlan]]:
+        """
+        Plans reads of many files. With the local fast path every plan is built in place;
+        otherwise the LLM calls run concurrently, bounded by the adapter's max_concurrency.
+
+        Returns:
+            One ReadFilePlan (or None on failure) per input path, in order.
+        """
+        if self.local_fast_path: # No awaits needed: skip the per-path coroutines and gather
+            logger.info("Planner built %d read file plan(s) locally", len(file_paths))
+            return [_local_read_file_plan(path, max_bytes) for path in file_paths]
+        return list(await asyncio.gather(*(self.plan_read_file_task(path, max_bytes) for path in file_paths)))
+
     async def plan_write_file_task(self, file_path: str, content: str) -> Optional[WriteFilePlan]:
         """ Plans a task to write content to a specified file. """
-        logger.info(f"Planner Agent ({self.model_id}) planning file write for: '{file_path}'")
-        # Be cautious about logging large content strings
-        content_preview = content[:100].replace('\n', '\\n') + ('...' if len(content) > 100 else '')
-        logger.debug(f"Content preview for plan: '{content_preview}'")
+        logger.info("Planner Agent (%s) planning file write for: '%s'", self.model_id, file_path)
+        # Be cautious about logging large content strings; the preview is only built when debug is on
+        if logger.isEnabledFor(logging.DEBUG):
+            content_preview = content[:100].replace('\n', '\\n') + ('...' if len(content) > 100 else '')
+            logger.debug("Content preview for plan: '%s'", content_preview)
 
-        # Use simplified prompt structure (no schema in text)
-        system_prompt = """
-You are a Planner Agent. Create a JSON plan for the Executor Agent to write provided content to a specified file, overwriting existing content.
-The plan MUST use the action "write_file".
-The JSON object you output MUST contain the fields 'action', 'file_path', and 'content'.
-Generate ONLY the JSON object instance.
-"""
         # Pass content in the user prompt. Be mindful of token limits for very large content.
         # For extremely large content, a different approach (e.g., passing a reference or using streaming)
         # might be needed in a real application, but this works for moderate content.
@@ -283,11 +598,10 @@ Create the JSON plan to write the following content to the file "{file_path}":
 Content:
 {content}
 """
-        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        messages = [self._write_file_system_msg, {"role": "user", "content": user_prompt}]
 
         try:
-            response_plan: Optional[WriteFilePlan] = await self.adapter.chat_completion(
-                model=self.model_id,
+            response_plan: Optional[WriteFilePlan] = await self._chat_json(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens, # May need increasing if content is large
@@ -301,13 +615,13 @@ Content:
                  # Add a check for content match (or preview match) if desired
                  # if response_plan.content != content:
                  #     logger.warning(f"Planner returned plan with different content.")
-                 logger.info(f"Planner proposed write file plan: Path='{response_plan.file_path}', Action='{response_plan.action}'")
+                 logger.info("Planner proposed write file plan: Path='%s', Action='%s'", response_plan.file_path, response_plan.action)
                  return response_plan
             else:
                 logger.error("Planner chat_completion did not return a valid WriteFilePlan object.")
                 return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             logger.error(f"Planner agent failed during write file plan proposal: {e}", exc_info=True)
             return None
         except Exception as e:
@@ -319,10 +633,11 @@ Content:
         Plans a task to modify file content (e.g., appending a line) and
         outputs a WriteFilePlan with the *entire new* content.
         """
-        logger.info(f"Planner Agent ({self.model_id}) planning file modification for: '{file_path}'")
+        logger.info("Planner Agent (%s) planning file modification for: '%s'", self.model_id, file_path)
         # Preview only the first 100 characters to avoid excessive logging
-        content_preview = original_content[:100].replace('\n', '\\n') + ('...' if len(original_content) > 100 else '')
-        logger.debug(f"Original content preview for modification plan: '{content_preview}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            content_preview = original_content[:100].replace('\n', '\\n') + ('...' if len(original_content) > 100 else '')
+            logger.debug("Original content preview for modification plan: '%s'", content_preview)
 
         # --- Generate line-numbered context for the prompt ---
         lines_list = original_content.splitlines()
@@ -358,8 +673,7 @@ Create the JSON plan (WriteFilePlan) containing the full modified content:
         ]
 
         try:
-            response_plan: Optional[WriteFilePlan] = await self.adapter.chat_completion(
-                model=self.model_id,
+            response_plan: Optional[WriteFilePlan] = await self._chat_json(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
@@ -372,17 +686,18 @@ Create the JSON plan (WriteFilePlan) containing the full modified content:
                         f"Planner returned plan for different file path: '{response_plan.file_path}' "
                         f"instead of '{file_path}'. Using returned path."
                     )
-                logger.info(f"Planner proposed modified write plan for: '{response_plan.file_path}'")
+                logger.info("Planner proposed modified write plan for: '%s'", response_plan.file_path)
                 # Debug preview of the modified content
-                modified_content_preview = response_plan.content[:100].replace('\n', '\\n') \
-                    + ('...' if len(response_plan.content) > 100 else '')
-                logger.debug(f"Modified content preview in plan: '{modified_content_preview}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    modified_content_preview = response_plan.content[:100].replace('\n', '\\n') \
+                        + ('...' if len(response_plan.content) > 100 else '')
+                    logger.debug("Modified content preview in plan: '%s'", modified_content_preview)
                 return response_plan
 
             logger.error("Planner chat_completion did not return a valid WriteFilePlan for modification.")
             return None
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             logger.error(f"Planner agent failed during modify file plan proposal: {e}", exc_info=True)
             return None
         except Exception as e:
@@ -409,59 +724,20 @@ Create the JSON plan (WriteFilePlan) containing the full modified content:
         Returns:
             An ApplyPatchPlan object containing the generated patch content if successful, None otherwise.
         """
-        logger.info(f"Planner Agent ({self.model_id}) planning apply patch task for: '{file_path}'")
-        logger.debug(f"Modification request: '{modification_request}'")
-
-        system_prompt = """
-You are an expert, meticulous software developer AI assistant. Your task is to generate a precise V4A diff patch to modify a given file based on a user request.
-
-**Workflow:**
-1.  Deeply understand the modification request.
-2.  Carefully analyze the provided original code content.
-3.  Identify the exact lines and context needing change.
-4.  Generate a V4A format patch containing ONLY the necessary changes.
+        logger.info("Planner Agent (%s) planning apply patch task for: '%s'", self.model_id, file_path)
+        logger.debug("Modification request: '%s'", modification_request)
 
-**V4A Diff Format Rules:**
-- Start the entire patch with `*** Begin Patch`.
-- End the entire patch with `*** End Patch`.
-- Specify the file operation: `*** Update File: [path/to/file]`. Use the provided file path.
-- For each change block:
-    - Use `@@ ClassOrFunction` markers ONLY if needed to disambiguate context within the file. Often, no `@@` marker is needed if the context lines are unique.
-    - Provide exactly 3 lines of unchanged context before the change (unless at file start or near previous change).
-    - Mark lines to be removed with `- ` (minus sign followed by a space).
-    - Mark lines to be added with `+ ` (plus sign followed by a space).
-    - Provide exactly 3 lines of unchanged context after the change (unless at file end or near next change).
-    - Do NOT duplicate context lines between adjacent change blocks.
-- Ensure correct indentation for all lines (+, -, context).
+        # --- Plan-template cache: adapt a stored plan instead of full planning ---
+        fingerprint: Optional[str] = None
+        if self.plan_cache is not None:
+            fingerprint = plan_fingerprint("apply_patch", file_path, modification_request)
+            cached_plan = self.plan_cache.get(fingerprint, ApplyPatchPlan)
+            if cached_plan is not None:
+                adapted_plan = await self._adapt_cached_patch_plan(cached_plan, file_path, original_content, modification_request)
+                if adapted_plan is not None:
+                    return adapted_plan
+                logger.warning("Could not adapt cached patch plan. Falling back to full planning.")
 
-**CRITICAL Constraint:**
-- **DO NOT** use standard unified diff hunk headers like `@@ -x,y +a,b @@`. Only use `@@ ClassOrFunction` if *absolutely necessary* for context, otherwise rely on the 3 context lines.
-
-**Example:**
-If the original content is:
-```
-Line 1: A
-Line 2: B
-Line 3: C
-Line 4: D
-```
-And the request is "Insert 'Line 2.5: New' between Line 2 and Line 3", the correct V4A patch is:
-```
-*** Begin Patch
-*** Update File: [path/to/file]
- Line 1: A
- Line 2: B
-+Line 2.5: New
- Line 3: C
- Line 4: D
-*** End Patch
-```
-(Note: No `@@` marker was needed here as the context was sufficient)
-
-**Your Task:**
-Generate ONLY the V4A patch string based on the user request and original content, starting with `*** Begin Patch` and ending with `*** End Patch`.
-**Do NOT include any reasoning, <think> tags, or any other text outside the patch markers.**
-"""
 
         user_prompt = f"""
     File Path: "{file_path}"
@@ -472,13 +748,12 @@ Generate ONLY the V4A patch string based on the user request and original conten
     """
 
    
-        messages = [{"role": "system", "content": system_prompt}, 
+        messages = [self._apply_patch_system_msg, 
                     {"role": "user", "content": user_prompt}]
 
         try:
-            # Get the completion object from the adapter (no json_schema specified)
-            # Add 'from groq.types.chat.chat_completion import ChatCompletion' at the top if needed
-            completion_object: Optional['ChatCompletion'] = await self.adapter.chat_completion( # Type hint might need import
+            # Get the slim ChatResult from the adapter (no json_schema specified)
+            completion_object: Optional[ChatResult] = await self.adapter.chat_completion(
                 model=self.model_id, messages=messages, temperature=0.0, max_tokens=self.max_tokens # <--- Use self.max_tokens
                 # NO json_schema parameter here
             )
@@ -487,28 +762,16 @@ Generate ONLY the V4A patch string based on the user request and original conten
                 logger.error("Planner received no response object from adapter.")
                 return None
 
-            # --- Extract the string content from the completion object ---
-            raw_patch_content: Optional[str] = None
-            try:
-                 if completion_object.choices and completion_object.choices[0].message and completion_object.choices[0].message.content:
-                     raw_patch_content = completion_object.choices[0].message.content
-                     logger.info("Successfully extracted text content from LLM response.")
-                     logger.debug(f"Raw patch content received from LLM:\n---\n{raw_patch_content}\n---")
-                 else:
-                     logger.error(f"Could not extract message content from completion object structure: {completion_object}")
-                     return None
-            except AttributeError as e:
-                 logger.error(f"Error accessing content in completion object: {e}. Object: {completion_object}")
-                 return None
-            # ---------------------------------------------------------------
-
+            # --- Extract the string content from the result ---
+            raw_patch_content: Optional[str] = completion_object.content
             if not raw_patch_content:
-                # This case means content was extracted but is empty
-                logger.error("Planner received empty patch content string from LLM.")
+                logger.error(f"Planner received empty patch content from LLM (finish_reason={completion_object.finish_reason}).")
                 return None
+            logger.info("Successfully extracted text content from LLM response.")
+            logger.debug("Raw patch content received from LLM:\n---\n%s\n---", raw_patch_content)
 
             # --- Line-based validation and extraction ---
-            logger.debug(f"Attempting line-based validation of raw patch content:\n{raw_patch_content[:500]}...")
+            logger.debug("Attempting line-based validation of raw patch content:\n%s...", raw_patch_content[:500])
             start_marker = "*** Begin Patch"
             end_marker = "*** End Patch"
             validated_patch_content: Optional[str] = None
@@ -543,7 +806,7 @@ Generate ONLY the V4A patch string based on the user request and original conten
             else:
                 # Join the extracted lines back together
                 validated_patch_content = "\n".join(patch_lines)
-                logger.debug(f"Extracted Patch Content (line-based):\n{validated_patch_content}")
+                logger.debug("Extracted Patch Content (line-based):\n%s", validated_patch_content)
             # --- End Line-based validation ---
 
             # Basic check: Ensure the file path mentioned in the patch matches the input
@@ -564,7 +827,9 @@ Generate ONLY the V4A patch string based on the user request and original conten
                 patch_content=validated_patch_content,
                 reasoning=f"Apply patch to '{file_path}' based on request: {modification_request}" # Add simple reasoning
             )
-            logger.info(f"Planner proposed apply patch plan for: '{file_path}'")
+            logger.info("Planner proposed apply patch plan for: '%s'", file_path)
+            if fingerprint is not None:
+                self.plan_cache.put(fingerprint, plan)
             return plan
 
         except (GroqError, ValueError) as e: # Catch API errors or value errors during processing
@@ -575,6 +840,54 @@ Generate ONLY the V4A patch string based on the user request and original conten
             return None
 
 
+    async def _adapt_cached_patch_plan(
+        self,
+        cached_plan: ApplyPatchPlan,
+        file_path: str,
+        original_content: str,
+        modification_request: str
+    ) -> Optional[ApplyPatchPlan]:
+        """
+        Asks the LLM to adapt a cached ApplyPatchPlan to a new file/request.
+        Much smaller task than full patch planning. Returns None if adaptation fails.
+        """
+        logger.info("Planner Agent (%s) adapting cached patch plan for: '%s'", self.model_id, file_path)
+        user_prompt = f"""
+Cached Plan Patch Content:
+{cached_plan.patch_content}
+
+New File Path: "{file_path}"
+New Modification Request: "{modification_request}"
+
+New Original Content:
+{original_content}
+
+Create the adapted ApplyPatchPlan JSON object:
+"""
+        messages = [self._adapt_patch_system_msg,
+                    {"role": "user", "content": user_prompt}]
+
+        try:
+            adapted_plan: Optional[ApplyPatchPlan] = await self._chat_json(
+                messages=messages,
+                temperature=0.0,
+                max_tokens=self.max_tokens,
+                json_schema=ApplyPatchPlan
+            )
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
+            logger.error(f"Planner failed to adapt cached patch plan: {e}", exc_info=True)
+            return None
+
+        if not adapted_plan or not isinstance(adapted_plan, ApplyPatchPlan):
+            logger.error("Planner chat_completion did not return a valid adapted ApplyPatchPlan.")
+            return None
+        patch_content = adapted_plan.patch_content.strip()
+        if not (patch_content.startswith("*** Begin Patch") and patch_content.endswith("*** End Patch")):
+            logger.error("Adapted patch content is missing the Begin/End Patch markers. Discarding.")
+            return None
+        logger.info("Planner adapted cached apply patch plan for: '%s'", file_path)
+        return adapted_plan
+
     # --- Deprecated Methods ---
 
     async def _plan_word_task_deprecated(self, word: str) -> Optional[WordActionPlan]:
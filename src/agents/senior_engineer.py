@@ -1,18 +1,17 @@
 # src/agents/senior_engineer.py
 
 import logging
-import json # Import json
 from typing import Optional
 from pydantic import BaseModel, ValidationError # Ensure BaseModel and ValidationError are imported
 from groq import GroqError # Import GroqError
 
 from src.adapters.groq_adapter import GroqAdapter
+from src.utils import json_utils
 from src.models.execution_plan import ExecutionPlan # Input model
 from src.models.review_feedback import ReviewFeedback # Output model
 
 # Import constants or pass via init
 # from config import SENIOR_MODEL, SENIOR_TEMP, SENIOR_MAX_TOKENS # Example
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Define constants directly here for clarity in this example
@@ -22,6 +21,33 @@ SENIOR_MAX_TOKENS_DEFAULT = 3000 # Keep high for reasoning if included
 # Note: TEST_DIR needs to be accessible, maybe from config or passed
 TEST_DIR_DEFAULT = "main_test_environment" # Example placeholder
 
+# Schema is fixed per class; serialize it once at import instead of on every review
+REVIEW_FEEDBACK_SCHEMA_STR = json_utils.dumps(ReviewFeedback.model_json_schema(), indent=True)
+
+
+def render_review_system_prompt(test_dir: str) -> str:
+    """Renders the reviewer's system prompt for a safe working directory. Static per instance."""
+    return f"""
+You are an extremely strict Senior Developer Agent acting as a security and correctness gatekeeper.
+Your ONLY goal is to review the proposed `ExecutionPlan` given in the user message based on the strict criteria below and output your decision as a valid JSON object conforming EXACTLY to the `ReviewFeedback` schema.
+**`ReviewFeedback` Schema:**
+```json
+{REVIEW_FEEDBACK_SCHEMA_STR}
+```
+
+**Strict Review Criteria:**
+1.  **Safety:** The command MUST NOT perform destructive actions outside the designated safe working directory ('{test_dir}'). This includes `rm -rf /`, `mv /`, writing outside `{test_dir}`, etc. Assume the current working directory is the root project directory. Commands MUST operate ONLY within the `{test_dir}` subdirectory. File paths in commands must explicitly start with `{test_dir}/` or be relative paths intended to operate within it (e.g., `cd {test_dir}; ls`).
+2.  **Correctness:** The command must be syntactically valid for a standard Linux shell and plausibly contribute to the original task stated in the user message.
+3.  **Simplicity:** Prefer simple, common commands. Avoid overly complex chains or obscure utilities unless necessary.
+4.  **Idempotency (Optional but Preferred):** If possible, the command should be safe to run multiple times without unintended side effects.
+
+**Your Task:**
+Review the `command` in the proposed plan. Output ONLY the `ReviewFeedback` JSON object.
+If `approved` is `False`, provide a concise `reasoning` string explaining the violation of the criteria.
+If `approved` is `True`, the `reasoning` field MUST be omitted or null.
+Do NOT add any text before or after the JSON object.
+"""
+
 class SeniorEngineer:
     """
     Agent responsible for reviewing proposed execution plans for safety and correctness.
@@ -50,7 +76,9 @@ class SeniorEngineer:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.test_dir = test_dir # Store test dir for prompt formatting
-        logger.info(f"SeniorEngineer initialized with model: {self.model_id}")
+        # The system prompt only depends on test_dir, so it is rendered once per instance
+        self._system_msg = {"role": "system", "content": render_review_system_prompt(test_dir)}
+        logger.info("SeniorEngineer initialized with model: %s", self.model_id)
 
     async def review_plan(
         self,
@@ -78,66 +106,44 @@ class SeniorEngineer:
             # Return a default rejection feedback object
             return ReviewFeedback(approved=False, reasoning="Invalid plan received.")
 
-        logger.info(f"Senior Agent ({self.model_id}) reviewing plan: Command='{plan.command}'")
+        logger.info("Senior Agent (%s) reviewing plan: Command='%s'", self.model_id, plan.command)
 
-      
-        feedback_schema_str = json.dumps(ReviewFeedback.model_json_schema(), indent=2)
+        # Only the plan under review varies per call; the criteria live in the cached system message
+        user_prompt = f"""
+**Original Task:** {task_description}
 
-        system_prompt = f"""
-You are an extremely strict Senior Developer Agent acting as a security and correctness gatekeeper.
-Your ONLY goal is to review the proposed `ExecutionPlan` based on the strict criteria below and output your decision as a valid JSON object conforming EXACTLY to the `ReviewFeedback` schema.
-**`ReviewFeedback` Schema:**
-    ```json
-    {feedback_schema_str}
+**Context:** {context}
 
-**Strict Review Criteria:**
-1.  **Safety:** The command MUST NOT perform destructive actions outside the designated safe working directory ('{self.test_dir}'). This includes `rm -rf /`, `mv /`, writing outside `{self.test_dir}`, etc. Assume the current working directory is the root project directory. Commands MUST operate ONLY within the `{self.test_dir}` subdirectory. File paths in commands must explicitly start with `{self.test_dir}/` or be relative paths intended to operate within it (e.g., `cd {self.test_dir}; ls`).
-2.  **Correctness:** The command must be syntactically valid for a standard Linux shell and plausibly contribute to the original task: "{task_description}".
-3.  **Simplicity:** Prefer simple, common commands. Avoid overly complex chains or obscure utilities unless necessary.
-4.  **Idempotency (Optional but Preferred):** If possible, the command should be safe to run multiple times without unintended side effects.
+**Proposed Plan (by Junior Agent):**
+```json
+{{
+  "command": "{plan.command}",
+  "description": "{plan.description}"
+}}
+```
 
-**Input:**
-*   **Original Task:** {task_description}
-*   **Context:** {context}
-*   **Proposed Plan (by Junior Agent):**
-   
-    {{
-      "command": "{plan.command}",
-      "description": "{plan.description}"
-    }}
-    ```
-
-**Your Task:**
-Review the `command` in the proposed plan. Output ONLY the `ReviewFeedback` JSON object.
-If `approved` is `False`, provide a concise `reasoning` string explaining the violation of the criteria.
-If `approved` is `True`, the `reasoning` field MUST be omitted or null.
-Do NOT add any text before or after the JSON object.
+Review the proposed plan and output the ReviewFeedback JSON object:
 """
-        # Construct messages for the LLM
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Review the proposed plan for task: {task_description}"} # User message can be simple
-        ]
+        messages = [self._system_msg, {"role": "user", "content": user_prompt}]
 
         try:
-            logger.debug(f"Senior calling Groq API for JSON review. Params: model={self.model_id}, temp={self.temperature}, max_tokens={self.max_tokens}")
+            logger.debug("Senior calling Groq API for JSON review. Params: model=%s, temp=%s, max_tokens=%s", self.model_id, self.temperature, self.max_tokens)
 
             # --- Call adapter with ReviewFeedback schema ---
-            response_feedback: Optional[ReviewFeedback] = await self.adapter.chat_completion(
+            response_feedback: Optional[ReviewFeedback] = await self.adapter.chat_completion_json(
                 model=self.model_id,
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens, # Ensure sufficient tokens for JSON feedback
                 top_p=1,
                 stop=None,
-                stream=False,
                 json_schema=ReviewFeedback # Pass the ReviewFeedback class
             )
 
             # The adapter now returns a validated Pydantic object or None
             if response_feedback and isinstance(response_feedback, ReviewFeedback):
                 if response_feedback.approved:
-                    logger.info(f"Senior APPROVED plan: Command='{plan.command}'")
+                    logger.info("Senior APPROVED plan: Command='%s'", plan.command)
                 else:
                     logger.warning(f"Senior REJECTED plan: Command='{plan.command}', Reason='{response_feedback.reasoning}'")
                 return response_feedback
@@ -147,7 +153,7 @@ Do NOT add any text before or after the JSON object.
                 # Fallback: Reject the plan if review fails
                 return ReviewFeedback(approved=False, reasoning="Review process failed internally.")
 
-        except (GroqError, ValueError, ValidationError, json.JSONDecodeError) as e:
+        except (GroqError, ValueError, ValidationError, json_utils.JSONDecodeError) as e:
             # Catch errors from adapter/validation/JSON parsing
             logger.error(f"Senior agent failed during plan review: {e}", exc_info=True) # Log traceback for debug
             # Fallback: Reject the plan on error
@@ -0,0 +1,15 @@
+# src/logging_config.py
+"""
+Process-wide logging setup. Library modules only create their loggers;
+entry points (src/main.py and the prototype scripts) call configure() once at startup.
+"""
+
+import logging
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+
+
+def configure(level: int = logging.INFO) -> None:
+    """Configures the root logger with the project format and quietens the HTTP client's logs."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -8,6 +8,7 @@ from typing import Optional
 # Assuming GroqAdapter is correctly implemented and accessible
 # Adjust the import path if your project structure differs
 from src.adapters.groq_adapter import GroqAdapter
+from src.logging_config import configure as configure_logging
 from src.agents.junior_engineer import JuniorEngineer
 from src.agents.senior_engineer import SeniorEngineer
 from src.operations.command_execution import execute_command
@@ -15,13 +16,6 @@ from src.models.execution_plan import ExecutionPlan
 from src.models.review_feedback import ReviewFeedback
 from groq import GroqError
 
-# --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING) # Reduce verbosity from http library
-
 # --- Model Selection (Consider moving to a config file) ---
 # Replace with your actual model IDs if different
 JUNIOR_MODEL = "llama3-70b-8192" # Or "meta-llama/llama-4-maverick-17b-128e-instruct" if preferred
@@ -132,11 +126,13 @@ async def run_task():
     finally:
         # 7. Cleanup
         cleanup_test_environment()
+        await GroqAdapter.aclose_shared() # Release the shared HTTP connection pool
         logging.info("--- Task Orchestration Finished ---")
 
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
+    configure_logging()
     try:
         asyncio.run(run_task())
     except KeyboardInterrupt:
@@ -3,7 +3,9 @@
 Defines the Pydantic model for planning a bin check action.
 """
 
-from pydantic import BaseModel, Field
+import sys
+
+from pydantic import BaseModel, Field, field_validator
 from typing import Literal
 
 class CheckPlan(BaseModel):
@@ -13,3 +15,12 @@ class CheckPlan(BaseModel):
     action: Literal["check_bin"] = Field(..., description="Specifies the action to check the bin.")
     word: str = Field(..., description="The word to check for in the bin.")
     bin_name: Literal["Vowel Bin", "Consonant Bin"] = Field(..., description="The specific bin to check.")
+
+    # Frozen: the planner shares memoized instances of locally built check plans
+    model_config = {"frozen": True}
+
+    @field_validator("bin_name")
+    @classmethod
+    def _intern_bin_name(cls, value: str) -> str:
+        """Interns the bin name so the executor's bin-path lookup can match by identity."""
+        return sys.intern(value)
@@ -4,7 +4,7 @@ Defines the Pydantic model for planning a file read action.
 """
 
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Literal, Optional
 
 class ReadFilePlan(BaseModel):
     """
@@ -12,3 +12,7 @@ class ReadFilePlan(BaseModel):
     """
     action: Literal["read_file"] = Field(..., description="Specifies the action to read a file.")
     file_path: str = Field(..., description="The path to the file that needs to be read.")
+    max_bytes: Optional[int] = Field(None, description="Optional upper bound on the number of bytes to read (preview only). Reads the whole file if omitted.")
+
+    # Frozen; derive a plan with another preview limit via model_copy(update=...)
+    model_config = {"frozen": True}
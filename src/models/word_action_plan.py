@@ -1,5 +1,7 @@
 # src/models/word_action_plan.py
-from pydantic import BaseModel, Field
+import sys
+
+from pydantic import BaseModel, Field, field_validator
 from typing import Literal, Optional
 
 class WordActionPlan(BaseModel):
@@ -9,4 +11,13 @@ class WordActionPlan(BaseModel):
     """
     word_to_process: str = Field(..., description="The original word received.")
     target_bin: Literal["Vowel Bin", "Consonant Bin"] = Field(..., description="The designated bin based on the first letter.")
-    reasoning: Optional[str] = Field(None, description="Optional brief explanation from the Planner.") # Optional reasoning field
\ No newline at end of file
+    reasoning: Optional[str] = Field(None, description="Optional brief explanation from the Planner.") # Optional reasoning field
+
+    # Frozen so the planner can hand the same memoized add plan to every caller
+    model_config = {"frozen": True}
+
+    @field_validator("target_bin")
+    @classmethod
+    def _intern_bin_name(cls, value: str) -> str:
+        """Interns the bin name so the executor's bin-path lookup can match by identity."""
+        return sys.intern(value)
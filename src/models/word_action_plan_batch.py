@@ -0,0 +1,15 @@
+# src/models/word_action_plan_batch.py
+"""
+Defines the Pydantic model for planning several words in a single LLM call.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+from src.models.word_action_plan import WordActionPlan
+
+class WordActionPlanBatch(BaseModel):
+    """
+    Wraps one WordActionPlan per input word so a whole batch can be planned in one request.
+    """
+    plans: List[WordActionPlan] = Field(..., description="One plan per input word, in the same order as the input list.")
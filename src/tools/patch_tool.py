@@ -9,10 +9,12 @@ A self-contained **pure-Python 3.9+** utility for applying human-readable
 
 from __future__ import annotations
 
+import asyncio
 import pathlib
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import (
+    Awaitable,
     Callable,
     Dict,
     List,
@@ -745,4 +747,113 @@ def apply_commit(
 
     return results
 
+
+async def apply_commit_async(
+    commit: Commit,
+    write_fn: Callable[[str, str], Awaitable[bool]],
+    remove_fn: Callable[[str], Awaitable[bool]],
+) -> Dict[str, str]:
+    """
+    Async counterpart of apply_commit: same phases (deletes, then updates/moves, then adds)
+    and the same status strings, but all file operations within a phase run concurrently.
+
+    Because writes in a phase overlap, every path an update/move touches (its target, and
+    its source for a move) must be distinct within the patch; a change that collides with
+    an earlier one is reported as an error instead of relying on write order.
+    """
+    results: Dict[str, str] = {}
+    target_paths_written = set()
+    moved_sources = set()
+
+    async def _run(fn: Callable[..., Awaitable[bool]], *args: str) -> Union[bool, Exception]:
+        try:
+            return await fn(*args)
+        except Exception as e:
+            return e
+
+    # --- Deletes (concurrent) ---
+    delete_paths = [path for path, change in commit.changes.items() if change.type is ActionType.DELETE]
+    delete_outcomes = await asyncio.gather(*(_run(remove_fn, path) for path in delete_paths))
+    for path, outcome in zip(delete_paths, delete_outcomes):
+        if isinstance(outcome, Exception):
+            results[path] = f"Error: Unexpected exception during delete - {outcome}"
+        else:
+            results[path] = "Deleted" if outcome else "Deleted (or already missing)"
+            moved_sources.add(path)
+        del commit.changes[path]
+
+    # --- Updates and moves: validate and claim paths in order, then write concurrently ---
+    planned_updates: List[Tuple[str, str, FileChange]] = [] # (path, target, change)
+    claimed_paths = set()
+    for path, change in list(commit.changes.items()):
+        if change.type is not ActionType.UPDATE:
+            continue
+        del commit.changes[path]
+        if change.new_content is None:
+            results[path] = "Error: UPDATE change has no new content"
+            continue
+        target = change.move_path or path
+        if target in claimed_paths or (change.move_path and path in claimed_paths):
+            results[path] = f"Error: Cannot move/update to '{target}', it was modified in the same patch."
+            continue
+        if path in moved_sources:
+            results[path] = f"Error: Cannot update '{path}', it was deleted in the same patch."
+            continue
+        claimed_paths.add(target)
+        if change.move_path:
+            claimed_paths.add(path)
+        planned_updates.append((path, target, change))
+
+    write_outcomes = await asyncio.gather(
+        *(_run(write_fn, target, change.new_content) for _, target, change in planned_updates)
+    )
+    pending_moves: List[Tuple[str, str]] = [] # (original path, target) whose original must be removed
+    for (path, target, change), outcome in zip(planned_updates, write_outcomes):
+        if isinstance(outcome, Exception):
+            results[path] = f"Error: Unexpected exception during update/move - {outcome}"
+        elif not outcome:
+            results[path] = f"Error: Failed to write update to {target}"
+        else:
+            target_paths_written.add(target)
+            if change.move_path:
+                pending_moves.append((path, target))
+            else:
+                results[path] = "Updated"
+
+    move_outcomes = await asyncio.gather(*(_run(remove_fn, path) for path, _ in pending_moves))
+    for (path, target), outcome in zip(pending_moves, move_outcomes):
+        if isinstance(outcome, Exception):
+            results[path] = f"Error: Unexpected exception during update/move - {outcome}"
+        elif outcome:
+            results[path] = f"Moved to {target}"
+            moved_sources.add(path)
+        else:
+            results[path] = f"Error: Updated at {target}, but failed to remove original {path}"
+
+    # --- Adds (concurrent) ---
+    planned_adds: List[Tuple[str, str]] = []
+    for path, change in commit.changes.items():
+        if change.type is not ActionType.ADD:
+            results[path] = f"Error: Unhandled change type '{change.type}'"
+        elif change.new_content is None:
+            results[path] = "Error: ADD change has no content"
+        elif path in target_paths_written:
+            results[path] = f"Error: Cannot add '{path}', path was already written to in the same patch."
+        elif path in moved_sources:
+            results[path] = f"Error: Cannot add '{path}', path was deleted or moved from in the same patch."
+        else:
+            planned_adds.append((path, change.new_content))
+
+    add_outcomes = await asyncio.gather(*(_run(write_fn, path, content) for path, content in planned_adds))
+    for (path, _), outcome in zip(planned_adds, add_outcomes):
+        if isinstance(outcome, Exception):
+            results[path] = f"Error: Unexpected exception during add - {outcome}"
+        elif outcome:
+            results[path] = "Added"
+            target_paths_written.add(path)
+        else:
+            results[path] = "Error: Failed to write new file"
+
+    return results
+
 # Note: Removed main_cli() and if __name__ == "__main__": block
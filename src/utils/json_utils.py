@@ -1 +1,49 @@
-# src/utils/json_utils.py
\ No newline at end of file
+# src/utils/json_utils.py
+"""
+JSON helpers shared by the adapter and agents.
+Uses orjson when it is installed (much faster than the stdlib encoder/decoder)
+and falls back to the standard json module otherwise.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError: # orjson is optional
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# Catch this for decode errors from either backend (orjson.JSONDecodeError subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serializes obj to a JSON string, using a 2-space indent and/or sorted keys if requested."""
+    if orjson is not None:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serializes obj to compact UTF-8 JSON bytes (e.g. for hashing), skipping the str round trip with orjson.
+    Both backends produce the same bytes (no spaces, non-ASCII unescaped), so cache keys built from them
+    stay valid whether or not orjson is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parses a JSON string or bytes. Raises JSONDecodeError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data) # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data)
@@ -14,6 +14,7 @@ import os
 import platform
 import shutil
 from typing import Optional
+from src.logging_config import configure as configure_logging
 from src.adapters.groq_adapter import GroqAdapter # Ensure this path is correct
 from groq import GroqError
 from pydantic import ValidationError
@@ -23,11 +24,7 @@ import re # Import regex for better final word extraction
 from src.operations.command_execution import execute_command # Import the moved function
 
 # --- Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+configure_logging()
 logging.getLogger("src.adapters.groq_adapter").setLevel(logging.INFO)
 
 # --- Model Selection ---
@@ -76,8 +73,8 @@ Based on the task and context, provide the single macOS/BSD compatible bash comm
             model=JUNIOR_MODEL, messages=messages, temperature=JUNIOR_TEMP,
             max_tokens=JUNIOR_MAX_TOKENS, top_p=1, stop=None, stream=False,
         )
-        if response_gen and response_gen.choices and response_gen.choices[0].message and response_gen.choices[0].message.content:
-            proposed_command = response_gen.choices[0].message.content.strip()
+        if response_gen and response_gen.content:
+            proposed_command = response_gen.content.strip()
             # More robust cleaning
             if proposed_command.startswith("```bash"):
                 proposed_command = proposed_command[7:].strip()
@@ -154,8 +151,8 @@ Decision:
             top_p=1, stop=None, stream=False, reasoning_format=reasoning_fmt
         )
 
-        if response and response.choices and response.choices[0].message and response.choices[0].message.content:
-            raw_decision_full = response.choices[0].message.content.strip()
+        if response and response.content:
+            raw_decision_full = response.content.strip()
             logging.info(f"Senior raw full response: '{raw_decision_full}'")
 
             final_word = "AMBIGUOUS" # Default if parsing fails
@@ -1 +1,396 @@
-# tests/test_file_operations.py
\ No newline at end of file
+# tests/test_file_operations.py
+
+import asyncio
+import os
+import stat
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.agents.executor_agent import ExecutorAgent
+from src.models.check_plan import CheckPlan
+from src.models.read_file_plan import ReadFilePlan
+from src.models.word_action_plan import WordActionPlan
+from src.models.write_file_plan import WriteFilePlan
+from src.tools.patch_tool import ActionType, Commit, FileChange, apply_commit_async
+
+
+@pytest.fixture
+def executor(tmp_path):
+    agent = ExecutorAgent(MagicMock(), "test-model", data_dir=str(tmp_path / "data"))
+    yield agent
+    agent.close()
+
+
+def _write(executor: ExecutorAgent, file_path, content: str):
+    plan = WriteFilePlan(action="write_file", file_path=str(file_path), content=content)
+    return asyncio.run(executor.execute_write_file(plan))
+
+
+# --- _write_file_data ---
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_write_keeps_file_mode(executor, tmp_path):
+    target = tmp_path / "script.sh"
+    target.write_text("old")
+    os.chmod(target, 0o755)
+
+    result = _write(executor, target, "new")
+
+    assert result.status == "Success"
+    assert target.read_text() == "new"
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o755
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_new_file_mode_follows_current_umask(executor, tmp_path):
+    previous = os.umask(0o027) # Set after import: the write must see the umask in effect now
+    try:
+        result = _write(executor, tmp_path / "new.txt", "new")
+    finally:
+        os.umask(previous)
+
+    assert result.status == "Success"
+    assert stat.S_IMODE(os.stat(tmp_path / "new.txt").st_mode) == 0o640
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unavailable")
+def test_write_through_symlink_keeps_link(executor, tmp_path):
+    target = tmp_path / "real.txt"
+    target.write_text("old")
+    link = tmp_path / "link.txt"
+    os.symlink(target, link)
+
+    assert _write(executor, link, "new").status == "Success"
+
+    assert os.path.islink(link)
+    assert target.read_text() == "new"
+
+
+def test_write_keeps_hard_links(executor, tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("old")
+    second = tmp_path / "second.txt"
+    os.link(first, second)
+
+    assert _write(executor, second, "new").status == "Success"
+
+    assert first.read_text() == "new"
+    assert os.stat(first).st_nlink == 2
+
+
+def _read(executor: ExecutorAgent, file_path) -> str:
+    return asyncio.run(executor.execute_read_file(ReadFilePlan(action="read_file", file_path=str(file_path)))).content
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unavailable")
+def test_write_through_symlink_refreshes_both_reads(executor, tmp_path):
+    target = os.path.realpath(tmp_path / "real.txt")
+    with open(target, "w") as f:
+        f.write("old")
+    link = tmp_path / "link.txt"
+    os.symlink(target, link)
+    assert _read(executor, target) == "old"
+    before = os.stat(target)
+
+    assert _write(executor, link, "new").status == "Success"
+    os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns)) # Same size and mtime: stat alone cannot tell
+
+    assert str(link) in executor._file_cache # Primed by the write
+    assert _read(executor, link) == "new"
+    assert _read(executor, target) == "new"
+
+
+def test_write_through_hard_link_refreshes_other_links(executor, tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("old")
+    second = tmp_path / "second.txt"
+    os.link(first, second)
+    assert _read(executor, first) == "old"
+
+    assert _write(executor, second, "newer").status == "Success"
+
+    assert str(second) in executor._file_cache
+    assert _read(executor, second) == "newer"
+    assert _read(executor, first) == "newer" # Its cached read is rejected by the size/mtime check
+
+
+def test_concurrent_writes_to_one_path(executor, tmp_path):
+    target = tmp_path / "shared.txt"
+    contents = [str(i) * 10_000 for i in range(8)]
+
+    async def write_all():
+        return await asyncio.gather(*(
+            executor.execute_write_file(WriteFilePlan(action="write_file", file_path=str(target), content=c))
+            for c in contents
+        ))
+
+    results = asyncio.run(write_all())
+
+    assert all(r.status == "Success" for r in results)
+    assert target.read_text() in contents
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_write_creates_missing_parent_dirs(executor, tmp_path):
+    target = tmp_path / "a" / "b" / "new.txt"
+
+    result = _write(executor, target, "hello")
+
+    assert result.status == "Success"
+    assert result.bytes_written == 5
+    assert target.read_text() == "hello"
+
+
+# --- Buffered bin appends ---
+
+def _add_plan(word: str) -> WordActionPlan:
+    return WordActionPlan(word_to_process=word, target_bin="Vowel Bin")
+
+
+def _bin_lines(executor: ExecutorAgent, bin_name: str = "Vowel Bin"):
+    with open(executor.bin_files[bin_name], encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_add_flush_resume_round_trip(tmp_path):
+    data_dir = str(tmp_path / "data")
+    first = ExecutorAgent(MagicMock(), "test-model", data_dir=data_dir, bin_flush_lines=100)
+    for word in ("apple", "egg", "apple", "ice"):
+        first.execute_add_sync(_add_plan(word))
+    assert _bin_lines(first) == [] # Still buffered
+    assert asyncio.run(first.flush_all())
+    assert _bin_lines(first) == ["apple", "egg", "ice"]
+    first.close()
+
+    resumed = ExecutorAgent(MagicMock(), "test-model", data_dir=data_dir, resume_bins=True)
+    check = resumed.execute_check_sync(CheckPlan(action="check_bin", word="egg", bin_name="Vowel Bin"))
+    assert check.status == "Present"
+    resumed.execute_add_sync(_add_plan("owl"))
+    resumed.close()
+    assert _bin_lines(resumed) == ["apple", "egg", "ice", "owl"]
+
+    fresh = ExecutorAgent(MagicMock(), "test-model", data_dir=data_dir)
+    assert _bin_lines(fresh) == [] # A fresh run truncates the bins
+    fresh.close()
+
+
+def test_resume_terminates_a_torn_last_line(tmp_path):
+    data_dir = tmp_path / "data"
+    first = ExecutorAgent(MagicMock(), "test-model", data_dir=str(data_dir))
+    first.close()
+    with open(first.bin_files["Vowel Bin"], "ab") as f:
+        f.write(b"apple\negg\nic") # A crash cut the last append short
+
+    resumed = ExecutorAgent(MagicMock(), "test-model", data_dir=str(data_dir), resume_bins=True)
+    check = resumed.execute_check_sync(CheckPlan(action="check_bin", word="egg", bin_name="Vowel Bin"))
+    resumed.execute_add_sync(_add_plan("owl"))
+    resumed.close()
+
+    assert check.status == "Present"
+    assert _bin_lines(resumed) == ["apple", "egg", "ic", "owl"] # "owl" is not glued onto the torn line
+
+
+def test_adds_during_flush_are_not_lost(executor, monkeypatch):
+    executor.bin_flush_lines = 100
+    write_started = threading.Event()
+    release_write = threading.Event()
+    write_batches = executor._write_bin_batches
+
+    def slow_write(encoded):
+        write_started.set()
+        release_write.wait(5)
+        return write_batches(encoded)
+
+    monkeypatch.setattr(executor, "_write_bin_batches", slow_write)
+
+    async def scenario():
+        executor.execute_add_sync(_add_plan("apple"))
+        flush = asyncio.create_task(executor.flush_all())
+        await asyncio.to_thread(write_started.wait, 5)
+        executor.execute_add_sync(_add_plan("egg")) # Lands while the first batch is being written
+        release_write.set()
+        assert await flush
+        assert await executor.flush_all()
+
+    asyncio.run(scenario())
+    assert _bin_lines(executor) == ["apple", "egg"]
+
+
+def test_gathered_adds_run_one_flush_at_a_time(executor, monkeypatch):
+    executor.bin_flush_lines = 2
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+    write_batches = executor._write_bin_batches
+
+    def counting_write(encoded):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        try:
+            threading.Event().wait(0.01) # Keep the write open long enough for other adds to arrive
+            return write_batches(encoded)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    monkeypatch.setattr(executor, "_write_bin_batches", counting_write)
+    words = [f"a{i}" for i in range(40)]
+
+    async def add_all():
+        results = await asyncio.gather(*(executor.execute_add(_add_plan(word)) for word in words))
+        await executor.flush_all()
+        return results
+
+    results = asyncio.run(add_all())
+
+    assert all(r.status == "Success" for r in results)
+    assert max_in_flight == 1
+    assert sorted(_bin_lines(executor)) == sorted(words)
+
+
+def test_aclose_waits_for_a_flush_in_flight(executor, monkeypatch):
+    executor.bin_flush_lines = 100
+    release_write = threading.Event()
+    write_batches = executor._write_bin_batches
+
+    def slow_write(encoded):
+        release_write.wait(5)
+        return write_batches(encoded)
+
+    monkeypatch.setattr(executor, "_write_bin_batches", slow_write)
+
+    async def scenario():
+        executor.execute_add_sync(_add_plan("apple"))
+        flush = asyncio.create_task(executor.flush_all())
+        await asyncio.sleep(0) # Let the flush take the lock
+        closing = asyncio.create_task(executor.aclose())
+        await asyncio.sleep(0.01)
+        assert not closing.done() and executor._bin_fds # Teardown waits for the write
+        release_write.set()
+        assert await flush
+        await closing
+
+    asyncio.run(scenario())
+    assert executor._bin_fds == {}
+    assert _bin_lines(executor) == ["apple"]
+
+
+def test_close_releases_resources_when_flush_fails(tmp_path, monkeypatch):
+    agent = ExecutorAgent(MagicMock(), "test-model", data_dir=str(tmp_path / "data"), io_workers=1)
+    monkeypatch.setattr(agent, "flush_bins", MagicMock(side_effect=OSError("disk full")))
+
+    with pytest.raises(OSError):
+        agent.close()
+
+    assert agent._io_pool is None
+    assert agent._bin_fds == {}
+
+
+def test_buffered_execution_applies_plans_in_batches(executor):
+    async def run():
+        async with executor.buffered_execution(flush_size=2) as buffer:
+            await buffer.try_execute(_add_plan("apple"))
+            assert buffer.pending == 1
+            await buffer.try_execute(_add_plan("egg")) # Reaches flush_size
+            assert buffer.pending == 0 and len(buffer.results) == 2
+            await buffer.try_execute(_add_plan("ice"))
+        return buffer.results
+
+    results = asyncio.run(run())
+
+    assert [r.status for r in results] == ["Success"] * 3
+    assert _bin_lines(executor) == ["apple", "egg", "ice"]
+
+
+def test_buffered_execution_discards_pending_plans_on_error(executor, caplog):
+    async def run():
+        async with executor.buffered_execution(flush_size=10) as buffer:
+            await buffer.try_execute(_add_plan("apple"))
+            raise RuntimeError("planner failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+    assert "Discarding 1 buffered add plan(s)" in caplog.text
+    check = executor.execute_check_sync(CheckPlan(action="check_bin", word="apple", bin_name="Vowel Bin"))
+    assert check.status == "Not Present"
+
+
+# --- apply_commit_async ---
+
+class _FakeFiles:
+    """In-memory write/remove callbacks for apply_commit_async; writes to fail_paths fail."""
+    def __init__(self, fail_paths=(), raise_paths=()):
+        self.files = {}
+        self.removed = []
+        self.fail_paths = set(fail_paths)
+        self.raise_paths = set(raise_paths)
+
+    async def write(self, path: str, content: str) -> bool:
+        await asyncio.sleep(0) # Let the other writes of the phase interleave
+        if path in self.raise_paths:
+            raise OSError(f"disk full writing {path}")
+        if path in self.fail_paths:
+            return False
+        self.files[path] = content
+        return True
+
+    async def remove(self, path: str) -> bool:
+        self.removed.append(path)
+        return True
+
+
+def test_apply_commit_async_reports_failed_writes():
+    commit = Commit(changes={
+        "ok.txt": FileChange(ActionType.UPDATE, old_content="a", new_content="A"),
+        "bad.txt": FileChange(ActionType.UPDATE, old_content="b", new_content="B"),
+        "boom.txt": FileChange(ActionType.ADD, new_content="C"),
+        "new.txt": FileChange(ActionType.ADD, new_content="D"),
+    })
+    files = _FakeFiles(fail_paths={"bad.txt"}, raise_paths={"boom.txt"})
+
+    results = asyncio.run(apply_commit_async(commit, files.write, files.remove))
+
+    assert results["ok.txt"] == "Updated"
+    assert results["bad.txt"] == "Error: Failed to write update to bad.txt"
+    assert results["boom.txt"].startswith("Error: Unexpected exception during add - disk full")
+    assert results["new.txt"] == "Added"
+    assert files.files == {"ok.txt": "A", "new.txt": "D"}
+
+
+def test_apply_commit_async_keeps_source_when_move_write_fails():
+    commit = Commit(changes={
+        "old.txt": FileChange(ActionType.UPDATE, old_content="x", new_content="y", move_path="moved.txt"),
+    })
+    files = _FakeFiles(fail_paths={"moved.txt"})
+
+    results = asyncio.run(apply_commit_async(commit, files.write, files.remove))
+
+    assert results["old.txt"] == "Error: Failed to write update to moved.txt"
+    assert files.removed == []
+
+
+def test_apply_commit_async_with_executor_write_failure(executor, tmp_path):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("a file, not a directory")
+    good = str(tmp_path / "good.txt")
+    bad = str(blocker / "bad.txt") # Parent is a regular file, so the write fails
+    commit = Commit(changes={
+        good: FileChange(ActionType.ADD, new_content="good"),
+        bad: FileChange(ActionType.ADD, new_content="bad"),
+    })
+
+    async def write(path: str, content: str) -> bool:
+        return await executor._run_io(executor._write_file_content, path, content)
+
+    async def remove(path: str) -> bool:
+        return await executor._run_io(executor._remove_file, path)
+
+    results = asyncio.run(apply_commit_async(commit, write, remove))
+
+    assert results == {good: "Added", bad: "Error: Failed to write new file"}
+    assert open(good, encoding="utf-8").read() == "good"
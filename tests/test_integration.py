@@ -1 +1,748 @@
-# tests/test_integration.py
\ No newline at end of file
+# tests/test_integration.py
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from groq.types.chat import ChatCompletion
+from pydantic import ValidationError
+
+from src.adapters import groq_adapter, response_cache, semantic_cache
+from src.adapters.groq_adapter import GroqAdapter
+from src.adapters.response_cache import ResponseCache, SQLiteResponseCache, make_cache_key
+from src.adapters.semantic_cache import SemanticCache
+from src.agents.plan_cache import PlanCache, normalize_request, plan_fingerprint
+from src.agents.planner_agent import PlannerAgent, classify_word_bin
+from src.models.check_plan import CheckPlan
+from src.models.check_result import CheckResult
+from src.models.read_file_plan import ReadFilePlan
+from src.models.word_action_plan import WordActionPlan
+from src.models.word_action_plan_batch import WordActionPlanBatch
+from src.models.write_file_plan import WriteFilePlan
+from src.utils import json_utils
+
+
+def _completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "cmpl-test", "object": "chat.completion", "created": 0, "model": "test-model",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    })
+
+
+def _mock_adapter(*contents: str, **kwargs) -> GroqAdapter:
+    """Adapter whose API calls return the given contents in turn (the last one repeats)."""
+    adapter = GroqAdapter(api_key="test-key", share_client=False, **kwargs)
+    completions = [_completion(content) for content in contents]
+
+    async def create_completion(api_params):
+        return completions.pop(0) if len(completions) > 1 else completions[0]
+
+    adapter._create_completion = AsyncMock(side_effect=create_completion)
+    return adapter
+
+
+def _user(prompt: str):
+    return [{"role": "user", "content": prompt}]
+
+
+# --- Response cache ---
+
+class _Clock:
+    """Stands in for time.monotonic/time.time so TTL tests do not sleep."""
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(response_cache.time, "monotonic", fake)
+    monkeypatch.setattr(response_cache.time, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    """Builds either cache backend; both must behave the same."""
+    if request.param == "memory":
+        yield ResponseCache
+        return
+    opened = []
+
+    def build(**kwargs):
+        cache = SQLiteResponseCache(str(tmp_path / f"cache{len(opened)}.db"), **kwargs)
+        opened.append(cache)
+        return cache
+
+    yield build
+    for cache in opened:
+        cache.close()
+
+
+def test_response_cache_hit_and_miss_counts(make_cache):
+    cache = make_cache()
+    assert cache.get("k") is None
+    cache.set("k", "answer", model="m")
+
+    assert cache.get("k") == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_response_cache_evicts_least_recently_used(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "A")
+    clock.now += 100 # Past SQLite's access-stamp interval, so the hit below refreshes "a"
+    cache.set("b", "B")
+    clock.now += 100
+    assert cache.get("a") == "A" # "b" is now the least recently used
+    clock.now += 100
+    cache.set("c", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_response_cache_expires_entries_after_ttl(make_cache, clock):
+    cache = make_cache(ttl_seconds=10)
+    cache.set("k", "answer")
+
+    clock.now += 9
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_response_cache_invalidate_by_model(make_cache):
+    cache = make_cache()
+    cache.set("old-1", "1", model="old")
+    cache.set("old-2", "2", model="old")
+    cache.set("new", "3", model="new")
+
+    assert cache.invalidate_by_model("old") == 2
+    assert cache.get("old-1") is None
+    assert cache.get("new") == "3"
+
+
+def test_sqlite_cache_persists_completions(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = SQLiteResponseCache(path)
+    first.set("k", _completion("answer"), model="m")
+    first.close()
+
+    reopened = SQLiteResponseCache(path)
+    cached = reopened.get("k")
+    reopened.close()
+
+    assert isinstance(cached, ChatCompletion)
+    assert cached.choices[0].message.content == "answer"
+
+
+def test_sqlite_cache_hits_do_not_write(tmp_path, clock):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.db"))
+    cache.set("k", "answer")
+
+    def stored_access():
+        return sqlite3.connect(cache.db_path).execute("SELECT accessed FROM response_cache").fetchone()[0]
+
+    clock.now += 1
+    assert cache.get("k") == "answer"
+    assert not cache._conn.in_transaction
+    assert stored_access() == 1000.0 # Recent stamps are left alone
+
+    clock.now += 100
+    assert cache.get("k") == "answer"
+    assert not cache._conn.in_transaction # Stale stamps are queued, not written per hit
+    cache.close()
+    assert stored_access() == 1101.0
+
+
+def test_adapter_sqlite_cache_serves_repeated_calls(tmp_path):
+    adapter = _mock_adapter("first", "second", cache_enabled=True, cache_path=str(tmp_path / "cache.db"))
+
+    async def ask():
+        try:
+            return [await adapter.chat_completion(_user("hello"), model="test-model", temperature=0) for _ in range(2)]
+        finally:
+            await adapter.aclose()
+
+    assert [result.content for result in asyncio.run(ask())] == ["first", "first"]
+    assert adapter._create_completion.await_count == 1
+
+
+def _stream(*chunks: str, fail: bool = False):
+    async def chunk_stream():
+        for text in chunks:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        if fail:
+            raise RuntimeError("connection dropped")
+    return chunk_stream()
+
+
+async def _collect(adapter: GroqAdapter, prompt: str = "hello", temperature: float = 0):
+    return [chunk async for chunk in adapter.chat_completion_stream(_user(prompt), model="test-model", temperature=temperature)]
+
+
+def test_deterministic_stream_is_replayed_from_cache():
+    adapter = GroqAdapter(api_key="test-key", share_client=False, cache_enabled=True)
+    adapter._create_completion = AsyncMock(side_effect=lambda params: _stream("Hel", "lo"))
+
+    assert asyncio.run(_collect(adapter)) == ["Hel", "lo"]
+    assert asyncio.run(_collect(adapter)) == ["Hello"] # Replayed as one joined chunk
+    assert adapter._create_completion.await_count == 1
+    assert asyncio.run(_collect(adapter, temperature=0.7)) == ["Hel", "lo"] # Sampled streams are not cached
+    assert adapter._create_completion.await_count == 2
+
+
+def test_failed_stream_is_not_cached():
+    adapter = GroqAdapter(api_key="test-key", share_client=False, cache_enabled=True)
+    adapter._create_completion = AsyncMock(side_effect=[_stream("Hel", fail=True), _stream("Hel", "lo")])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_collect(adapter))
+    assert asyncio.run(_collect(adapter)) == ["Hel", "lo"]
+    assert adapter._create_completion.await_count == 2
+
+
+def test_adapter_serves_repeated_deterministic_calls_from_cache():
+    adapter = _mock_adapter("first", "second", cache_enabled=True)
+
+    async def ask(temperature: float):
+        return await adapter.chat_completion(_user("hello"), model="test-model", temperature=temperature)
+
+    assert asyncio.run(ask(0)).content == "first"
+    assert asyncio.run(ask(0)).content == "first" # Served from the cache
+    assert adapter._create_completion.await_count == 1
+    assert asyncio.run(ask(0.7)).content == "second" # Sampled calls are never cached
+    assert adapter._create_completion.await_count == 2
+
+
+def test_adapter_cache_is_keyed_by_request():
+    adapter = _mock_adapter("first", "second", cache_enabled=True)
+
+    async def ask(prompt: str):
+        return await adapter.chat_completion(_user(prompt), model="test-model", temperature=0)
+
+    assert asyncio.run(ask("hello")).content == "first"
+    assert asyncio.run(ask("goodbye")).content == "second"
+    assert adapter._create_completion.await_count == 2
+
+
+# --- Batched calls and rate limiting ---
+
+class _SlowAPI:
+    """Stands in for GroqAdapter._send_request, recording how many requests overlap."""
+    def __init__(self, fail_on: str = "", reply=lambda prompt: f"echo {prompt}"):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+        self.reply = reply
+
+    async def __call__(self, api_params):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            prompt = api_params["messages"][-1]["content"]
+            if prompt == self.fail_on:
+                raise RuntimeError(f"failed on {prompt}")
+            return _completion(self.reply(prompt))
+        finally:
+            self.in_flight -= 1
+
+
+def _batch(prompts):
+    return [{"messages": _user(prompt), "model": "test-model", "temperature": 0.5} for prompt in prompts]
+
+
+def test_chat_completion_batch_keeps_order_and_bounds_concurrency():
+    adapter = GroqAdapter(api_key="test-key", share_client=False, max_concurrency=3)
+    adapter._send_request = api = _SlowAPI()
+    prompts = [f"p{i}" for i in range(10)]
+
+    results = asyncio.run(adapter.chat_completion_batch(_batch(prompts)))
+
+    assert [result.content for result in results] == [f"echo {prompt}" for prompt in prompts]
+    assert api.max_in_flight == 3
+
+
+def test_planner_fan_out_is_bounded_by_the_adapter():
+    adapter = GroqAdapter(api_key="test-key", share_client=False, max_concurrency=2)
+    adapter._send_request = api = _SlowAPI(reply=lambda prompt: '{"action": "check_bin", "word": "w", "bin_name": "Vowel Bin"}')
+    planner = PlannerAgent(adapter, "test-model", local_fast_path=False)
+
+    plans = asyncio.run(planner.plan_check_tasks([f"w{i}" for i in range(6)]))
+
+    assert all(isinstance(plan, CheckPlan) for plan in plans)
+    assert api.max_in_flight == 2
+
+
+def test_chat_completion_batch_return_exceptions():
+    adapter = GroqAdapter(api_key="test-key", share_client=False)
+    adapter._send_request = _SlowAPI(fail_on="p1")
+
+    results = asyncio.run(adapter.chat_completion_batch(_batch(["p0", "p1", "p2"]), return_exceptions=True))
+
+    assert results[0].content == "echo p0"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2].content == "echo p2"
+    with pytest.raises(RuntimeError):
+        asyncio.run(adapter.chat_completion_batch(_batch(["p0", "p1"])))
+
+
+class _RecordingLimiter:
+    """Minimal aiolimiter.AsyncLimiter stand-in that counts acquisitions."""
+    def __init__(self, max_rate, time_period):
+        self.max_rate, self.time_period = max_rate, time_period
+        self.acquired = 0
+
+    async def __aenter__(self):
+        self.acquired += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+
+def test_rate_limiter_wraps_every_api_request(monkeypatch):
+    monkeypatch.setattr(groq_adapter, "AsyncLimiter", _RecordingLimiter)
+    adapter = GroqAdapter(api_key="test-key", share_client=False, requests_per_minute=120)
+    adapter._send_request = _SlowAPI()
+
+    asyncio.run(adapter.chat_completion_batch(_batch(["p0", "p1", "p2"])))
+
+    limiter = adapter._rate_limiter
+    assert (limiter.max_rate, limiter.time_period) == (120, 60)
+    assert limiter.acquired == 3
+
+
+def test_rate_limit_without_aiolimiter_falls_back_to_concurrency(monkeypatch):
+    monkeypatch.setattr(groq_adapter, "AsyncLimiter", None)
+    adapter = GroqAdapter(api_key="test-key", share_client=False, requests_per_minute=120)
+    adapter._send_request = _SlowAPI()
+
+    results = asyncio.run(adapter.chat_completion_batch(_batch(["p0"])))
+
+    assert adapter._rate_limiter is None
+    assert results[0].content == "echo p0"
+
+
+# --- Cache keys ---
+
+def test_cache_key_ignores_dict_order():
+    assert make_cache_key({"model": "m", "temperature": 0}) == make_cache_key({"temperature": 0, "model": "m"})
+    assert make_cache_key({"model": "m"}) != make_cache_key({"model": "n"})
+
+
+def test_cache_keys_match_across_json_backends(monkeypatch):
+    payload = {"model": "m", "temperature": 0, "messages": [{"role": "user", "content": "café ☕ \"quoted\""}], "stop": None}
+    with_default_backend = (json_utils.dumps_bytes(payload, sort_keys=True), make_cache_key(payload))
+
+    monkeypatch.setattr(json_utils, "orjson", None) # Force the stdlib fallback
+
+    assert json_utils.dumps_bytes(payload, sort_keys=True) == with_default_backend[0]
+    assert make_cache_key(payload) == with_default_backend[1]
+
+
+# --- Plan-template cache ---
+
+def test_normalize_request_masks_line_numbers_and_whitespace():
+    assert normalize_request("  Fix the bug on LINE 42\n and  line 7 ") == "fix the bug on line # and line #"
+    assert normalize_request("Update lines 10 please") == "update line # please"
+
+
+def test_plan_fingerprint_matches_same_shape_only():
+    base = plan_fingerprint("modify", "src/a.py", "Rename foo on line 3")
+
+    assert plan_fingerprint("modify", "lib/B.PY", "rename  foo on line 90") == base
+    assert plan_fingerprint("modify", "src/a.js", "Rename foo on line 3") != base
+    assert plan_fingerprint("read", "src/a.py", "Rename foo on line 3") != base
+    assert plan_fingerprint("modify", "src/a.py", "Rename bar on line 3") != base
+
+
+def test_plan_cache_round_trip_is_typed(tmp_path):
+    cache = PlanCache(str(tmp_path / "plans" / "plan_cache.db"))
+    try:
+        fingerprint = plan_fingerprint("read", "notes.txt", "show the file")
+        plan = ReadFilePlan(action="read_file", file_path="notes.txt")
+        cache.put(fingerprint, plan)
+
+        assert cache.get(fingerprint, ReadFilePlan) == plan
+        assert cache.get(fingerprint, CheckPlan) is None # Stored under another plan type
+        assert cache.get("unknown", ReadFilePlan) is None
+    finally:
+        cache.close()
+
+
+def test_planner_close_releases_plan_cache(tmp_path):
+    planner = PlannerAgent(MagicMock(), "test-model", plan_cache_enabled=True,
+                           plan_cache_path=str(tmp_path / "plan_cache.db"))
+    connection = planner.plan_cache._conn
+
+    planner.close()
+    planner.close() # Idempotent
+
+    assert planner.plan_cache is None
+    with pytest.raises(sqlite3.ProgrammingError): # Closed database
+        connection.execute("SELECT 1")
+
+
+# --- Semantic cache ---
+
+_VOCABULARY = ("apple", "banana", "plan", "review", "weather")
+
+
+class _Vectors(list):
+    """List of rows with the one numpy method SemanticCache calls."""
+    def astype(self, dtype):
+        return self
+
+
+class _FakeEncoder:
+    """Bag-of-words SentenceTransformer stand-in over a tiny vocabulary."""
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return len(_VOCABULARY)
+
+    def encode(self, texts, normalize_embeddings, convert_to_numpy):
+        time.sleep(0.001) # Widen race windows between threads
+        words = texts[0].split()
+        row = [float(words.count(term)) for term in _VOCABULARY]
+        norm = math.sqrt(sum(x * x for x in row)) or 1.0
+        return _Vectors([[x / norm for x in row]])
+
+
+class _FakeIndex:
+    """faiss.IndexFlatIP stand-in: exact inner-product search over the added rows."""
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.rows = []
+
+    def add(self, embedding):
+        self.rows.extend(embedding)
+
+    def search(self, embedding, k):
+        query = embedding[0]
+        scored = sorted(((sum(a * b for a, b in zip(query, row)), i) for i, row in enumerate(self.rows)), reverse=True)[:k]
+        return [[score for score, _ in scored]], [[i for _, i in scored]]
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "faiss", SimpleNamespace(IndexFlatIP=_FakeIndex))
+    monkeypatch.setattr(semantic_cache, "SentenceTransformer", _FakeEncoder)
+
+
+def test_semantic_cache_matches_near_duplicates_in_the_same_context(fake_embeddings):
+    cache = SemanticCache(threshold=0.9)
+    cache.add("Plan apple", "model-a", "answer", context="planner")
+
+    assert cache.lookup("Could you please plan   APPLE", "model-a", context="planner") == "answer"
+    assert cache.lookup("Plan banana", "model-a", context="planner") is None # Not similar enough
+    assert cache.lookup("Plan apple", "model-b", context="planner") is None
+    assert cache.lookup("Plan apple", "model-a", context="reviewer") is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_semantic_cache_unavailable_without_dependencies(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "faiss", None)
+    cache = SemanticCache()
+    cache.add("Plan apple", "model-a", "answer")
+
+    assert not cache.available
+    assert cache.lookup("Plan apple", "model-a") is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_concurrent_adds_keep_rows_aligned(fake_embeddings):
+    cache = SemanticCache(threshold=0.99)
+    prompts = [" ".join([term] * (i + 1) + ["plan"]) for i, term in enumerate(_VOCABULARY)]
+    start = threading.Barrier(len(prompts))
+
+    def add(prompt: str):
+        start.wait()
+        cache.add(prompt, "model-a", f"answer to {prompt}")
+
+    threads = [threading.Thread(target=add, args=(prompt,)) for prompt in prompts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == len(prompts)
+    for prompt in prompts:
+        assert cache.lookup(prompt, "model-a") == f"answer to {prompt}"
+
+
+def test_adapter_semantic_tier_respects_the_system_prompt(fake_embeddings):
+    adapter = _mock_adapter("planner answer", "reviewer answer", enable_semantic_cache=True, semantic_threshold=0.9)
+
+    async def ask(system: str, prompt: str):
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+        return (await adapter.chat_completion(messages, model="test-model", temperature=0)).content
+
+    assert asyncio.run(ask("You are the planner.", "Plan apple")) == "planner answer"
+    assert asyncio.run(ask("You are the planner.", "Please plan apple")) == "planner answer"
+    assert adapter._create_completion.await_count == 1
+    assert asyncio.run(ask("You are the reviewer.", "Please plan apple")) == "reviewer answer"
+    assert adapter._create_completion.await_count == 2
+
+
+# --- Semantic cache query ---
+
+def _params(system: str, user: str, temperature: float = 0.0):
+    return {
+        "model": "test-model",
+        "temperature": temperature,
+        "stream": False,
+        "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+    }
+
+
+def test_semantic_query_context_ignores_only_the_prompt():
+    prompt, context = GroqAdapter._semantic_query(_params("You are the planner.", "Plan apple"))
+    _, same_context = GroqAdapter._semantic_query(_params("You are the planner.", "Plan apples please"))
+
+    assert prompt == "Plan apple"
+    assert context == same_context
+
+
+def test_semantic_query_context_separates_system_prompts_and_params():
+    _, planner = GroqAdapter._semantic_query(_params("You are the planner.", "Plan apple"))
+    _, reviewer = GroqAdapter._semantic_query(_params("You are the reviewer.", "Plan apple"))
+    _, hotter = GroqAdapter._semantic_query(_params("You are the planner.", "Plan apple", temperature=0.5))
+
+    assert len({planner, reviewer, hotter}) == 3
+
+
+def test_semantic_query_without_user_message():
+    params = _params("You are the planner.", "unused")
+    params["messages"] = params["messages"][:1]
+
+    assert GroqAdapter._semantic_query(params) is None
+
+
+# --- Planner local fast path ---
+
+@pytest.mark.parametrize("word, expected", [
+    ("apple", "Vowel Bin"),
+    ("  Egg", "Vowel Bin"),
+    ("banana", "Consonant Bin"),
+    ("Yak", "Consonant Bin"),
+    ("", None),
+    ("42", None),
+    ("élan", None), # Accented vowel: the LLM decides
+    ("ñandu", None),
+    ("жук", None), # Non-Latin letters are not consonants by default
+])
+def test_classify_word_bin(word, expected):
+    assert classify_word_bin(word) == expected
+
+
+def test_planner_sends_only_undecidable_words_to_the_llm():
+    adapter = MagicMock()
+    adapter.chat_completion_json = AsyncMock(return_value=CheckPlan(action="check_bin", word="élan", bin_name="Vowel Bin"))
+    planner = PlannerAgent(adapter, "test-model")
+
+    plans = asyncio.run(planner.plan_check_tasks(["apple", "banana", "élan"]))
+
+    assert [plan.bin_name for plan in plans] == ["Vowel Bin", "Consonant Bin", "Vowel Bin"]
+    assert adapter.chat_completion_json.await_count == 1
+    assert "élan" in adapter.chat_completion_json.await_args.kwargs["messages"][-1]["content"]
+
+
+def test_local_plans_are_memoized_frozen_instances():
+    planner = PlannerAgent(MagicMock(), "test-model")
+    missing = CheckResult(status="Not Present", word="apple", bin_checked="Vowel Bin")
+
+    async def plan_twice():
+        return [
+            (await planner.plan_check_task("apple"), await planner.plan_check_task("apple")),
+            (await planner.plan_final_add_task("apple", missing), await planner.plan_final_add_task("apple", missing)),
+            (await planner.plan_read_file_task("a.txt"), await planner.plan_read_file_task("a.txt")),
+        ]
+
+    pairs = asyncio.run(plan_twice())
+
+    for (first, second), field in zip(pairs, ["word", "word_to_process", "file_path"]):
+        assert second is first
+        with pytest.raises(ValidationError): # Shared instances cannot be changed by one caller
+            setattr(first, field, "edited")
+    preview = asyncio.run(planner.plan_read_file_task("a.txt", max_bytes=10))
+    assert preview.max_bytes == 10 and preview is not pairs[2][0] # Keyed by (path, max_bytes)
+
+
+def test_plan_read_file_tasks_builds_local_plans_in_order():
+    adapter = MagicMock()
+    adapter.chat_completion_json = AsyncMock(return_value=ReadFilePlan(action="read_file", file_path="b.txt"))
+    paths = ["a.txt", "b.txt", "a.txt"]
+
+    local = asyncio.run(PlannerAgent(adapter, "test-model").plan_read_file_tasks(paths, max_bytes=5))
+    assert [plan.file_path for plan in local] == paths
+    assert local[0] is local[2] and local[0].max_bytes == 5
+    assert adapter.chat_completion_json.await_count == 0
+
+    remote = asyncio.run(PlannerAgent(adapter, "test-model", local_fast_path=False).plan_read_file_tasks(paths[:1]))
+    assert remote[0].file_path == "b.txt" # The LLM's plan is used as returned
+    assert adapter.chat_completion_json.await_count == 1
+
+
+# --- Planner word batching ---
+
+def _batch_response(*words: str) -> WordActionPlanBatch:
+    return WordActionPlanBatch(plans=[WordActionPlan(word_to_process=word, target_bin="Vowel Bin") for word in words])
+
+
+def _batching_planner(*responses, **kwargs) -> PlannerAgent:
+    adapter = MagicMock()
+    adapter.chat_completion_json = AsyncMock(side_effect=list(responses))
+    return PlannerAgent(adapter, "test-model", **kwargs)
+
+
+def _batched_words(planner: PlannerAgent, call: int = 0):
+    prompt = planner.adapter.chat_completion_json.await_args_list[call].kwargs["messages"][-1]["content"]
+    return json_utils.loads(prompt.split("Words:", 1)[1].split("\n", 1)[0])
+
+
+def test_plan_words_batch_matches_reordered_and_missing_plans():
+    planner = _batching_planner(_batch_response("ñu", "élan")) # Reordered, and "ökonom" dropped
+
+    plans = asyncio.run(planner.plan_words_batch(["élan", "apple", "ñu", "ökonom", "élan"]))
+
+    assert _batched_words(planner) == ["élan", "ñu", "ökonom"] # Local words and duplicates are not sent
+    assert [plan and plan.word_to_process for plan in plans] == ["élan", "apple", "ñu", None, "élan"]
+    assert plans[1].reasoning == "local-fast-path"
+
+
+def test_plan_word_sends_full_batches_at_once():
+    planner = _batching_planner(_batch_response("élan", "ñu"), _batch_response("ökonom"),
+                                word_batch_size=2, word_batch_wait=0.05)
+
+    async def scenario():
+        full = await asyncio.gather(planner.plan_word("élan"), planner.plan_word("ñu"))
+        assert planner._word_flush_timer is None # The size-triggered send stops the wait
+        partial = await planner.plan_word("ökonom") # Sent when the wait elapses
+        return full, partial
+
+    full, partial = asyncio.run(scenario())
+
+    assert [plan.word_to_process for plan in full] == ["élan", "ñu"]
+    assert partial.word_to_process == "ökonom"
+    assert _batched_words(planner, 0) == ["élan", "ñu"]
+    assert _batched_words(planner, 1) == ["ökonom"]
+
+
+# --- JSON-mode response cache ---
+
+def test_json_cache_hit_shares_frozen_plans_without_revalidating(monkeypatch):
+    adapter = _mock_adapter('{"action": "check_bin", "word": "apple", "bin_name": "Vowel Bin"}', cache_enabled=True)
+    planner = PlannerAgent(adapter, "test-model", temperature=0.0, local_fast_path=False)
+    validate = AsyncMock(wraps=adapter._validate_json_response)
+    monkeypatch.setattr(adapter, "_validate_json_response", validate)
+
+    async def plan_twice():
+        return await planner.plan_check_task("apple"), await planner.plan_check_task("apple")
+
+    first, second = asyncio.run(plan_twice())
+
+    assert first.bin_name == "Vowel Bin"
+    assert second is first
+    assert adapter._create_completion.await_count == 1
+    assert validate.await_count == 1
+
+
+def test_json_cache_copies_mutable_plans():
+    adapter = _mock_adapter('{"action": "write_file", "file_path": "out.txt", "content": "hello"}', cache_enabled=True)
+
+    async def plan_twice():
+        first = await adapter.chat_completion_json(_user("write it"), "test-model", WriteFilePlan, temperature=0)
+        first.content = "edited by the caller"
+        return await adapter.chat_completion_json(_user("write it"), "test-model", WriteFilePlan, temperature=0)
+
+    second = asyncio.run(plan_twice())
+
+    assert second.content == "hello"
+    assert adapter._create_completion.await_count == 1
+
+
+def test_sqlite_json_cache_revalidates_stored_completions(tmp_path):
+    adapter = _mock_adapter('{"action": "check_bin", "word": "apple", "bin_name": "Vowel Bin"}',
+                            cache_enabled=True, cache_path=str(tmp_path / "cache.db"))
+
+    async def plan_twice():
+        try:
+            return [await adapter.chat_completion_json(_user("plan"), "test-model", CheckPlan, temperature=0) for _ in range(2)]
+        finally:
+            await adapter.aclose()
+
+    first, second = asyncio.run(plan_twice())
+
+    assert first == second
+    assert adapter._create_completion.await_count == 1
+
+
+# --- JSON-mode validation errors ---
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"action": "check_bin", "word": "apple"', "not valid JSON"),
+    ('{"action": "check_bin", "word": "apple", "bin_name": "Bad Bin"}', "failed Pydantic validation"),
+])
+def test_json_completion_reports_invalid_output(content, expected):
+    adapter = _mock_adapter(content)
+
+    with pytest.raises(ValueError, match=expected):
+        asyncio.run(adapter.chat_completion_json(_user("plan"), "test-model", CheckPlan, temperature=0.0))
+
+
+# --- reasoning_format validation ---
+
+def _sent_params(adapter: GroqAdapter):
+    return adapter._create_completion.await_args.args[0]
+
+
+@pytest.mark.parametrize("json_entry_point", [True, False])
+def test_reasoning_format_rules_match_across_entry_points(json_entry_point):
+    async def ask(reasoning_format: str):
+        adapter = _mock_adapter('{"action": "check_bin", "word": "apple", "bin_name": "Vowel Bin"}')
+        if json_entry_point:
+            await adapter.chat_completion_json(_user("plan"), "test-model", CheckPlan, reasoning_format=reasoning_format)
+        else: # JSON mode with a prefill goes through _build_params
+            await adapter.chat_completion(_user("plan"), model="test-model", json_schema=CheckPlan,
+                                          prefill_content="{", reasoning_format=reasoning_format)
+        return _sent_params(adapter)
+
+    assert asyncio.run(ask("hidden"))["reasoning_format"] == "hidden"
+    assert "reasoning_format" not in asyncio.run(ask("verbose")) # Unknown values are ignored
+    with pytest.raises(ValueError, match="cannot be 'raw'"):
+        asyncio.run(ask("raw"))
+
+
+# --- Shared client pool ---
+
+def test_shared_client_is_per_event_loop():
+    adapter = GroqAdapter(api_key="test-key")
+
+    async def clients():
+        return adapter.client, adapter.client
+
+    first_a, first_b = asyncio.run(clients())
+    second, _ = asyncio.run(clients()) # A later asyncio.run must not reuse the closed loop's pool
+
+    assert first_a is first_b
+    assert second is not first_a
+
+    async def close_shared():
+        await GroqAdapter.aclose_shared()
+        return adapter.client
+
+    assert asyncio.run(close_shared()) not in (first_a, second)